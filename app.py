@@ -1,14 +1,12 @@
 from flask import Flask, render_template, jsonify, Response, request
 from threading import Thread
 import logging
-import time
-import json
-import os
-from datetime import datetime
 
 # Proje içi modülleri import ediyoruz
 from tospa.core.bot import TospaBot
 from tospa.core.config import settings, load_settings, update_env_file
+from tospa.core.log_broadcast import log_broadcast
+from tospa.strategies.registry import STRATEGIES
 
 app = Flask(__name__)
 bot = TospaBot()
@@ -50,83 +48,59 @@ def stop_bot():
 # --- VERİ GÖNDERME ---
 @app.route('/api/status')
 def get_status():
-    """Arayüz için anlık durum verilerini sağlar."""
-    current_settings = load_settings()
-    balances = { 'USDT': '0.00', 'BTC': '0.00', 'ETH': '0.00' }
-    prices = {}
-    if bot.client and bot.client.is_ready:
-        try:
-            balances = { 'USDT': bot.client.get_account_balance('USDT'), 'BTC': bot.client.get_account_balance('BTC'), 'ETH': bot.client.get_account_balance('ETH'), }
-            for p in current_settings.TARGET_PAIRS:
-                price_info = bot.client.get_symbol_ticker(p)
-                prices[p] = price_info.get('price', 'N/A') if price_info else 'N/A'
-        except Exception as e:
-            logging.warning(f"Durum alınırken hata oluştu: {e}")
-    return jsonify( bot_status= "Çalışıyor" if bot.is_running else "Durduruldu", balances=balances, prices=prices, target_pairs=current_settings.TARGET_PAIRS)
+    """Arayüz için anlık durum verilerini paylaşılan durum önbelleğinden sağlar."""
+    try:
+        bot.refresh_dashboard_state()
+    except Exception as e:
+        logging.warning(f"Durum alınırken hata oluştu: {e}")
+    state = bot.state_hub.snapshot()
+    return jsonify(bot_status=state.get('bot_status'), balances=state.get('balances', {}),
+                   prices=state.get('prices', {}), target_pairs=state.get('target_pairs', []))
+
+@app.route('/api/stream')
+def stream_state():
+    """Kontrol paneli durumunu (fiyat, bakiye, pozisyon, işlem, K/Z) SSE ile iter."""
+    response = Response(bot.state_hub.events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/logs')
 def get_logs():
+    """Son log satırlarını ve ardından canlı logları SSE ile iter."""
     def generate():
-        try:
-            with open('logs/activity.log', 'r') as f:
-                f.seek(0,2)
-                while True:
-                    line = f.readline()
-                    if not line:
-                        time.sleep(0.5)
-                        continue
-                    yield f"data: {line}\n\n"
-        except FileNotFoundError:
-             yield f"data: Log dosyası henüz oluşturulmadı...\n\n"
-    return Response(generate(), mimetype='text/event-stream')
+        for line in log_broadcast.subscribe():
+            if not line:
+                yield ": keepalive\n\n" # Kopmuş bağlantıların fark edilmesi için
+                continue
+            yield "data: " + "\ndata: ".join(line.splitlines()) + "\n\n"
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/trades')
 def get_trades():
-    trades_file = "data/trades.json"
-    if not os.path.exists(trades_file): return jsonify([])
+    """
+    İşlem geçmişini en yeniden eskiye döndürür.
+    ?limit= verilmezse tüm geçmiş döner; verilirse ?offset= ile sayfalanır.
+    """
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', default=0, type=int)
     try:
-        with open(trades_file, 'r') as f:
-            trades = json.load(f)
-            return jsonify(sorted(trades, key=lambda x: x['timestamp'], reverse=True))
+        if limit is None:
+            return jsonify(list(bot.trade_journal.iter_trades(reverse=True)))
+        return jsonify(bot.trade_journal.page(limit=max(limit, 0), offset=max(offset, 0)))
     except Exception: return jsonify([])
 
 @app.route('/api/performance')
 def get_performance():
+    """Performans defterindeki güncel özeti ve örneklenmiş bakiye eğrisini döndürür."""
     current_settings = load_settings()
-    trades_file = "data/trades.json"
-    if not os.path.exists(trades_file): return jsonify({"summary": {}, "chart_data": {}})
     try:
-        with open(trades_file, 'r') as f:
-            trades = sorted(json.load(f), key=lambda x: x['timestamp'])
-    except Exception: return jsonify({"summary": {}, "chart_data": {}})
-    pnl, wins, losses = 0.0, 0, 0
-    open_positions_calc = {}
-    chart_points = []
-    initial_balance = 10000 
-    fee = current_settings.BINANCE_FEE_PERCENT / 100.0
-    for trade in trades:
-        symbol, quantity, price = trade['symbol'], float(trade['quantity']), float(trade['price'])
-        trade_value = quantity * price
-        if trade['side'] == 'BUY':
-            if symbol not in open_positions_calc: open_positions_calc[symbol] = {'quantity': 0, 'cost': 0}
-            open_positions_calc[symbol]['quantity'] += quantity
-            open_positions_calc[symbol]['cost'] += trade_value
-            pnl -= trade_value * fee
-        elif trade['side'] == 'SELL' and symbol in open_positions_calc and open_positions_calc[symbol]['quantity'] > 0:
-            avg_buy_price = open_positions_calc[symbol]['cost'] / open_positions_calc[symbol]['quantity']
-            trade_pnl = (price - avg_buy_price) * quantity
-            pnl += trade_pnl
-            pnl -= trade_value * fee
-            if trade_pnl > 0: wins += 1
-            else: losses += 1
-            open_positions_calc[symbol]['quantity'] -= quantity
-            open_positions_calc[symbol]['cost'] -= quantity * avg_buy_price
-        chart_points.append({'x': trade['timestamp'], 'y': initial_balance + pnl})
-    total_trades = wins + losses
-    win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-    summary = {'total_pnl': round(pnl, 2), 'win_rate': round(win_rate, 2), 'wins': wins, 'losses': losses, 'total_trades': total_trades}
-    chart_data = {'labels': [datetime.fromisoformat(p['x']).strftime('%H:%M:%S') for p in chart_points], 'data': [p['y'] for p in chart_points]}
-    return jsonify(summary=summary, chart_data=chart_data)
+        bot.performance.sync(current_settings.BINANCE_FEE_PERCENT)
+    except Exception as e:
+        logging.warning(f"Performans defteri güncellenemedi: {e}")
+    if bot.performance.processed == 0: return jsonify({"summary": {}, "chart_data": {}})
+    return jsonify(summary=bot.performance.summary(), chart_data=bot.performance.chart_data())
 
 @app.route('/api/positions')
 def get_positions():
@@ -143,6 +117,10 @@ def get_settings():
 def save_strategy_settings():
     current_settings = load_settings()
     data = request.get_json()
+    strategy_name = data.get('strategy', current_settings.STRATEGY_NAME)
+    if strategy_name not in STRATEGIES:
+        return jsonify(status="error", message=f"Bilinmeyen strateji: '{strategy_name}'.")
+    current_settings.STRATEGY_NAME = strategy_name
     current_settings.FAST_EMA_PERIOD = int(data.get('fast_ema', current_settings.FAST_EMA_PERIOD))
     current_settings.SLOW_EMA_PERIOD = int(data.get('slow_ema', current_settings.SLOW_EMA_PERIOD))
     current_settings.TREND_EMA_PERIOD = int(data.get('trend_ema', current_settings.TREND_EMA_PERIOD))
@@ -283,5 +261,6 @@ def close_all_positions():
 
 if __name__ == '__main__':
     from waitress import serve
-    serve(app, host="0.0.0.0", port=5000)
+    # Her SSE bağlantısı (/api/stream, /api/logs) bir iş parçacığını meşgul eder
+    serve(app, host="0.0.0.0", port=5000, threads=16)
 
@@ -1,38 +1,16 @@
+import numpy as np
 import pandas as pd
+from tospa.strategies import indicators
+from tospa.strategies.base import Strategy
+from tospa.strategies.registry import DEFAULT_STRATEGY, get_strategy
 
-def calculate_rsi(data, period=14):
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+def calculate_rsi(data, period=14, cache=None):
+    return indicators.calculate_rsi(data['Close'], period, cache=cache)
 
-def run_backtest(df, params): # 'settings' yerine 'params' alıyor
+def _extract_trades_loop(df):
     """
-    Verilen veri ve parametrelerle stratejiyi test eder.
+    Sinyalleri bar bar gezerek işlem listesini çıkarır (eski, referans motor).
     """
-    # Ayarları artık doğrudan params sözlüğünden alıyoruz
-    trend_period = params.get('ema_trend_period', 200)
-    rsi_period = params.get('rsi_period', 14)
-    rsi_buy_level = params.get('rsi_buy_level', 50)
-    rsi_sell_level = params.get('rsi_sell_level', 75)
-
-    df['ema_short'] = df['Close'].ewm(span=params['ema_short_period'], adjust=False).mean()
-    df['ema_long'] = df['Close'].ewm(span=params['ema_long_period'], adjust=False).mean()
-    df['ema_trend'] = df['Close'].ewm(span=trend_period, adjust=False).mean()
-    df['rsi'] = calculate_rsi(df, rsi_period)
-
-    df['signal'] = 0
-    
-    buy_crossover = (df['ema_short'] > df['ema_long']) & (df['ema_short'].shift(1) <= df['ema_long'].shift(1))
-    buy_trend = df['Close'] > df['ema_trend']
-    df.loc[buy_crossover & buy_trend, 'signal'] = 1
-
-    sell_crossover = (df['ema_short'] < df['ema_long']) & (df['ema_short'].shift(1) >= df['ema_long'].shift(1))
-    sell_overbought = df['rsi'] > rsi_sell_level
-    df.loc[sell_crossover | sell_overbought, 'signal'] = -1
-    
     position = 0
     trades = []
     for i, row in df.iterrows():
@@ -42,5 +20,103 @@ def run_backtest(df, params): # 'settings' yerine 'params' alıyor
         elif row['signal'] == -1 and position == 1:
             position = 0
             trades.append({'date': i, 'type': 'SELL', 'price': row['Close']})
-            
-    return pd.DataFrame(trades), df
\ No newline at end of file
+    return pd.DataFrame(trades)
+
+def extract_trade_indices(signal):
+    """
+    Pozisyon durum makinesini NumPy dizi işlemleriyle çalıştırır.
+
+    Pozisyon yokken gelen 1 sinyali alım, pozisyondayken gelen -1 sinyali
+    satım demektir. Bu, sıfır olmayan sinyallerin ardışık tekrarlarının
+    atılmasıyla aynı sonucu verir (baştaki -1'ler hariç).
+
+    Returns:
+        tuple: (alım bar indeksleri, satım bar indeksleri) dizileri.
+    """
+    signal = np.asarray(signal)
+    active = np.flatnonzero(signal)
+    values = signal[active]
+
+    # Pozisyon yokken gelen satım sinyallerinin bir etkisi yoktur
+    first_buy = np.argmax(values == 1) if values.size else 0
+    if values.size == 0 or values[first_buy] != 1:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    active, values = active[first_buy:], values[first_buy:]
+
+    # Yalnızca durumu değiştiren sinyaller işleme dönüşür
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    active, values = active[keep], values[keep]
+
+    return active[values == 1], active[values == -1]
+
+def _extract_trades_vectorized(df):
+    """
+    Sinyallerden işlem listesini vektörel motorla çıkarır.
+    """
+    buy_idx, sell_idx = extract_trade_indices(df['signal'].to_numpy())
+    if buy_idx.size == 0:
+        return pd.DataFrame()
+
+    # İşlemler tarih sırasına göre BUY/SELL olarak sırayla dizilir
+    order = np.concatenate([buy_idx, sell_idx])
+    types = np.array(['BUY'] * buy_idx.size + ['SELL'] * sell_idx.size, dtype=object)
+    sort = np.argsort(order, kind='stable')
+    order, types = order[sort], types[sort]
+
+    return pd.DataFrame({
+        'date': df.index[order],
+        'type': types.tolist(),
+        'price': df['Close'].to_numpy()[order],
+    })
+
+ENGINES = {
+    'loop': _extract_trades_loop,
+    'vectorized': _extract_trades_vectorized,
+}
+
+def run_backtest(df, params, engine='vectorized', cache=None, strategy=None): # 'settings' yerine 'params' alıyor
+    """
+    Verilen veri ve parametrelerle stratejiyi test eder.
+
+    engine: İşlem çıkarma motoru. 'vectorized' (varsayılan, NumPy tabanlı) veya
+    karşılaştırma için eski bar bar döngüsü 'loop'. İkisi de aynı sonucu verir.
+    cache: Verilirse (IndicatorCache) EMA/RSI serileri çağrılar arasında paylaşılır.
+    strategy: Strateji adı veya Strategy nesnesi (bkz. tospa.strategies.registry).
+        Verilmezse params['strategy'], o da yoksa 'ema_trend_rsi' kullanılır.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen backtest motoru: '{engine}'. Seçenekler: {list(ENGINES)}")
+
+    if not isinstance(strategy, Strategy):
+        strategy = get_strategy(strategy or params.get('strategy', DEFAULT_STRATEGY), **params)
+
+    # İndikatör sütunları (grafikler için) ve 'signal' sütunu stratejiden gelir
+    columns = strategy.compute(df, cache=cache)
+    for column in columns.columns:
+        df[column] = columns[column]
+
+    trades = ENGINES[engine](df)
+
+    return trades, df
+
+# Bu dosya doğrudan çalıştırıldığında iki motorun paketteki CSV'lerde
+# aynı işlem listesini ürettiğini kontrol eder.
+if __name__ == "__main__":
+    import glob
+    import time
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        timings = {}
+        results = {}
+        for engine in ENGINES:
+            start = time.perf_counter()
+            results[engine], _ = run_backtest(data.copy(), params, engine=engine)
+            timings[engine] = time.perf_counter() - start
+        pd.testing.assert_frame_equal(results['loop'], results['vectorized'])
+        print(f"{csv_file}: {len(results['loop'])} işlem, aynı sonuç | "
+              f"loop {timings['loop']:.3f}s, vectorized {timings['vectorized']:.3f}s")
@@ -1,41 +1,255 @@
+import time
 import pandas as pd
 from binance.client import Client
+from binance.helpers import date_to_milliseconds, interval_to_milliseconds
 import os
+from backtester.store import append_store, load_csv_cached, read_meta, read_store, write_store
 
-def fetch_historical_data(symbol, start_str, interval=Client.KLINE_INTERVAL_1HOUR):
-    """
-    Binance'ten geçmişe dönük OHLCV verilerini çeker ve CSV olarak kaydeder.
-    """
+KLINE_COLUMNS = [
+    'Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time',
+    'Quote Asset Volume', 'Number of Trades', 'Taker Buy Base Asset Volume',
+    'Taker Buy Quote Asset Volume', 'Ignore'
+]
+
+def _create_client():
     api_key = os.getenv("BINANCE_API_KEY")
     api_secret = os.getenv("BINANCE_SECRET_KEY")
-    client = Client(api_key, api_secret)
-    
-    # Dosya adının zaman aralığını da içermesini sağla ki veriler karışmasın
-    csv_filename = f"{symbol}_{interval}_{start_str.replace(' ', '_').replace(',', '')}.csv"
-    
-    if os.path.exists(csv_filename):
-        print(f"Veri dosyası '{csv_filename}' zaten mevcut. Mevcut dosya kullanılıyor.")
-        df = pd.read_csv(csv_filename, index_col=0, parse_dates=True)
-        return df
+    return Client(api_key, api_secret)
+
+def _klines_to_frame(klines):
+    """Binance kline listesini OHLCV DataFrame'ine çevirir."""
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
 
-    print(f"'{csv_filename}' için Binance'ten veri çekiliyor...")
-    klines = client.get_historical_klines(symbol, interval, start_str)
-    
-    df = pd.DataFrame(klines, columns=[
-        'Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time',
-        'Quote Asset Volume', 'Number of Trades', 'Taker Buy Base Asset Volume',
-        'Taker Buy Quote Asset Volume', 'Ignore'
-    ])
-    
     # Gerekli sütunları seç ve veri tiplerini ayarla
     df = df[['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume']]
     df['Open Time'] = pd.to_datetime(df['Open Time'], unit='ms')
     df.set_index('Open Time', inplace=True)
-    
+
     for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
         df[col] = pd.to_numeric(df[col])
+    return df
+
+def historical_csv_filename(symbol, start_str, interval=Client.KLINE_INTERVAL_1HOUR):
+    """fetch_historical_data'nın kullandığı CSV dosya adını döndürür."""
+    # Dosya adının zaman aralığını da içermesini sağla ki veriler karışmasın
+    return f"{symbol}_{interval}_{start_str.replace(' ', '_').replace(',', '')}.csv"
+
+def fetch_historical_data(symbol, start_str, interval=Client.KLINE_INTERVAL_1HOUR, sync=False, client=None):
+    """
+    Binance'ten geçmişe dönük OHLCV verilerini çeker ve CSV olarak kaydeder.
+
+    Veriler ayrıca sütunsal ikili depoya (backtester.store) yazılır; sonraki
+    çağrılarda CSV yeniden ayrıştırılmaz, depo bellek eşlemeli olarak açılır.
+    Mevcut CSV dosyaları ilk kullanımda otomatik olarak dönüştürülür.
+
+    sync=True ise veri, sembol ve aralık başına tutulan depoya artımlı
+    olarak eşitlenir (bkz. sync_historical_data).
+    """
+    if sync:
+        return sync_historical_data(symbol, start_str, interval=interval, client=client)
+
+    csv_filename = historical_csv_filename(symbol, start_str, interval)
+
+    if os.path.exists(csv_filename):
+        print(f"Veri dosyası '{csv_filename}' zaten mevcut. Mevcut dosya kullanılıyor.")
+        return load_csv_cached(csv_filename)
+
+    client = client or _create_client()
+
+    print(f"'{csv_filename}' için Binance'ten veri çekiliyor...")
+    klines = client.get_historical_klines(symbol, interval, start_str)
+    df = _klines_to_frame(klines)
 
     df.to_csv(csv_filename)
     print(f"Veriler '{csv_filename}' dosyasına kaydedildi.")
-    
-    return df
\ No newline at end of file
+    write_store(os.path.splitext(csv_filename)[0], df, source=csv_filename)
+
+    return df
+
+def _fetch_klines_since(client, symbol, interval, start_ms, batch_limit, now_ms):
+    """
+    start_ms'den itibaren kapanmış mumları sayfa sayfa çeker.
+    Henüz kapanmamış son mum alınmaz.
+    """
+    klines = []
+    while True:
+        batch = client.get_klines(symbol=symbol, interval=interval, startTime=start_ms, limit=batch_limit)
+        closed = [k for k in batch if k[6] < now_ms]
+        klines.extend(closed)
+        if len(batch) < batch_limit or len(closed) < len(batch):
+            break
+        start_ms = batch[-1][0] + 1
+    return klines
+
+def _validate_new_rows(existing, new_df, interval_ms):
+    """
+    Yeni mumlardaki tekrarları ve mevcut veriyle çakışanları atar, boşlukları raporlar.
+    """
+    new_df = new_df[~new_df.index.duplicated(keep='last')].sort_index()
+    if existing is not None and len(existing):
+        new_df = new_df[new_df.index > existing.index[-1]]
+    if new_df.empty:
+        return new_df
+
+    stamps = new_df.index.values.astype('datetime64[ms]').view('int64')
+    if existing is not None and len(existing):
+        previous = existing.index[-1].value // 10**6
+        stamps = [previous] + list(stamps)
+    gaps = [(a, b) for a, b in zip(stamps[:-1], stamps[1:]) if b - a != interval_ms]
+    if gaps:
+        missing = sum((b - a) // interval_ms - 1 for a, b in gaps)
+        first = pd.to_datetime(gaps[0][0], unit='ms')
+        print(f"UYARI: Verilerde {len(gaps)} boşluk bulundu ({missing} eksik mum), ilki {first} sonrasında.")
+    return new_df
+
+def sync_historical_data(symbol, start_str, interval=Client.KLINE_INTERVAL_1HOUR, client=None, batch_limit=1000):
+    """
+    Sembol/aralık deposunu Binance ile artımlı olarak eşitler.
+
+    Depoda kayıtlı son mum bulunur, yalnızca eksik aralık `batch_limit`
+    büyüklüğünde sayfalarla çekilir, tekrarlar ayıklanıp boşluklar raporlanır
+    ve yeni mumlar depoya segment olarak atomik şekilde eklenir (mevcut veri
+    dosyaları yeniden yazılmaz; bkz. store.append_store). Depo yoksa ve başlangıç
+    tarihine ait eski CSV dosyası varsa, o dosya temel olarak kullanılır.
+
+    Args:
+        client: get_klines(symbol, interval, startTime, limit) metodu olan
+            bir Binance istemcisi. Verilmezse ortam değişkenlerindeki
+            anahtarlarla yeni bir istemci oluşturulur.
+
+    Returns:
+        pd.DataFrame: Deponun eşitlenmiş hali.
+    """
+    name = f"{symbol}_{interval}"
+    interval_ms = interval_to_milliseconds(interval)
+
+    existing = read_store(name)
+    if existing is None:
+        legacy_csv = f"{symbol}_{interval}_{start_str.replace(' ', '_').replace(',', '')}.csv"
+        if os.path.exists(legacy_csv):
+            existing = load_csv_cached(legacy_csv)
+
+    if existing is not None and len(existing):
+        start_ms = existing.index[-1].value // 10**6 + interval_ms
+    else:
+        existing = None
+        start_ms = date_to_milliseconds(start_str)
+
+    now_ms = int(time.time() * 1000)
+    if start_ms + interval_ms > now_ms:
+        print(f"'{name}' deposu güncel, yeni mum yok.")
+        return existing
+
+    client = client or _create_client()
+    started = time.perf_counter()
+    klines = _fetch_klines_since(client, symbol, interval, start_ms, batch_limit, now_ms)
+    new_df = _validate_new_rows(existing, _klines_to_frame(klines), interval_ms)
+
+    if new_df.empty:
+        print(f"'{name}' deposu güncel, yeni mum yok.")
+        return existing
+
+    extra = {'symbol': symbol, 'interval': interval}
+    if existing is not None:
+        new_df.index = new_df.index.astype(existing.index.dtype)
+        new_df.index.name = existing.index.name
+
+    # Depo zaten varsa yalnızca yeni mumlar eklenir; eski CSV'den ilk kez
+    # oluşturuluyorsa veya hiç veri yoksa depo baştan yazılır.
+    meta = append_store(name, new_df, extra=extra) if read_meta(name) is not None else None
+    if meta is None:
+        combined = pd.concat([existing, new_df]) if existing is not None else new_df
+        meta = write_store(name, combined, extra=extra)
+    print(f"'{name}' deposuna {len(new_df)} yeni mum eklendi "
+          f"(toplam {meta['rows']}, {time.perf_counter() - started:.2f}s).")
+    return read_store(name, meta)
+
+class StubKlineClient:
+    """
+    Kline uç noktasının yerel taklidi: get_klines çağrılarını bir DataFrame'den yanıtlar.
+
+    Yalnızca `available_until` zamanına kadar açılmış mumlar görünür; bu değer
+    ilerletilerek borsaya zamanla yeni mumlar eklenmesi taklit edilir.
+    """
+    def __init__(self, df, interval):
+        self.open_times = df.index.values.astype('datetime64[ms]').view('int64')
+        self.rows = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy()
+        self.interval_ms = interval_to_milliseconds(interval)
+        self.available_until = self.open_times[-1]
+        self.calls = 0
+
+    def get_klines(self, symbol, interval, startTime, limit=500):
+        self.calls += 1
+        start = int(self.open_times.searchsorted(startTime))
+        end = min(start + limit, int(self.open_times.searchsorted(self.available_until, side='right')))
+        return [[int(t), *(str(v) for v in row), int(t) + self.interval_ms - 1, '0', 0, '0', '0', '0']
+                for t, row in zip(self.open_times[start:end], self.rows[start:end])]
+
+def check_sync_against_stub(csv_filename, steps=5, batch_limit=500):
+    """
+    sync_historical_data'yı yerel kline taklidine karşı geçici bir depoda çalıştırır.
+
+    Veri `steps` parça halinde açılır ve her seferinde eşitlenir; sonunda depo
+    CSV ile birebir aynı olmalı, ilk yazımdan sonra mevcut veri dosyaları
+    yeniden yazılmamalı ve segmentler MAX_SEGMENTS aşılınca sıkıştırılmalıdır.
+    """
+    import tempfile
+    import numpy as np
+    from backtester import store
+
+    source = pd.read_csv(csv_filename, index_col=0, parse_dates=True)
+    interval = os.path.basename(csv_filename).split('_')[1]
+    stub = StubKlineClient(source, interval)
+    cutoffs = np.linspace(0, len(source) - 1, steps + 1).astype(int)[1:]
+
+    original_dir, original_max = store.STORE_DIR, store.MAX_SEGMENTS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store.STORE_DIR, store.MAX_SEGMENTS = tmp_dir, max(1, steps // 2)
+        try:
+            name, first_file, compacted = f"STUBUSDT_{interval}", None, False
+            for cutoff in cutoffs:
+                stub.available_until = stub.open_times[cutoff]
+                synced = sync_historical_data("STUBUSDT", str(source.index[0]), interval=interval,
+                                              client=stub, batch_limit=batch_limit)
+                meta = read_meta(name)
+                assert len(synced) == cutoff + 1, (len(synced), cutoff + 1)
+                if first_file is None:
+                    first_file = meta['data_file']
+                elif meta['data_file'] != first_file:
+                    assert not meta.get('segments'), "Sıkıştırma dışında veri dosyası yeniden yazıldı"
+                    first_file, compacted = meta['data_file'], True
+            final = read_store(name)
+            pd.testing.assert_frame_equal(final, source, check_freq=False, check_index_type=False,
+                                          check_names=False)
+            assert (final.index.values == source.index.values).all()
+        finally:
+            store.STORE_DIR, store.MAX_SEGMENTS = original_dir, original_max
+
+    print(f"{csv_filename}: {steps} eşitleme, {stub.calls} get_klines çağrısı, "
+          f"{len(final)} satır CSV ile aynı (sıkıştırma: {'evet' if compacted else 'hayır'}).")
+
+# Bu dosya doğrudan çalıştırıldığında verilen sembolleri artımlı olarak eşitler.
+# Örnek: python -m backtester.data BTCUSDT ETHUSDT --interval 15m --start "1 Jan, 2024"
+# --check ile ağ bağlantısı olmadan, paketteki CSV'ler üzerinden kline taklidine karşı denenir.
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Geçmiş mum verilerini artımlı eşitler")
+    parser.add_argument('symbols', nargs='*')
+    parser.add_argument('--interval', default=Client.KLINE_INTERVAL_15MINUTE)
+    parser.add_argument('--start', default="1 Jan, 2024")
+    parser.add_argument('--check', action='store_true',
+                        help="Eşitlemeyi yerel kline taklidine karşı doğrular (ağ gerekmez)")
+    args = parser.parse_args()
+
+    if args.check:
+        for csv_file in sorted(glob.glob("*USDT_*.csv")):
+            check_sync_against_stub(csv_file)
+        raise SystemExit(0)
+    if not args.symbols:
+        parser.error("en az bir sembol verin veya --check kullanın")
+
+    sync_client = _create_client()
+    for sym in args.symbols:
+        sync_historical_data(sym, args.start, interval=args.interval, client=sync_client)
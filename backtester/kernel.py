@@ -0,0 +1,211 @@
+import numpy as np
+
+from backtester.portfolio import EXIT_SIGNAL, EXIT_TP, EXIT_SL
+
+try:
+    from numba import njit
+except ImportError: # Numba isteğe bağlıdır; yoksa aynı fonksiyon saf Python olarak çalışır
+    njit = None
+
+EXIT_TRAIL = 'TRAIL'
+# Çekirdek işlem nedenlerini sayı olarak yazar; sıra bu demetle aynıdır
+EXIT_REASONS = (EXIT_SIGNAL, EXIT_TP, EXIT_SL, EXIT_TRAIL)
+
+def _backtest_kernel(open_, high, low, close, signal, initial_balance, fee, slip, tp, sl, trail, size, equity, trades):
+    """
+    Yola bağlı (path-dependent) çıkışları bar bar işleyen backtest çekirdeği.
+
+    Yalnızca float64/int8 dizileri ve skalerlerle çalışır; Numba ile
+    derlenebilir, derlenmeden de referans uygulama olarak kullanılır.
+    Oranlar kesir olarak verilir (0.001 = %0.1); 0 ilgili kuralı kapatır.
+
+    Kurallar portfolio.simulate_arrays ile aynıdır: alım sinyali barının
+    kapanışından girilir, sonraki barlarda önce TP, sonra SL/iz süren stop,
+    sonra satış sinyali kontrol edilir. İz süren stop, girişten bu yana görülen
+    en yüksek fiyatın `trail` kadar altındadır ve barın sonunda güncellenir
+    (aynı barın tepesi o barın stobunu etkilemez).
+
+    Args:
+        equity: Doldurulacak (bar sayısı) boyutunda dizi.
+        trades: Doldurulacak (en fazla işlem x 7) dizi; sütunlar giriş barı,
+            çıkış barı, giriş fiyatı, çıkış fiyatı, neden kodu, miktar, net getiri.
+
+    Returns:
+        tuple: (kapanan işlem sayısı, ödenen toplam komisyon)
+    """
+    n = close.shape[0]
+    cash = initial_balance
+    fees_paid = 0.0
+    n_trades = 0
+    in_position = False
+    entry = 0
+    entry_fill = 0.0
+    quantity = 0.0
+    invest = 0.0
+    tp_price = 0.0
+    sl_price = 0.0
+    peak = 0.0
+
+    for i in range(n):
+        if in_position:
+            exit_level = -1.0
+            reason = 0
+            if tp > 0.0 and high[i] >= tp_price:
+                exit_level = max(tp_price, open_[i])
+                reason = 1
+            else:
+                stop = sl_price
+                reason = 2
+                if trail > 0.0 and peak * (1.0 - trail) > stop:
+                    stop = peak * (1.0 - trail)
+                    reason = 3
+                if stop > 0.0 and low[i] <= stop:
+                    exit_level = min(stop, open_[i])
+                elif signal[i] == -1:
+                    exit_level = close[i]
+                    reason = 0
+
+            if exit_level >= 0.0:
+                exit_fill = exit_level * (1.0 - slip)
+                gross = quantity * exit_fill
+                proceeds = gross * (1.0 - fee)
+                fees_paid += gross * fee
+                cash += proceeds
+                trades[n_trades, 0] = entry
+                trades[n_trades, 1] = i
+                trades[n_trades, 2] = entry_fill
+                trades[n_trades, 3] = exit_fill
+                trades[n_trades, 4] = reason
+                trades[n_trades, 5] = quantity
+                trades[n_trades, 6] = proceeds / invest - 1.0 if invest > 0.0 else 0.0
+                n_trades += 1
+                in_position = False
+                quantity = 0.0
+                equity[i] = cash
+                continue
+            if high[i] > peak:
+                peak = high[i]
+        elif signal[i] == 1:
+            entry = i
+            entry_fill = close[i] * (1.0 + slip)
+            invest = cash * size
+            quantity = invest * (1.0 - fee) / entry_fill
+            fees_paid += invest * fee
+            cash -= invest
+            tp_price = entry_fill * (1.0 + tp) if tp > 0.0 else 0.0
+            sl_price = entry_fill * (1.0 - sl) if sl > 0.0 else 0.0
+            peak = entry_fill
+            in_position = True
+        equity[i] = cash + quantity * close[i]
+    return n_trades, fees_paid
+
+# Numba varsa çekirdek ilk çağrıda makine koduna derlenir (sonuç diskte önbelleklenir)
+_compiled_kernel = njit(cache=True, nogil=True)(_backtest_kernel) if njit is not None else None
+
+def kernel_available() -> bool:
+    """Derlenmiş (Numba) çekirdeğin kullanılabilir olup olmadığını döndürür."""
+    return _compiled_kernel is not None
+
+def run_kernel(close, high, low, open_, signal, initial_balance=1000.0, fee_pct=0.1, slippage_pct=0.0,
+               tp_pct=None, sl_pct=None, trail_pct=None, position_pct=100.0, intrabar=True, compiled=None):
+    """
+    Backtest çekirdeğini ham OHLC dizileri üzerinde çalıştırır.
+
+    Args:
+        trail_pct (float): Verilirse girişten bu yana en yüksek fiyatın bu yüzde
+            altındaki iz süren stop.
+        intrabar (bool): False ise TP/SL/stop yalnızca kapanış fiyatıyla kontrol edilir.
+        compiled (bool): None ise Numba varsa derlenmiş çekirdek kullanılır;
+            False her zaman saf Python referansını çalıştırır; True Numba yoksa hata verir.
+
+    Returns:
+        tuple: (bakiye dizisi, işlem kayıtları listesi, ödenen toplam komisyon);
+        simulate_arrays ile aynı biçimde.
+    """
+    if compiled and _compiled_kernel is None:
+        raise RuntimeError("Derlenmiş çekirdek için 'numba' paketi gerekli.")
+    kernel = _compiled_kernel if (compiled is None or compiled) and _compiled_kernel is not None else _backtest_kernel
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if intrabar:
+        high = np.ascontiguousarray(high, dtype=np.float64)
+        low = np.ascontiguousarray(low, dtype=np.float64)
+        open_ = np.ascontiguousarray(open_, dtype=np.float64)
+    else:
+        high = low = open_ = close
+    signal = np.ascontiguousarray(signal, dtype=np.int8)
+
+    equity = np.empty(close.size, dtype=np.float64)
+    # Her işlem en az iki ayrı bar kullanır
+    trades = np.empty((close.size // 2 + 1, 7), dtype=np.float64)
+    n_trades, fees_paid = kernel(open_, high, low, close, signal, float(initial_balance), fee_pct / 100.0,
+                                 slippage_pct / 100.0, (tp_pct or 0.0) / 100.0, (sl_pct or 0.0) / 100.0,
+                                 (trail_pct or 0.0) / 100.0, position_pct / 100.0, equity, trades)
+
+    records = [(int(t[0]), int(t[1]), t[2], t[3], EXIT_REASONS[int(t[4])], t[5], t[6])
+               for t in trades[:n_trades].tolist()]
+    return equity, records, float(fees_paid)
+
+# Bu dosya doğrudan çalıştırıldığında çekirdeği simulate_arrays ile (iz süren
+# stop olmadan) ve derlenmiş (Numba) sürümü saf Python referansıyla karşılaştırır.
+# --require-numba verilirse Numba yoksa karşılaştırma atlanmaz, hata verilir.
+if __name__ == "__main__":
+    import glob
+    import sys
+    import time
+    import pandas as pd
+    from backtester.backtest import run_backtest
+    from backtester.portfolio import run_simulation, simulate_arrays
+
+    if not kernel_available():
+        if "--require-numba" in sys.argv:
+            raise SystemExit("Derlenmiş çekirdek kontrolü için 'numba' gerekli (pip install -r requirements-extra.txt).")
+        print("UYARI: numba yok; derlenmiş çekirdek karşılaştırması ATLANDI, yalnızca saf Python referansı kontrol ediliyor.")
+    else:
+        start = time.perf_counter()
+        _compiled_kernel.compile("(float64[::1], float64[::1], float64[::1], float64[::1], int8[::1], float64, "
+                                 "float64, float64, float64, float64, float64, float64, float64[::1], float64[:, ::1])")
+        print(f"Derlenmiş çekirdek: numba, derleme {time.perf_counter() - start:.2f}s")
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    options = dict(fee_pct=0.1, slippage_pct=0.05, tp_pct=2.0, sl_pct=1.0, position_pct=25.0)
+    # Derlenmiş/referans eşitliği farklı kural birleşimlerinde kontrol edilir
+    variants = {
+        'tp/sl': options,
+        'iz süren stop': dict(options, trail_pct=1.5),
+        'yalnızca sinyal': dict(options, tp_pct=None, sl_pct=None),
+        'kapanışla kontrol': dict(options, trail_pct=1.5, intrabar=False),
+    }
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        _, df = run_backtest(data, params)
+        arrays = (df['Close'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Open'].to_numpy(),
+                  df['signal'].to_numpy())
+
+        expected_equity, expected_records, expected_fees = simulate_arrays(*arrays, **options)
+        for compiled in ([False, True] if kernel_available() else [False]):
+            equity, records, fees = run_kernel(*arrays, **options, compiled=compiled)
+            assert np.allclose(equity, expected_equity, rtol=1e-12), (csv_file, compiled)
+            assert [(r[0], r[1], r[4]) for r in records] == [(r[0], r[1], r[4]) for r in expected_records], csv_file
+            assert np.isclose(fees, expected_fees, rtol=1e-12), (csv_file, compiled)
+        # engine='auto' Numba varken çekirdeği seçer; sonuç yine simulate_arrays ile aynı olmalı
+        auto_equity, _, _ = run_simulation(*arrays, **options)
+        assert np.allclose(auto_equity, expected_equity, rtol=1e-12), csv_file
+
+        line = f"{csv_file}: {len(df)} bar, simulate_arrays ile aynı"
+        trailing = variants['iz süren stop']
+        start = time.perf_counter()
+        ref_equity, ref_records, _ = run_kernel(*arrays, **trailing, compiled=False)
+        line += f" | saf Python {len(df) / (time.perf_counter() - start) / 1e6:.2f}M bar/s"
+        if kernel_available():
+            for name, variant in variants.items():
+                ref = run_kernel(*arrays, **variant, compiled=False)
+                fast = run_kernel(*arrays, **variant, compiled=True)
+                assert np.allclose(fast[0], ref[0], rtol=1e-12) and fast[1] == ref[1] \
+                    and np.isclose(fast[2], ref[2], rtol=1e-12), (csv_file, name)
+            start = time.perf_counter()
+            run_kernel(*arrays, **trailing, compiled=True)
+            line += f", derlenmiş {len(df) / (time.perf_counter() - start) / 1e6:.1f}M bar/s " \
+                    f"({len(variants)} kural birleşiminde referansla aynı)"
+        reasons = pd.Series([r[4] for r in ref_records]).value_counts().to_dict()
+        print(f"{line} | iz süren stop ile çıkışlar: {reasons}")
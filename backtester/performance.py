@@ -1,6 +1,150 @@
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
 import numpy as np
 
+@dataclass
+class PerformanceMetrics:
+    """
+    Bir backtestin sayısal performans ölçütleri.
+
+    Yüzde alanları (`*_pct`) yüzde biriminde tutulur (12.5 = %12.5).
+    Sharpe/Sortino işlem başına getirilerden hesaplanır ve yıllıklandırılmaz.
+    Seri alanları (equity, drawdown, trade_returns) her kapanan işlem için
+    bir eleman içerir.
+    """
+    initial_balance: float
+    final_balance: float
+    total_profit: float
+    profit_pct: float
+    total_trades: int
+    wins: int
+    losses: int
+    win_rate_pct: float
+    max_drawdown_pct: float
+    avg_trade_return_pct: float
+    sharpe: float
+    sortino: float
+    exposure_pct: float = float('nan')
+    equity: np.ndarray = field(default=None, repr=False)
+    drawdown: np.ndarray = field(default=None, repr=False)
+    trade_returns: np.ndarray = field(default=None, repr=False)
+
+    def scalars(self) -> dict:
+        """Seri alanları hariç tüm ölçütleri düz bir sözlük olarak döndürür (tablolar için)."""
+        values = asdict(self)
+        for key in ('equity', 'drawdown', 'trade_returns'):
+            values.pop(key)
+        return values
+
+    def without_series(self) -> 'PerformanceMetrics':
+        """Seri alanları atılmış bir kopya döndürür (süreçler arası taşıma için hafif)."""
+        values = self.scalars()
+        return PerformanceMetrics(**values)
+
+def _paired_trades(trades_df):
+    """Alım/satım fiyatlarını ve tarihlerini eşleştirir; kapanmamış son alım atılır."""
+    if len(trades_df) % 2 != 0:
+        trades_df = trades_df.iloc[:-1]
+    is_buy = (trades_df['type'] == 'BUY').to_numpy()
+    prices = trades_df['price'].to_numpy(dtype=float)
+    dates = trades_df['date'].to_numpy()
+    return prices[is_buy], prices[~is_buy], dates[is_buy], dates[~is_buy]
+
+def compute_metrics(trades_df, initial_balance, index=None) -> Optional[PerformanceMetrics]:
+    """
+    İşlem listesinden sayısal performans ölçütlerini NumPy kümülatif
+    işlemleriyle hesaplar.
+
+    Her işlemde bakiyenin tamamıyla alım yapıldığı varsayılır; bakiye
+    satış/alış oranlarının kümülatif çarpımıyla büyür.
+
+    Args:
+        trades_df (pd.DataFrame): 'date', 'type', 'price' sütunlu işlem listesi.
+        initial_balance (float): Başlangıç bakiyesi.
+        index (pd.DatetimeIndex): Verilirse test edilen dönemin bar indeksi;
+            pozisyonda geçen süre oranı (exposure) bunun üzerinden hesaplanır.
+
+    Returns:
+        PerformanceMetrics veya en az bir alım/satım çifti yoksa None.
+    """
+    if trades_df.empty or len(trades_df) < 2:
+        return None
+
+    buy_prices, sell_prices, buy_dates, sell_dates = _paired_trades(trades_df)
+    exposure = float('nan')
+    if index is not None and len(index) > 1:
+        span = (index[-1] - index[0]) / np.timedelta64(1, 's')
+        held = np.sum((sell_dates - buy_dates) / np.timedelta64(1, 's'))
+        exposure = held / span * 100 if span > 0 else float('nan')
+    return metrics_from_prices(buy_prices, sell_prices, initial_balance, exposure)
+
+def metrics_from_prices(buy_prices, sell_prices, initial_balance, exposure=float('nan')) -> PerformanceMetrics:
+    """
+    Eşleşmiş alım/satım fiyat dizilerinden ölçütleri hesaplar (bkz. compute_metrics).
+    Dizilerde en az bir işlem bulunmalıdır.
+    """
+    initial_balance = float(initial_balance)
+    growth = sell_prices / buy_prices
+    trade_returns = growth - 1.0
+    equity = initial_balance * np.cumprod(growth)
+    peak = np.maximum(np.maximum.accumulate(equity), initial_balance)
+    drawdown = (peak - equity) / peak
+
+    total_trades = growth.size
+    wins = int(np.count_nonzero(sell_prices > buy_prices))
+    losses = total_trades - wins
+    final_balance = float(equity[-1])
+    total_profit = final_balance - initial_balance
+
+    std = trade_returns.std(ddof=1) if total_trades > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(trade_returns, 0.0) ** 2))
+    mean_return = trade_returns.mean()
+
+    return PerformanceMetrics(
+        initial_balance=initial_balance,
+        final_balance=final_balance,
+        total_profit=total_profit,
+        profit_pct=total_profit / initial_balance * 100,
+        total_trades=total_trades,
+        wins=wins,
+        losses=losses,
+        win_rate_pct=wins / total_trades * 100,
+        max_drawdown_pct=float(drawdown.max()) * 100,
+        avg_trade_return_pct=float(mean_return) * 100,
+        sharpe=float(mean_return / std) if std > 0 else 0.0,
+        sortino=float(mean_return / downside) if downside > 0 else 0.0,
+        exposure_pct=exposure,
+        equity=equity,
+        drawdown=drawdown,
+        trade_returns=trade_returns,
+    )
+
+def format_performance(metrics: Optional[PerformanceMetrics]) -> dict:
+    """Sayısal ölçütleri raporlarda gösterilen Türkçe, biçimlendirilmiş sözlüğe çevirir."""
+    if metrics is None:
+        return {}
+    return {
+        "Başlangıç Bakiyesi": f"{metrics.initial_balance:.2f} USDT",
+        "Bitiş Bakiyesi": f"{metrics.final_balance:.2f} USDT",
+        "Toplam Kâr/Zarar": f"{metrics.total_profit:.2f} USDT",
+        "Kâr Yüzdesi": f"{metrics.profit_pct:.2f}%",
+        "Toplam İşlem Sayısı": metrics.total_trades,
+        "Kazanan İşlem Sayısı": metrics.wins,
+        "Kaybeden İşlem Sayısı": metrics.losses,
+        "Kazanma Oranı": f"{metrics.win_rate_pct:.2f}%",
+        "Maksimum Düşüş (Max Drawdown)": f"{metrics.max_drawdown_pct:.2f}%"
+    }
+
 def calculate_performance(trades_df, initial_balance):
+    """Performans raporunu biçimlendirilmiş metin değerleriyle döndürür (bkz. compute_metrics)."""
+    return format_performance(compute_metrics(trades_df, initial_balance))
+
+def _calculate_performance_loop(trades_df, initial_balance):
+    """
+    İşlemleri tek tek gezerek bakiyeyi hesaplayan eski uygulama; yalnızca
+    vektörel hesabın doğrulanması için tutulur.
+    """
     if trades_df.empty or len(trades_df) < 2:
         return {}
 
@@ -8,26 +152,26 @@ def calculate_performance(trades_df, initial_balance):
     peak_balance = float(initial_balance)
     max_drawdown = 0.0
     wins, losses = 0, 0
-    
+
     if len(trades_df) % 2 != 0:
         trades_df = trades_df.iloc[:-1]
 
     buy_prices = trades_df[trades_df['type'] == 'BUY']['price'].values
     sell_prices = trades_df[trades_df['type'] == 'SELL']['price'].values
-    
+
     for i in range(len(buy_prices)):
         buy_price = float(buy_prices[i])
         sell_price = float(sell_prices[i])
         quantity = balance / buy_price
         new_balance = quantity * sell_price
-        
+
         if new_balance > balance: wins += 1
         else: losses += 1
-            
+
         balance = new_balance
-        
+
         if balance > peak_balance: peak_balance = balance
-        
+
         drawdown = (peak_balance - balance) / peak_balance
         if drawdown > max_drawdown: max_drawdown = drawdown
 
@@ -36,7 +180,7 @@ def calculate_performance(trades_df, initial_balance):
     final_balance = balance
     total_profit = final_balance - initial_balance
     profit_percentage = (total_profit / initial_balance) * 100
-    
+
     return {
         "Başlangıç Bakiyesi": f"{initial_balance:.2f} USDT",
         "Bitiş Bakiyesi": f"{final_balance:.2f} USDT",
@@ -47,4 +191,26 @@ def calculate_performance(trades_df, initial_balance):
         "Kaybeden İşlem Sayısı": losses,
         "Kazanma Oranı": f"{win_rate:.2f}%",
         "Maksimum Düşüş (Max Drawdown)": f"{max_drawdown * 100:.2f}%"
-    }
\ No newline at end of file
+    }
+
+# Bu dosya doğrudan çalıştırıldığında vektörel hesabın eski döngüyle aynı
+# raporu ürettiğini paketteki CSV'ler üzerinde kontrol eder.
+if __name__ == "__main__":
+    import glob
+    import time
+    import pandas as pd
+    from backtester.backtest import run_backtest
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        trades, _ = run_backtest(data, params)
+        start = time.perf_counter()
+        expected = _calculate_performance_loop(trades, 1000)
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        metrics = compute_metrics(trades, 1000, index=data.index)
+        vector_time = time.perf_counter() - start
+        assert format_performance(metrics) == expected, (csv_file, format_performance(metrics), expected)
+        print(f"{csv_file}: aynı rapor | döngü {loop_time * 1000:.2f}ms, vektörel {vector_time * 1000:.2f}ms | "
+              f"Sharpe {metrics.sharpe:.3f}, Sortino {metrics.sortino:.3f}, pozisyonda %{metrics.exposure_pct:.1f}")
@@ -1,8 +1,11 @@
 import matplotlib.pyplot as plt
 
-def plot_results(df, trades_df, symbol):
+def plot_results(df, trades_df, symbol, save_path=None):
     """
     Fiyat, EMA'lar ve alım/satım noktalarını içeren bir grafik çizer.
+
+    save_path verilirse grafik pencere açılmadan bu dosyaya kaydedilir
+    (toplu/başsız çalıştırma için), aksi halde ekranda gösterilir.
     """
     plt.figure(figsize=(15, 7))
     plt.plot(df.index, df['Close'], label='Fiyat', color='blue', alpha=0.6)
@@ -23,4 +26,8 @@ def plot_results(df, trades_df, symbol):
     plt.ylabel('Fiyat (USDT)')
     plt.legend()
     plt.grid(True)
-    plt.show()
\ No newline at end of file
+    if save_path:
+        plt.savefig(save_path, dpi=100, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
\ No newline at end of file
@@ -0,0 +1,286 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from backtester.performance import PerformanceMetrics
+
+# İşlem kapanış nedenleri
+EXIT_SIGNAL, EXIT_TP, EXIT_SL = 'SIGNAL', 'TP', 'SL'
+
+# simulate_arrays/simulate_portfolio'nun komisyon, kayma ve pozisyon ayarları;
+# optimizasyon kombinasyonlarında bu anahtarlar stratejiye değil simülasyona gider
+SIMULATION_KEYS = ('fee_pct', 'slippage_pct', 'tp_pct', 'sl_pct', 'trail_pct', 'position_pct')
+
+@dataclass
+class PortfolioResult:
+    """
+    Bar bar portföy simülasyonunun sonucu.
+
+    equity: Her bar için piyasa değerine göre (mark-to-market) bakiye.
+    trades: Kapanan işlemler (giriş/çıkış barı, fiyatlar, neden, net getiri).
+    metrics: Bar seviyesindeki bakiye eğrisinden hesaplanan ölçütler.
+    """
+    equity: np.ndarray
+    trades: pd.DataFrame
+    metrics: Optional[PerformanceMetrics]
+    fees_paid: float
+
+def _first_true(mask) -> int:
+    """Boolean dizideki ilk True'nun konumu; yoksa -1."""
+    i = int(mask.argmax()) if mask.size else 0
+    return i if mask.size and mask[i] else -1
+
+def simulate_arrays(close, high, low, open_, signal, initial_balance=1000.0, fee_pct=0.1, slippage_pct=0.0,
+                    tp_pct=None, sl_pct=None, position_pct=100.0, intrabar=True):
+    """
+    Sinyal dizisinden bar bar portföy simülasyonu yapar.
+
+    Kurallar canlı botla aynıdır:
+      - 1 sinyalinde pozisyon yoksa barın kapanışından alım yapılır; TP/SL
+        seviyeleri giriş fiyatından `tp_pct`/`sl_pct` uzaklıkta kurulur.
+      - Sonraki barlarda önce TP, sonra SL kontrol edilir
+        (TospaBot._check_positions_for_tp_sl ile aynı sıra).
+      - -1 sinyalinde pozisyon barın kapanışından satılır.
+    Her dolumda `fee_pct` komisyon alınır; alımlar `slippage_pct` kadar pahalı,
+    satışlar o kadar ucuz gerçekleşir.
+
+    Döngü bar bar değil işlem işlem ilerler: her pozisyonun çıkış barı
+    NumPy aramalarıyla bulunur ve bakiye eğrisi dilimler halinde doldurulur.
+    Böylece maliyet bar sayısından çok işlem sayısıyla orantılıdır.
+
+    Args:
+        intrabar (bool): True ise TP/SL barın en yüksek/en düşük fiyatıyla
+            tetiklenir (seviyeden, açılış seviyeyi aştıysa açılıştan dolar);
+            False ise yalnızca kapanış fiyatı kontrol edilir.
+
+    Returns:
+        tuple: (bakiye dizisi, işlem kayıtları listesi, ödenen toplam komisyon)
+    """
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal)
+    n = close.size
+    fee = fee_pct / 100.0
+    slip = slippage_pct / 100.0
+    size = position_pct / 100.0
+    check_high = np.asarray(high, dtype=float) if intrabar else close
+    check_low = np.asarray(low, dtype=float) if intrabar else close
+    opens = np.asarray(open_, dtype=float) if intrabar else close
+
+    buy_bars = np.flatnonzero(signal == 1)
+    sell_bars = np.flatnonzero(signal == -1)
+    # Her alım sinyalinden sonraki ilk satış sinyali tek seferde bulunur
+    next_sell = np.append(sell_bars, n)[np.searchsorted(sell_bars, buy_bars, side='right')].tolist()
+    buy_list = buy_bars.tolist()
+
+    equity = np.empty(n, dtype=float)
+    cash = float(initial_balance)
+    fees_paid = 0.0
+    records = []
+    last_exit = -1
+    filled_until = 0
+
+    while True:
+        k = bisect_right(buy_list, last_exit)
+        if k >= len(buy_list):
+            break
+        entry = buy_list[k]
+
+        entry_fill = float(close[entry]) * (1 + slip)
+        invest = cash * size
+        quantity = invest * (1 - fee) / entry_fill
+        fees_paid += invest * fee
+        cash_after_entry = cash - invest
+        equity[filled_until:entry] = cash
+
+        # Çıkış, girişten sonraki ilk satış sinyaline kadar aranır. Aynı barda
+        # birden fazla koşul oluşursa öncelik TP, SL, sinyal sırasıyladır.
+        exit_bar = next_sell[k]
+        reason, exit_level = EXIT_SIGNAL, None
+        if sl_pct:
+            sl_price = entry_fill * (1 - sl_pct / 100)
+            hit = _first_true(check_low[entry + 1:exit_bar + 1] <= sl_price)
+            if hit >= 0:
+                exit_bar, reason = entry + 1 + hit, EXIT_SL
+                exit_level = min(sl_price, float(opens[exit_bar]))
+        if tp_pct:
+            tp_price = entry_fill * (1 + tp_pct / 100)
+            hit = _first_true(check_high[entry + 1:exit_bar + 1] >= tp_price)
+            if hit >= 0:
+                exit_bar, reason = entry + 1 + hit, EXIT_TP
+                exit_level = max(tp_price, float(opens[exit_bar]))
+
+        if exit_bar >= n:
+            # Veri sonunda açık kalan pozisyon yalnızca piyasa değeriyle gösterilir
+            equity[entry:] = cash_after_entry + quantity * close[entry:]
+            filled_until = n
+            break
+
+        if reason == EXIT_SIGNAL:
+            exit_level = float(close[exit_bar])
+        exit_fill = exit_level * (1 - slip)
+        gross = quantity * exit_fill
+        proceeds = gross * (1 - fee)
+        fees_paid += gross * fee
+        equity[entry:exit_bar] = cash_after_entry + quantity * close[entry:exit_bar]
+        records.append((entry, exit_bar, entry_fill, exit_fill, reason, quantity, proceeds / invest - 1 if invest else 0.0))
+        cash = cash_after_entry + proceeds
+        equity[exit_bar] = cash
+        filled_until = exit_bar + 1
+        last_exit = exit_bar
+
+    equity[filled_until:] = cash
+    return equity, records, fees_paid
+
+def run_simulation(close, high, low, open_, signal, trail_pct=None, engine='auto', **options):
+    """
+    Simülasyonu uygun motorla çalıştırır.
+
+    Args:
+        trail_pct (float): İz süren stop yüzdesi. Yola bağlı olduğu için
+            yalnızca bar bar çekirdekte (backtester.kernel) desteklenir.
+        engine (str): 'auto' derlenmiş çekirdek varsa onu, yoksa iz süren stop
+            istenmediği sürece simulate_arrays'i kullanır; 'arrays' ve 'kernel'
+            motoru zorlar.
+        options: simulate_arrays argümanları.
+
+    Returns:
+        tuple: (bakiye dizisi, işlem kayıtları listesi, ödenen toplam komisyon)
+    """
+    from backtester.kernel import kernel_available, run_kernel
+    if engine not in ('auto', 'arrays', 'kernel'):
+        raise ValueError(f"Bilinmeyen simülasyon motoru: '{engine}'. Seçenekler: auto, arrays, kernel")
+    if engine == 'arrays' and trail_pct:
+        raise ValueError("İz süren stop (trail_pct) yalnızca 'kernel' motoruyla kullanılabilir.")
+    if engine == 'kernel' or (engine == 'auto' and (trail_pct or kernel_available())):
+        return run_kernel(close, high, low, open_, signal, trail_pct=trail_pct, **options)
+    return simulate_arrays(close, high, low, open_, signal, **options)
+
+def simulate_portfolio(df, initial_balance=1000.0, fee_pct=0.1, slippage_pct=0.0, tp_pct=None, sl_pct=None,
+                       position_pct=100.0, intrabar=True, trail_pct=None, engine='auto') -> PortfolioResult:
+    """
+    run_backtest çıktısı olan DataFrame ('signal' ve OHLC sütunları) üzerinde
+    portföy simülasyonu yapar (bkz. simulate_arrays, run_simulation).
+    """
+    equity, records, fees_paid = run_simulation(
+        df['Close'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Open'].to_numpy(),
+        df['signal'].to_numpy(), initial_balance=initial_balance, fee_pct=fee_pct, slippage_pct=slippage_pct,
+        tp_pct=tp_pct, sl_pct=sl_pct, position_pct=position_pct, intrabar=intrabar, trail_pct=trail_pct,
+        engine=engine)
+
+    trades = pd.DataFrame(records, columns=['entry_bar', 'exit_bar', 'entry_price', 'exit_price', 'reason',
+                                            'quantity', 'return'])
+    if not trades.empty:
+        trades.insert(0, 'entry_date', df.index[trades['entry_bar'].to_numpy()])
+        trades.insert(1, 'exit_date', df.index[trades['exit_bar'].to_numpy()])
+    return PortfolioResult(equity=equity, trades=trades, metrics=portfolio_metrics(equity, trades, initial_balance),
+                           fees_paid=fees_paid)
+
+def portfolio_metrics(equity, trades, initial_balance) -> Optional[PerformanceMetrics]:
+    """Bar seviyesindeki bakiye eğrisinden ve kapanan işlemlerden ölçütleri hesaplar."""
+    if trades.empty:
+        return None
+    initial_balance = float(initial_balance)
+    returns = trades['return'].to_numpy(dtype=float)
+    peak = np.maximum(np.maximum.accumulate(equity), initial_balance)
+    drawdown = (peak - equity) / peak
+    wins = int(np.count_nonzero(returns > 0))
+    std = returns.std(ddof=1) if returns.size > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    mean_return = returns.mean()
+    in_market = np.sum(trades['exit_bar'].to_numpy() - trades['entry_bar'].to_numpy())
+    final_balance = float(equity[-1])
+    return PerformanceMetrics(
+        initial_balance=initial_balance,
+        final_balance=final_balance,
+        total_profit=final_balance - initial_balance,
+        profit_pct=(final_balance - initial_balance) / initial_balance * 100,
+        total_trades=int(returns.size),
+        wins=wins,
+        losses=int(returns.size) - wins,
+        win_rate_pct=wins / returns.size * 100,
+        max_drawdown_pct=float(drawdown.max()) * 100,
+        avg_trade_return_pct=float(mean_return) * 100,
+        sharpe=float(mean_return / std) if std > 0 else 0.0,
+        sortino=float(mean_return / downside) if downside > 0 else 0.0,
+        exposure_pct=in_market / equity.size * 100,
+        equity=equity,
+        drawdown=drawdown,
+        trade_returns=returns,
+    )
+
+def _simulate_loop(close, high, low, open_, signal, initial_balance=1000.0, fee_pct=0.1, slippage_pct=0.0,
+                   tp_pct=None, sl_pct=None, position_pct=100.0, intrabar=True):
+    """Aynı kuralların bar bar işleyen referans uygulaması; yalnızca doğrulama için tutulur."""
+    fee, slip, size = fee_pct / 100.0, slippage_pct / 100.0, position_pct / 100.0
+    if not intrabar:
+        high = low = open_ = close
+    cash, quantity, invest = float(initial_balance), 0.0, 0.0
+    in_position = False
+    equity, records = np.empty(len(close)), []
+    for i in range(len(close)):
+        if in_position and i > entry:
+            exit_level, reason = None, None
+            if tp_pct and high[i] >= tp_price:
+                exit_level, reason = max(tp_price, open_[i]), EXIT_TP
+            elif sl_pct and low[i] <= sl_price:
+                exit_level, reason = min(sl_price, open_[i]), EXIT_SL
+            elif signal[i] == -1:
+                exit_level, reason = close[i], EXIT_SIGNAL
+            if reason:
+                gross = quantity * exit_level * (1 - slip)
+                cash += gross * (1 - fee)
+                records.append((entry, i, reason, gross * (1 - fee) / invest - 1))
+                in_position, quantity = False, 0.0
+                equity[i] = cash
+                continue
+        elif not in_position and signal[i] == 1:
+            entry, entry_fill = i, close[i] * (1 + slip)
+            invest = cash * size
+            quantity = invest * (1 - fee) / entry_fill
+            cash -= invest
+            tp_price = entry_fill * (1 + tp_pct / 100) if tp_pct else None
+            sl_price = entry_fill * (1 - sl_pct / 100) if sl_pct else None
+            in_position = True
+        equity[i] = cash + quantity * close[i]
+    return equity, records
+
+# Bu dosya doğrudan çalıştırıldığında simülatörü bar bar referans döngüyle ve
+# komisyonsuz durumda performance.compute_metrics ile karşılaştırır.
+if __name__ == "__main__":
+    import glob
+    import time
+    from backtester.backtest import run_backtest
+    from backtester.performance import compute_metrics
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        trades, df = run_backtest(data, params)
+        arrays = (df['Close'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Open'].to_numpy(),
+                  df['signal'].to_numpy())
+
+        # Komisyon/TP/SL yokken kapanan işlemlerin bakiyesi eski hesapla aynı olmalı
+        plain = simulate_portfolio(df, fee_pct=0.0)
+        expected = compute_metrics(trades, 1000)
+        assert np.isclose(plain.metrics.final_balance if len(trades) % 2 == 0 else plain.trades['return'].add(1).prod() * 1000,
+                          expected.final_balance, rtol=1e-9), csv_file
+
+        options = dict(fee_pct=0.1, slippage_pct=0.05, tp_pct=2.0, sl_pct=1.0)
+        start = time.perf_counter()
+        equity, records, _ = simulate_arrays(*arrays, **options)
+        fast_time = time.perf_counter() - start
+        start = time.perf_counter()
+        ref_equity, ref_records = _simulate_loop(*arrays, **options)
+        loop_time = time.perf_counter() - start
+        assert np.allclose(equity, ref_equity, rtol=1e-12), csv_file
+        assert [(r[0], r[1], r[4]) for r in records] == [(r[0], r[1], r[2]) for r in ref_records], csv_file
+
+        result = simulate_portfolio(df, **options)
+        m = result.metrics
+        print(f"{csv_file}: {len(df)} bar, {m.total_trades} işlem | simülatör {fast_time * 1000:.1f}ms, "
+              f"referans döngü {loop_time * 1000:.0f}ms | kâr %{m.profit_pct:.2f}, bar bazlı max düşüş %{m.max_drawdown_pct:.2f} "
+              f"(kapanış bazlı %{expected.max_drawdown_pct:.2f}), komisyon {result.fees_paid:.2f} USDT, "
+              f"TP/SL/sinyal: {dict(result.trades['reason'].value_counts())}")
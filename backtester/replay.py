@@ -0,0 +1,405 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from binance.exceptions import BinanceAPIException
+
+from tospa.api.binance_client import RequestWeightLimiter, TospaBinanceClient
+from tospa.core.bot import TospaBot
+from tospa.core.config import Settings
+from tospa.strategies.warrior_turtle import WarriorTurtleStrategy
+
+# Aynı veri dosyasından türetilen her ek sembolün başladığı bar kayması;
+# kopyalar aynı anda aynı sinyali üretmesin diye farklı pencerelerden oynatılır
+CLONE_OFFSET_BARS = 500
+
+class SimulatedClock:
+    """Replay'in zaman kaynağı (milisaniye); yalnızca açıkça ilerletildiğinde değişir."""
+    def __init__(self, start_ms: int = 0):
+        self.ms = int(start_ms)
+
+    def set(self, ms: int):
+        if ms < self.ms:
+            raise ValueError("Simüle saat geri alınamaz.")
+        self.ms = int(ms)
+
+    def time(self) -> float:
+        return self.ms / 1000.0
+
+    def now(self) -> datetime:
+        """datetime.now() yerine kullanılır (yerel, saat dilimsiz)."""
+        return datetime.fromtimestamp(self.ms / 1000.0)
+
+class CountingLimiter(RequestWeightLimiter):
+    """
+    İstek ağırlığını beklemeden yalnızca sayar. Simüle saat gerçek zamandan
+    hızlı aktığı için gerçek dakika penceresi burada anlamsızdır; yük raporu
+    döngü başına ağırlıktan hesaplanır.
+    """
+    def __init__(self):
+        super().__init__(max_weight=0)
+        self.total_weight = 0
+        self.requests = 0
+
+    def acquire(self, weight: int):
+        with self._condition:
+            self.total_weight += weight
+            self.requests += 1
+
+    @property
+    def used_weight(self) -> int:
+        return self.total_weight
+
+def tick_path(open_: float, high: float, low: float, close: float, ticks: int) -> list:
+    """
+    Bir barın içini `ticks` eşit adımda örnekler. Fiyat yolu yükselen
+    barlarda açılış → dip → tepe → kapanış, düşenlerde açılış → tepe → dip →
+    kapanış kabul edilir; son adım her zaman kapanıştır.
+
+    Returns:
+        list: (fiyat, o ana kadarki en yüksek, o ana kadarki en düşük) demetleri.
+    """
+    path = (open_, low, high, close) if close >= open_ else (open_, high, low, close)
+    points = []
+    for j in range(1, ticks + 1):
+        position = 3.0 * j / ticks
+        segment = min(int(position), 2)
+        price = path[segment] + (path[segment + 1] - path[segment]) * (position - segment)
+        visited = path[:segment + 1] + (price,)
+        points.append((price, max(visited), min(visited)))
+    return points
+
+class SimulatedExchange:
+    """
+    python-binance `Client`ının botun kullandığı kısmını geçmiş mumlar
+    üzerinden taklit eden, tamamen bellekte çalışan borsa.
+
+    Her sembolün verisi kendi bar kaymasıyla (`offsets`) oynatılır. `move_to`
+    ile seçilen anda son mum henüz kapanmamıştır: o ana kadarki en yüksek/en
+    düşük fiyat ve o anki fiyatla döner. Piyasa emirleri anlık fiyattan
+    dolar; komisyon USDT olarak kesilir, bakiye yetmezse Binance'in
+    döndüreceği hata fırlatılır.
+    """
+    def __init__(self, frames: Dict[str, pd.DataFrame], clock: SimulatedClock, offsets: Dict[str, int] = None,
+                 initial_balance: float = 10000.0, fee_percent: float = 0.1, ticks_per_bar: int = 1):
+        self.clock = clock
+        self.fee_rate = fee_percent / 100.0
+        self.ticks_per_bar = max(1, int(ticks_per_bar))
+        self.balances = {'USDT': float(initial_balance)}
+        self.fills = []
+        self._lock = threading.Lock()
+        self._series = {}
+        for symbol, frame in frames.items():
+            # Binance mumları gibi milisaniye cinsinden açılış zamanları
+            open_time = frame.index.as_unit('ms').asi8 if isinstance(frame.index, pd.DatetimeIndex) \
+                else frame.index.to_numpy(dtype=np.int64)
+            self._series[symbol] = {
+                'open_time': open_time.astype(np.int64),
+                'ohlcv': frame[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float),
+                'offset': (offsets or {}).get(symbol, 0),
+                'bar_ms': int(np.median(np.diff(open_time[:1000]))) if len(open_time) > 1 else 60_000,
+            }
+        self._current = {}
+        self._paths = {}
+        self._bar = None
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._series)
+
+    def available_bars(self) -> int:
+        """Tüm sembollerin kaymalarından sonra ortak oynatılabilecek bar sayısı."""
+        return min(len(s['open_time']) - s['offset'] for s in self._series.values())
+
+    def move_to(self, bar: int, tick: int = None):
+        """Piyasayı `bar` numaralı barın `tick`. adımına (1..ticks_per_bar) taşır ve saati ilerletir."""
+        tick = tick or self.ticks_per_bar
+        if bar != self._bar:
+            self._paths = {symbol: tick_path(*series['ohlcv'][series['offset'] + bar, :4].tolist(), self.ticks_per_bar)
+                           for symbol, series in self._series.items()}
+            self._bar = bar
+        current = {}
+        for symbol, series in self._series.items():
+            index = series['offset'] + bar
+            price, high_so_far, low_so_far = self._paths[symbol][tick - 1]
+            current[symbol] = (index, price, high_so_far, low_so_far,
+                               series['ohlcv'][index, 4] * tick / self.ticks_per_bar)
+        first = next(iter(self._series.values()))
+        self.clock.set(first['open_time'][first['offset'] + bar] + first['bar_ms'] * tick // self.ticks_per_bar - 1)
+        self._current = current
+
+    def price(self, symbol: str) -> float:
+        return self._current[symbol][1]
+
+    def _symbol_error(self, symbol: str):
+        if symbol not in self._current:
+            raise BinanceAPIException(None, 400, json.dumps({"code": -1121, "msg": "Invalid symbol."}))
+
+    # --- python-binance Client arayüzü ---
+    def get_account(self) -> dict:
+        with self._lock:
+            return {'balances': [{'asset': asset, 'free': str(free), 'locked': '0.00000000'}
+                                 for asset, free in self.balances.items()]}
+
+    def get_asset_balance(self, asset: str) -> Optional[dict]:
+        with self._lock:
+            if asset not in self.balances:
+                return None
+            return {'asset': asset, 'free': str(self.balances[asset]), 'locked': '0.00000000'}
+
+    def get_symbol_ticker(self, symbol: str) -> dict:
+        self._symbol_error(symbol)
+        return {'symbol': symbol, 'price': str(self.price(symbol))}
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> list:
+        """Son `limit` mumu döndürür; istenen aralık yok sayılır, verinin kendi aralığı kullanılır."""
+        self._symbol_error(symbol)
+        series = self._series[symbol]
+        index, price, high, low, volume = self._current[symbol]
+        start = max(0, index - limit + 1)
+        bar_ms = series['bar_ms']
+        klines = [[int(series['open_time'][i]), str(o), str(h), str(l), str(c), str(v),
+                   int(series['open_time'][i]) + bar_ms - 1, "0", 0, "0", "0", "0"]
+                  for i, (o, h, l, c, v) in zip(range(start, index), series['ohlcv'][start:index].tolist())]
+        open_time = int(series['open_time'][index])
+        klines.append([open_time, str(series['ohlcv'][index, 0]), str(high), str(low), str(price), str(volume),
+                       open_time + bar_ms - 1, "0", 0, "0", "0", "0"])
+        return klines
+
+    def get_exchange_info(self) -> dict:
+        symbols = []
+        for symbol, series in self._series.items():
+            # Adım, bir adımın değeri ~0.1-1 USDT olacak şekilde fiyatın büyüklüğünden seçilir
+            reference = float(np.median(series['ohlcv'][:, 3]))
+            step = 10.0 ** int(np.floor(np.log10(1.0 / reference)))
+            symbols.append({'symbol': symbol, 'status': 'TRADING', 'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': '0.01000000'},
+                {'filterType': 'LOT_SIZE', 'minQty': f"{step:.8f}", 'stepSize': f"{step:.8f}"},
+                {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'},
+            ]})
+        return {'symbols': symbols}
+
+    def create_order(self, symbol: str, side: str, type: str, quantity: float) -> dict:
+        self._symbol_error(symbol)
+        price = self.price(symbol)
+        asset = re.sub(r'USDT$', '', symbol)
+        notional = quantity * price
+        fee = notional * self.fee_rate
+        with self._lock:
+            if side == "BUY":
+                if self.balances['USDT'] < notional + fee:
+                    raise BinanceAPIException(None, 400, json.dumps(
+                        {"code": -2010, "msg": "Account has insufficient balance for requested action."}))
+                self.balances['USDT'] -= notional + fee
+                self.balances[asset] = self.balances.get(asset, 0.0) + quantity
+            else:
+                if self.balances.get(asset, 0.0) < quantity * (1 - 1e-9):
+                    raise BinanceAPIException(None, 400, json.dumps(
+                        {"code": -2010, "msg": "Account has insufficient balance for requested action."}))
+                self.balances[asset] -= quantity
+                self.balances['USDT'] += notional - fee
+            self.fills.append({'time': self.clock.ms, 'symbol': symbol, 'side': side, 'quantity': quantity,
+                               'price': price, 'fee': fee})
+            order_id = len(self.fills)
+        return {'symbol': symbol, 'orderId': order_id, 'transactTime': self.clock.ms, 'status': 'FILLED',
+                'side': side, 'type': type, 'executedQty': str(quantity), 'cummulativeQuoteQty': str(notional)}
+
+    def equity(self) -> float:
+        """USDT bakiyesi ve açık varlıkların anlık fiyatla değeri."""
+        with self._lock:
+            value = self.balances['USDT']
+            for symbol in self._current:
+                value += self.balances.get(re.sub(r'USDT$', '', symbol), 0.0) * self.price(symbol)
+            return value
+
+class ReplayClient(TospaBinanceClient):
+    """Gerçek istemci kodunu simüle borsaya bağlayan TospaBinanceClient (ağ bağlantısı kurmaz)."""
+    def __init__(self, exchange: SimulatedExchange, rate_limiter: RequestWeightLimiter = None, pool_size: int = 10):
+        self.exchange = exchange
+        super().__init__(api_key="replay", api_secret="replay", testnet=False, rate_limiter=rate_limiter,
+                         pool_size=pool_size)
+
+    def _initialize_client(self):
+        self.client = self.exchange
+        self.is_ready = True
+        self.exchange_info.refresh()
+
+@dataclass
+class ReplayResult:
+    """Bir replay çalıştırmasının özeti."""
+    symbols: List[str]
+    bars: int
+    cycles: int
+    seconds: float
+    initial_balance: float
+    final_equity: float
+    fills: List[dict] = field(default_factory=list)
+    open_positions: Dict[str, dict] = field(default_factory=dict)
+    request_weight: int = 0
+    requests: int = 0
+    simulated_seconds: float = 0.0
+
+    @property
+    def symbol_bars(self) -> int:
+        return self.bars * len(self.symbols)
+
+    @property
+    def bars_per_second(self) -> float:
+        """Saniyede işlenen simüle bar sayısı (sembol x bar)."""
+        return self.symbol_bars / self.seconds if self.seconds > 0 else float('inf')
+
+    @property
+    def weight_per_cycle(self) -> float:
+        return self.request_weight / self.cycles if self.cycles else 0.0
+
+def load_replay_frames(files: List[str], n_symbols: int = None) -> tuple:
+    """
+    CSV dosyalarından replay sembollerini kurar. Sembol adı dosya adından
+    alınır (BTCUSDT_15m_....csv → BTCUSDT). `n_symbols` dosya sayısından
+    büyükse dosyalar sırayla tekrar kullanılır; kopyalar BTC2USDT gibi
+    adlandırılır ve CLONE_OFFSET_BARS kaydırılmış pencereden oynatılır.
+
+    Returns:
+        tuple: (sembol -> DataFrame, sembol -> bar kayması)
+    """
+    if not files:
+        raise ValueError("Replay için en az bir CSV dosyası gerekli.")
+    cache = {}
+    frames, offsets, seen = {}, {}, {}
+    for i in range(n_symbols or len(files)):
+        path = files[i % len(files)]
+        if path not in cache:
+            cache[path] = pd.read_csv(path, index_col=0, parse_dates=True)
+        base = os.path.basename(path).split('_')[0].upper()
+        copy = seen[base] = seen.get(base, 0) + 1
+        symbol = base if copy == 1 else f"{re.sub(r'USDT$', '', base)}{copy}USDT"
+        frames[symbol] = cache[path]
+        offsets[symbol] = (copy - 1) * CLONE_OFFSET_BARS
+    return frames, offsets
+
+class ReplaySession:
+    """
+    Simüle borsaya ve saate bağlanmış bir TospaBot.
+
+    Botun kendi `_check_positions_for_tp_sl` ve `_process_symbols`
+    (dolayısıyla `_process_symbol` / `_execute_trade`) metotları, gerçek
+    TospaBinanceClient kodu ve canlı strateji kullanılır; yalnızca borsa
+    (SimulatedExchange) ve saat (SimulatedClock) simüledir. Bağlam
+    yöneticisi (with) olarak kullanılmalıdır.
+
+    Args:
+        settings (Settings): Bot ayarları; hedef pariteler, mod ve canlı akış replay için ezilir.
+        data_dir (str): Pozisyon/işlem günlüğü ve log klasörü; verilmezse geçici klasör kullanılır.
+    """
+    def __init__(self, frames: Dict[str, pd.DataFrame], settings: Settings, offsets: Dict[str, int] = None,
+                 ticks_per_bar: int = 1, initial_balance: float = 10000.0, data_dir: str = None):
+        self.symbols = list(frames)
+        self.settings = settings.model_copy(update={'TARGET_PAIRS': self.symbols, 'IS_TEST_MODE': False,
+                                                    'USE_MARKET_DATA_STREAM': False, 'LOG_JSON_FILE': ''})
+        self.initial_balance = initial_balance
+        self.clock = SimulatedClock()
+        self.exchange = SimulatedExchange(frames, self.clock, offsets, initial_balance=initial_balance,
+                                          fee_percent=self.settings.BINANCE_FEE_PERCENT, ticks_per_bar=ticks_per_bar)
+        self.limiter = CountingLimiter()
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="tospa_replay_", ignore_cleanup_errors=True) if data_dir is None else None
+
+        # Pozisyonlar, işlem günlüğü ve activity.log canlı dosyalara değil replay klasörüne yazılır
+        data_dir = data_dir or self._temp_dir.name
+        self.bot = TospaBot(settings=self.settings, data_dir=data_dir, log_dir=data_dir)
+        self.bot.rate_limiter = self.limiter
+        self.bot.client = ReplayClient(self.exchange, rate_limiter=self.limiter,
+                                       pool_size=max(10, self.settings.ANALYSIS_WORKERS))
+        self.bot.strategy = WarriorTurtleStrategy(self.bot.client, self.settings)
+        self.bot.now = self.clock.now
+
+        # Strateji ilk analizde ısınma + 100 mum ister; oynatma o kadar geçmiş biriktikten sonra başlar
+        self.end_bar = self.exchange.available_bars()
+        self.start_bar = min(self.bot.strategy.model.warmup + 100, self.end_bar - 1)
+        self.cycles = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.bot._executor:
+            self.bot._executor.shutdown(wait=True)
+            self.bot._executor = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    def cycle(self, bar: int, tick: int = None):
+        """Piyasayı verilen ana taşır ve botun ana döngüsünün bir turunu (TP/SL, sonra analiz) çalıştırır."""
+        self.exchange.move_to(bar, tick)
+        self.bot._check_positions_for_tp_sl()
+        self.bot._process_symbols(self.symbols)
+        self.cycles += 1
+
+def run_replay(frames: Dict[str, pd.DataFrame], settings: Settings, offsets: Dict[str, int] = None,
+               bars: int = None, ticks_per_bar: int = 1, initial_balance: float = 10000.0,
+               data_dir: str = None, progress: Callable[[int, int], None] = None) -> ReplayResult:
+    """
+    TospaBot'u geçmiş veriler üzerinde uçtan uca çalıştırır (bkz. ReplaySession).
+    Her bar `ticks_per_bar` döngüye bölünür; fiyat bar içinde tick_path ile ilerler.
+
+    Args:
+        bars (int): Oynatılacak en fazla bar sayısı (ısınma barları hariç).
+        progress (callable): (tamamlanan bar, toplam bar) ile çağrılır.
+
+    Returns:
+        ReplayResult
+    """
+    with ReplaySession(frames, settings, offsets, ticks_per_bar=ticks_per_bar, initial_balance=initial_balance,
+                       data_dir=data_dir) as session:
+        start = session.start_bar
+        stop = session.end_bar if bars is None else min(session.end_bar, start + bars)
+        start_ms = None
+        started = time.perf_counter()
+        for bar in range(start, stop):
+            for tick in range(1, session.exchange.ticks_per_bar + 1):
+                session.cycle(bar, tick)
+                if start_ms is None:
+                    start_ms = session.clock.ms
+            if progress:
+                progress(bar - start + 1, stop - start)
+        seconds = time.perf_counter() - started
+
+        return ReplayResult(
+            symbols=session.symbols, bars=stop - start, cycles=session.cycles, seconds=seconds,
+            initial_balance=initial_balance, final_equity=session.exchange.equity(), fills=session.exchange.fills,
+            open_positions=dict(session.bot.open_positions), request_weight=session.limiter.total_weight,
+            requests=session.limiter.requests,
+            simulated_seconds=(session.clock.ms - (start_ms or session.clock.ms)) / 1000.0,
+        )
+
+def format_replay(result: ReplayResult, cycle_seconds: float = 30.0, weight_limit: int = 1200) -> str:
+    """
+    Replay özetini okunur metne çevirir. İstek yükü, botun gerçek döngü
+    aralığında (`cycle_seconds`) dakikada harcayacağı ağırlık olarak da verilir.
+    """
+    buys = sum(1 for fill in result.fills if fill['side'] == "BUY")
+    weight_per_minute = result.weight_per_cycle * 60.0 / cycle_seconds
+    lines = [
+        f"  Semboller: {len(result.symbols)} | Bar: {result.bars} | Döngü: {result.cycles}",
+        f"  Süre: {result.seconds:.2f}s | Simüle süre: {result.simulated_seconds / 86400:.1f} gün",
+        f"  Hız: {result.bars_per_second:,.0f} bar/s ({result.cycles / result.seconds:,.1f} döngü/s)"
+        if result.seconds > 0 else "  Hız: -",
+        f"  Emirler: {len(result.fills)} ({buys} alım, {len(result.fills) - buys} satım) | "
+        f"Açık pozisyon: {len(result.open_positions)}",
+        f"  Bakiye: {result.initial_balance:.2f} -> {result.final_equity:.2f} USDT "
+        f"({(result.final_equity / result.initial_balance - 1) * 100:+.2f}%)",
+        f"  İstek yükü: döngü başına {result.weight_per_cycle:.1f} ağırlık "
+        f"(~{weight_per_minute:.0f}/dk @ {cycle_seconds:.0f}s döngü, limit {weight_limit})",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,406 @@
+import itertools
+import json
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from backtester.performance import PerformanceMetrics
+
+def ema_order_constraint(params: dict) -> bool:
+    """Kısa EMA periyodu uzun EMA periyodundan küçük olmalıdır."""
+    if 'ema_short_period' in params and 'ema_long_period' in params:
+        return params['ema_short_period'] < params['ema_long_period']
+    return True
+
+def rsi_order_constraint(params: dict) -> bool:
+    """RSI alım seviyesi satım seviyesinden küçük olmalıdır."""
+    if 'rsi_buy_level' in params and 'rsi_sell_level' in params:
+        return params['rsi_buy_level'] < params['rsi_sell_level']
+    return True
+
+DEFAULT_CONSTRAINTS = (ema_order_constraint, rsi_order_constraint)
+
+class SearchSpace:
+    """
+    Ayrık parametre uzayı: her parametrenin denenecek değer listesi ve
+    kombinasyonların sağlaması gereken kısıtlar.
+
+    Kısıtlar kombinasyonlar değerlendirmeye gönderilmeden önce uygulanır;
+    kartezyen çarpım bellekte oluşturulmaz.
+    """
+    def __init__(self, grid: Dict[str, Sequence], constraints=DEFAULT_CONSTRAINTS):
+        self.names = list(grid)
+        self.values = [list(values) for values in grid.values()]
+        if any(not values for values in self.values):
+            raise ValueError("Her parametre için en az bir değer verilmelidir.")
+        self.constraints = list(constraints or [])
+
+    @property
+    def size(self) -> int:
+        """Kısıtlar uygulanmadan önceki toplam kombinasyon sayısı."""
+        return math.prod(len(values) for values in self.values)
+
+    def is_valid(self, params: dict) -> bool:
+        return all(constraint(params) for constraint in self.constraints)
+
+    def combo(self, index: int) -> dict:
+        """Karma tabanlı (mixed radix) sıra numarasını kombinasyona çevirir."""
+        params = {}
+        for name, values in zip(reversed(self.names), reversed(self.values)):
+            index, digit = divmod(index, len(values))
+            params[name] = values[digit]
+        return {name: params[name] for name in self.names}
+
+    def grid(self):
+        """Geçerli kombinasyonları ızgara sırasıyla üretir."""
+        for values in itertools.product(*self.values):
+            params = dict(zip(self.names, values))
+            if self.is_valid(params):
+                yield params
+
+    def count_valid(self) -> int:
+        return sum(1 for _ in self.grid())
+
+def combo_key(params: dict) -> str:
+    """Kombinasyonun sıralı JSON gösterimi (önbellek ve kontrol noktası anahtarı)."""
+    return json.dumps(params, sort_keys=True)
+
+@dataclass
+class Trial:
+    """Değerlendirilecek tek bir kombinasyon; `fraction` verinin kullanılacak son kısmıdır."""
+    params: dict
+    fraction: float = 1.0
+    result: Optional[dict] = None
+    score: float = float('-inf')
+
+@dataclass
+class Budget:
+    """
+    Arama bütçesi. `max_evals` tam veri eşdeğeri değerlendirme sayısıdır
+    (verinin üçte biriyle yapılan bir test 1/3 sayılır); `max_seconds` duvar
+    saati süresidir. İkisi de verilmezse strateji uzayı bitirene kadar çalışır.
+    """
+    max_evals: Optional[float] = None
+    max_seconds: Optional[float] = None
+
+    def exhausted(self, spent: float, started: float) -> bool:
+        if self.max_evals is not None and spent >= self.max_evals - 1e-9:
+            return True
+        return self.max_seconds is not None and time.perf_counter() - started >= self.max_seconds
+
+class SearchStrategy:
+    """
+    Arama stratejisi arayüzü (sor/bildir). `ask` değerlendirilecek denemeleri,
+    `tell` ise sonuçlarını alır; `ask` boş liste döndürünce arama biter.
+    """
+    name = ''
+
+    def start(self, space: SearchSpace, rng: random.Random):
+        self.space = space
+        self.rng = rng
+
+    def ask(self, n: int) -> List[Trial]:
+        raise NotImplementedError
+
+    def tell(self, trials: List[Trial]):
+        pass
+
+    def planned(self, space: SearchSpace) -> int:
+        """Bütçe verilmezse yapılacak tahmini deneme sayısı (ilerleme göstergesi için)."""
+        return space.count_valid() if space.size <= 1_000_000 else space.size
+
+class GridSearch(SearchStrategy):
+    """Tüm geçerli kombinasyonları sırayla dener."""
+    name = 'grid'
+
+    def start(self, space, rng):
+        super().start(space, rng)
+        self._combos = space.grid()
+
+    def ask(self, n):
+        return [Trial(params) for params in itertools.islice(self._combos, n)]
+
+class _RandomSampler:
+    """Uzaydan tekrarsız, kısıtları sağlayan rastgele kombinasyonlar çeker."""
+    def __init__(self, space: SearchSpace, rng: random.Random):
+        self.space = space
+        self.rng = rng
+        self.seen = set()
+        self._order = None
+
+    def mark(self, params: dict):
+        self.seen.add(combo_key(params))
+
+    def draw(self) -> Optional[dict]:
+        # Küçük uzaylarda karıştırılmış sıra, büyüklerde tekrar reddiyle örnekleme
+        if self._order is None and self.space.size <= 1_000_000:
+            self._order = list(range(self.space.size))
+            self.rng.shuffle(self._order)
+        if self._order is not None:
+            while self._order:
+                params = self.space.combo(self._order.pop())
+                if combo_key(params) not in self.seen and self.space.is_valid(params):
+                    self.mark(params)
+                    return params
+            return None
+        for _ in range(10_000):
+            params = self.space.combo(self.rng.randrange(self.space.size))
+            if combo_key(params) not in self.seen and self.space.is_valid(params):
+                self.mark(params)
+                return params
+        return None
+
+    def trials(self, n: int) -> List[Trial]:
+        trials = []
+        while len(trials) < n:
+            params = self.draw()
+            if params is None:
+                break
+            trials.append(Trial(params))
+        return trials
+
+class RandomSearch(SearchStrategy):
+    """Geçerli kombinasyonları tekrarsız, rastgele sırayla dener."""
+    name = 'random'
+
+    def start(self, space, rng):
+        super().start(space, rng)
+        self._sampler = _RandomSampler(space, rng)
+
+    def ask(self, n):
+        return self._sampler.trials(n)
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Ardışık yarılama: `n_candidates` rastgele kombinasyon önce verinin son
+    `min_fraction` kısmında test edilir; her turda en iyi 1/`eta` kadarı
+    `eta` kat daha uzun veriyle yeniden test edilir. Son tur tüm veriyi kullanır.
+    """
+    name = 'halving'
+
+    def __init__(self, n_candidates: int = 81, eta: int = 3, min_fraction: float = 1 / 9):
+        if eta < 2:
+            raise ValueError("eta en az 2 olmalıdır.")
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.fractions = []
+        fraction = min_fraction
+        while fraction < 1.0 - 1e-6:
+            self.fractions.append(round(fraction, 6))
+            fraction *= eta
+        self.fractions.append(1.0)
+
+    def start(self, space, rng):
+        super().start(space, rng)
+        candidates = _RandomSampler(space, rng).trials(self.n_candidates)
+        self._rung = 0
+        self._pending = [Trial(t.params, self.fractions[0]) for t in candidates]
+        self._finished = []
+
+    def ask(self, n):
+        if not self._pending and self._finished:
+            if self._rung + 1 >= len(self.fractions):
+                return []
+            # Tur bitti: en iyiler bir sonraki (daha uzun) veri dilimine terfi eder
+            self._rung += 1
+            ranked = sorted(self._finished, key=lambda t: t.score, reverse=True)
+            keep = ranked[:max(1, len(ranked) // self.eta)]
+            self._pending = [Trial(t.params, self.fractions[self._rung]) for t in keep
+                             if t.score > float('-inf')]
+            self._finished = []
+        batch, self._pending = self._pending[:n], self._pending[n:]
+        return batch
+
+    def tell(self, trials):
+        self._finished.extend(trials)
+
+    def planned(self, space):
+        total, count = 0, min(self.n_candidates, super().planned(space))
+        for _ in self.fractions:
+            total += count
+            count = max(1, count // self.eta)
+        return total
+
+class TPESearch(SearchStrategy):
+    """
+    Ağaç yapılı Parzen tahmincisi (TPE) tarzı Bayesçi arama.
+
+    İlk `n_startup` deneme rastgeledir. Sonrasında denemeler skora göre
+    iyi (en iyi `gamma` oranı) ve kötü olarak ikiye ayrılır; her parametre
+    için iki grubun değer dağılımları (Laplace düzeltmeli) çıkarılır. İyi
+    dağılımdan `n_samples` aday çekilir ve iyi/kötü olasılık oranı en
+    yüksek olanlar denenir.
+    """
+    name = 'tpe'
+
+    def __init__(self, n_startup: int = 10, gamma: float = 0.25, n_samples: int = 32):
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_samples = n_samples
+
+    def start(self, space, rng):
+        super().start(space, rng)
+        self._sampler = _RandomSampler(space, rng)
+        self._observed = []
+
+    def tell(self, trials):
+        self._observed.extend(t for t in trials if t.fraction >= 1.0)
+
+    def _densities(self, trials):
+        densities = []
+        for name, values in zip(self.space.names, self.space.values):
+            counts = [1.0] * len(values)
+            for trial in trials:
+                counts[values.index(trial.params[name])] += 1.0
+            total = sum(counts)
+            densities.append([c / total for c in counts])
+        return densities
+
+    def ask(self, n):
+        scored = [t for t in self._observed if t.score > float('-inf')]
+        if len(scored) < self.n_startup:
+            return self._sampler.trials(n)
+
+        ranked = sorted(scored, key=lambda t: t.score, reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good, bad = self._densities(ranked[:n_good]), self._densities(ranked[n_good:])
+
+        candidates = {}
+        for _ in range(self.n_samples * max(1, n)):
+            digits = [self.rng.choices(range(len(p)), weights=p)[0] for p in good]
+            params = {name: values[d] for name, values, d in zip(self.space.names, self.space.values, digits)}
+            key = combo_key(params)
+            if key in self._sampler.seen or key in candidates or not self.space.is_valid(params):
+                continue
+            ratio = sum(math.log(g[d] / b[d]) for g, b, d in zip(good, bad, digits))
+            candidates[key] = (ratio, params)
+
+        best = sorted(candidates.values(), key=lambda c: c[0], reverse=True)[:n]
+        trials = []
+        for _, params in best:
+            self._sampler.mark(params)
+            trials.append(Trial(params))
+        # İyi dağılım tükenmişse kalan yer rastgele adaylarla doldurulur
+        if len(trials) < n:
+            trials.extend(self._sampler.trials(n - len(trials)))
+        return trials
+
+STRATEGIES = {
+    GridSearch.name: GridSearch,
+    RandomSearch.name: RandomSearch,
+    SuccessiveHalving.name: SuccessiveHalving,
+    TPESearch.name: TPESearch,
+}
+
+def make_strategy(name: str, **kwargs) -> SearchStrategy:
+    """İsimden arama stratejisi oluşturur ('grid', 'random', 'halving', 'tpe')."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Bilinmeyen arama stratejisi: '{name}'. Seçenekler: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name](**kwargs)
+
+class SearchCheckpoint:
+    """
+    Değerlendirme sonuçlarını satır başına bir JSON nesnesi olarak diske
+    ekleyen kontrol noktası dosyası. Yarıda kesilen bir arama aynı dosyayla
+    yeniden başlatıldığında kayıtlı denemeler tekrar hesaplanmaz.
+
+    `run_id` veri ve sabit ayarları tanımlar; farklı bir çalıştırmaya ait
+    satırlar yok sayılır.
+    """
+    def __init__(self, path: str, run_id: str):
+        self.path = path
+        self.run_id = run_id
+        self.records = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # Kesinti sırasında yarım kalmış son satır
+                    if record.get('run') == run_id:
+                        self.records[(record['key'], record['fraction'])] = record
+
+    def get(self, trial: Trial) -> Optional[dict]:
+        """Kayıtlı sonucu evaluate_combo biçiminde döndürür; kayıt yoksa KeyError fırlatır."""
+        record = self.records[(combo_key(trial.params), trial.fraction)]
+        if not record['has_result']:
+            return None
+        metrics = PerformanceMetrics(**record['metrics']) if record['metrics'] else None
+        return {'params': record['params'], 'metrics': metrics}
+
+    def add(self, trials: List[Trial]):
+        lines = []
+        for trial in trials:
+            metrics = trial.result['metrics'] if trial.result else None
+            record = {
+                'run': self.run_id, 'key': combo_key(trial.params), 'fraction': trial.fraction,
+                'params': trial.params, 'has_result': trial.result is not None,
+                'metrics': metrics.scalars() if metrics else None,
+            }
+            self.records[(record['key'], trial.fraction)] = record
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+def run_search(space: SearchSpace, strategy: SearchStrategy, evaluate: Callable[[List[Trial]], List[Optional[dict]]],
+               score: Callable[[dict], float], budget: Optional[Budget] = None,
+               checkpoint: Optional[SearchCheckpoint] = None, batch_size: int = 1, seed: Optional[int] = None,
+               progress=None) -> List[Trial]:
+    """
+    Stratejiyi bütçe bitene ya da strateji aday üretmeyi bırakana kadar çalıştırır.
+
+    Args:
+        evaluate: Deneme listesini alıp her biri için evaluate_combo sonucunu
+            (veya None) aynı sırayla döndüren fonksiyon.
+        score: Bir sonucun skorunu hesaplayan fonksiyon (büyük olan iyidir).
+        batch_size: Tek seferde değerlendirmeye gönderilen deneme sayısı
+            (paralel işçiler için işçi sayısının birkaç katı seçilmelidir).
+        progress: `update(count)` metodu olan bir ilerleme göstergesi.
+
+    Returns:
+        list: Tüm veriyle (fraction=1) değerlendirilmiş denemeler.
+    """
+    budget = budget or Budget()
+    strategy.start(space, random.Random(seed))
+    started = time.perf_counter()
+    spent = 0.0
+    completed = []
+
+    while not budget.exhausted(spent, started):
+        n = batch_size
+        if budget.max_evals is not None:
+            n = max(1, min(n, int(math.ceil(budget.max_evals - spent))))
+        trials = strategy.ask(n)
+        if not trials:
+            break
+
+        # Kontrol noktasında bulunan denemeler yeniden hesaplanmaz
+        fresh = trials
+        if checkpoint:
+            fresh = []
+            for trial in trials:
+                try:
+                    trial.result = checkpoint.get(trial)
+                except KeyError:
+                    fresh.append(trial)
+        if fresh:
+            for trial, result in zip(fresh, evaluate(fresh)):
+                trial.result = result
+            if checkpoint:
+                checkpoint.add(fresh)
+
+        for trial in trials:
+            trial.score = score(trial.result) if trial.result is not None else float('-inf')
+            spent += trial.fraction
+        strategy.tell(trials)
+        completed.extend(t for t in trials if t.fraction >= 1.0)
+        if progress is not None:
+            progress.update(len(trials))
+
+    return completed
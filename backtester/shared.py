@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+class SharedFrame:
+    """
+    Bir OHLCV DataFrame'ini paylaşımlı bellekte (shared memory) tutar.
+
+    Veri, süreç havuzundaki işçilere bir kez paylaşılır; her görevde
+    DataFrame'in tamamı pickle'lanıp gönderilmez. İşçiler `spec` sözlüğü
+    ile `attach_frame` çağırarak kopyasız bir görünüm elde eder.
+
+    Bellek düzeni: ilk satır int64 zaman damgaları, diğer satırlar float64
+    sütunlardır; (sütun sayısı + 1) x satır sayısı boyutunda tek bir blok.
+    """
+    def __init__(self, df: pd.DataFrame):
+        columns = list(df.columns)
+        rows = len(df)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, (len(columns) + 1) * rows * 8))
+        block = np.ndarray((len(columns) + 1, rows), dtype=np.float64, buffer=self.shm.buf)
+        block[0].view(np.int64)[:] = df.index.values.view(np.int64)
+        for i, column in enumerate(columns, start=1):
+            block[i] = df[column].to_numpy(dtype=np.float64)
+        del block
+
+        self.spec = {
+            'name': self.shm.name,
+            'rows': rows,
+            'columns': columns,
+            'index_name': df.index.name,
+            'index_dtype': str(df.index.dtype),
+        }
+
+    def close(self):
+        """Paylaşımlı belleği kapatır ve sistemden siler."""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def attach_frame(spec: dict):
+    """
+    `SharedFrame.spec` ile tanımlanan paylaşımlı belleğe bağlanır.
+
+    Returns:
+        tuple: (DataFrame, SharedMemory). DataFrame'in sütunları paylaşımlı
+        belleğin üzerinde durur; SharedMemory nesnesi DataFrame kullanıldığı
+        sürece açık tutulmalıdır.
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    columns = spec['columns']
+    block = np.ndarray((len(columns) + 1, spec['rows']), dtype=np.float64, buffer=shm.buf)
+
+    index = pd.Index(block[0].view(np.int64).view(spec['index_dtype']), name=spec['index_name'])
+    # (sütun x satır) bloğun transpozu Fortran sıralıdır; pandas bunu kopyalamadan kullanır
+    df = pd.DataFrame(block[1:].T, index=index, columns=columns, copy=False)
+    return df, shm
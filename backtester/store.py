@@ -0,0 +1,217 @@
+import json
+import os
+import uuid
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join("data", "ohlcv")
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+# Eklenen segment sayısı bunu aşarsa depo tek dosya çiftine sıkıştırılır
+MAX_SEGMENTS = 32
+# write_store'un kendi doldurduğu meta alanları; geri kalanlar 'extra' sayılır
+_CORE_META_KEYS = {'version', 'rows', 'columns', 'index_name', 'index_dtype',
+                   'data_file', 'index_file', 'segments', 'source'}
+
+def store_path(name):
+    """Verilen isimli deponun klasör yolunu döndürür."""
+    return os.path.join(STORE_DIR, name)
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def read_meta(name):
+    """Deponun meta verisini okur; depo yoksa veya bozuksa None döner."""
+    meta_path = os.path.join(store_path(name), META_FILE)
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if meta.get('version') != FORMAT_VERSION:
+        return None
+    return meta
+
+def write_store(name, df, source=None, extra=None):
+    """
+    OHLCV DataFrame'ini sütunsal ikili formatta kaydeder.
+
+    Format: tek bir Fortran sıralı float64 matris (satır x sütun, .npy),
+    int64 zaman damgaları (.npy) ve küçük bir meta.json başlığı. Veri
+    dosyaları her yazımda yeni bir isimle oluşturulur; meta.json en son
+    ve atomik olarak değiştirilir. Böylece okuyucular her zaman tutarlı
+    bir dosya çiftini görür, yarım kalan bir yazım depoyu bozmaz.
+
+    Args:
+        source (str): Veri bir CSV'den dönüştürüldüyse o dosyanın yolu.
+            CSV değişirse depo bayat sayılır ve yeniden dönüştürülür.
+        extra (dict): meta.json'a eklenecek ek alanlar (örn. sembol, aralık).
+    """
+    directory = store_path(name)
+    os.makedirs(directory, exist_ok=True)
+
+    token = uuid.uuid4().hex[:12]
+    columns = list(df.columns)
+    data_file, index_file = _save_arrays(directory, token, df, columns)
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': len(df),
+        'columns': columns,
+        'index_name': df.index.name,
+        'index_dtype': str(df.index.dtype),
+        'data_file': data_file,
+        'index_file': index_file,
+        'source': _source_signature(source) if source else None,
+        **(extra or {}),
+    }
+    _replace_meta(directory, meta, token)
+    return meta
+
+def append_store(name, df, extra=None):
+    """
+    Mevcut depoya yalnızca yeni satırları ekler.
+
+    Yeni satırlar ayrı bir segment dosya çiftine yazılır ve meta.json'daki
+    'segments' listesine eklenir; mevcut veri dosyalarına dokunulmaz. Yazım
+    write_store gibi meta.json'ın atomik değişimiyle tamamlanır. Segment
+    sayısı MAX_SEGMENTS'i aşarsa depo tek dosya çiftine sıkıştırılır.
+
+    Returns:
+        dict: Yeni meta veri. Depo yoksa None (önce write_store kullanılmalıdır).
+    """
+    meta = read_meta(name)
+    if meta is None:
+        return None
+    if list(df.columns) != meta['columns']:
+        raise ValueError(f"'{name}' deposunun sütunları farklı: {meta['columns']} != {list(df.columns)}")
+    if df.empty:
+        return meta
+    directory = store_path(name)
+    stamps = df.index.values.astype(meta['index_dtype']).view(np.int64)
+    segments = list(meta.get('segments', []))
+    last_file = segments[-1]['index_file'] if segments else meta['index_file']
+    stored = np.load(os.path.join(directory, last_file), mmap_mode='r')
+    if np.any(np.diff(stamps) <= 0) or (len(stored) and stamps[0] <= stored[-1]):
+        raise ValueError(f"'{name}' deposuna yalnızca son kayıttan sonraki, sıralı satırlar eklenebilir.")
+
+    if len(segments) >= MAX_SEGMENTS:
+        combined = pd.concat([read_store(name, meta), df.set_axis(df.index.astype(meta['index_dtype']))])
+        kept = {key: value for key, value in meta.items() if key not in _CORE_META_KEYS}
+        return write_store(name, combined, extra={**kept, **(extra or {})})
+
+    token = uuid.uuid4().hex[:12]
+    data_file, index_file = _save_arrays(directory, token, df, meta['columns'], stamps)
+    segments.append({'data_file': data_file, 'index_file': index_file, 'rows': len(df)})
+    meta = {**meta, **(extra or {}), 'rows': meta['rows'] + len(df), 'segments': segments}
+    _replace_meta(directory, meta, token)
+    return meta
+
+def _save_arrays(directory, token, df, columns, stamps=None):
+    """Bir dosya çiftini (değer matrisi ve zaman damgaları) yeni isimlerle yazar."""
+    data_file, index_file = f"values-{token}.npy", f"index-{token}.npy"
+    np.save(os.path.join(directory, data_file), np.asfortranarray(df[columns].to_numpy(dtype=np.float64)))
+    np.save(os.path.join(directory, index_file), df.index.values.view(np.int64) if stamps is None else stamps)
+    return data_file, index_file
+
+def _replace_meta(directory, meta, token):
+    """meta.json'ı atomik olarak değiştirir ve artık başvurulmayan veri dosyalarını siler."""
+    tmp_meta = os.path.join(directory, f"{META_FILE}.{token}.tmp")
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_meta, os.path.join(directory, META_FILE))
+
+    keep = {meta['data_file'], meta['index_file'], META_FILE}
+    for segment in meta.get('segments', []):
+        keep.update((segment['data_file'], segment['index_file']))
+    _remove_unreferenced(directory, keep=keep)
+
+def _remove_unreferenced(directory, keep):
+    """Eski sürümlere ait veri dosyalarını siler (açık olanlar sonraki yazıma kalır)."""
+    for filename in os.listdir(directory):
+        if filename in keep or not filename.endswith(('.npy', '.tmp')):
+            continue
+        try:
+            os.remove(os.path.join(directory, filename))
+        except OSError:
+            pass
+
+def read_store(name, meta=None):
+    """
+    Depoyu bellek eşlemeli (memory-mapped) olarak açar.
+
+    Fiyat sütunları diskteki dosyanın üzerinde durur, kopyalanmaz; yalnızca
+    erişilen sayfalar belleğe alınır. Dönen DataFrame'in orijinal sütunları
+    salt okunurdur; yeni sütun eklemek serbesttir. Depoya append_store ile
+    segment eklendiyse parçalar tek bir bellek içi matriste birleştirilir
+    (bir sonraki sıkıştırmaya kadar).
+
+    Returns:
+        pd.DataFrame: Depo yoksa None.
+    """
+    meta = meta or read_meta(name)
+    if meta is None:
+        return None
+    directory = store_path(name)
+    try:
+        values = np.load(os.path.join(directory, meta['data_file']), mmap_mode='r')
+        timestamps = np.load(os.path.join(directory, meta['index_file']), mmap_mode='r')
+        segments = meta.get('segments', [])
+        if segments:
+            parts = [(np.load(os.path.join(directory, seg['data_file']), mmap_mode='r'),
+                      np.load(os.path.join(directory, seg['index_file']), mmap_mode='r')) for seg in segments]
+            values = np.asfortranarray(np.concatenate([values] + [v for v, _ in parts]))
+            timestamps = np.concatenate([timestamps] + [t for _, t in parts])
+    except (FileNotFoundError, ValueError):
+        return None
+
+    index = pd.Index(np.asarray(timestamps).view(meta['index_dtype']), name=meta['index_name'])
+    return pd.DataFrame(values, index=index, columns=meta['columns'], copy=False)
+
+def is_fresh(meta, source):
+    """Deponun, kaynak CSV dosyasının güncel haliyle oluşturulup oluşturulmadığını kontrol eder."""
+    recorded = meta.get('source')
+    if not recorded:
+        return True
+    if not os.path.exists(source):
+        return True
+    current = _source_signature(source)
+    return recorded['size'] == current['size'] and recorded['mtime_ns'] == current['mtime_ns']
+
+def load_csv_cached(csv_filename):
+    """
+    CSV dosyasını depo üzerinden yükler.
+
+    İlk çağrıda CSV ayrıştırılır ve ikili depoya dönüştürülür; sonraki
+    çağrılarda CSV hiç okunmadan depo bellek eşlemeli olarak açılır.
+    """
+    name = os.path.splitext(os.path.basename(csv_filename))[0]
+    meta = read_meta(name)
+    if meta is not None and is_fresh(meta, csv_filename):
+        df = read_store(name, meta)
+        if df is not None:
+            return df
+
+    df = pd.read_csv(csv_filename, index_col=0, parse_dates=True)
+    write_store(name, df, source=csv_filename)
+    print(f"'{csv_filename}' ikili depoya dönüştürüldü: {store_path(name)}")
+    return df
+
+# Bu dosya doğrudan çalıştırıldığında mevcut tüm CSV dosyalarını depoya dönüştürür.
+if __name__ == "__main__":
+    import glob
+    import time
+
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        start = time.perf_counter()
+        pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        csv_time = time.perf_counter() - start
+
+        load_csv_cached(csv_file)
+        start = time.perf_counter()
+        df = load_csv_cached(csv_file)
+        store_time = time.perf_counter() - start
+        print(f"{csv_file}: {len(df)} satır | CSV {csv_time * 1000:.1f} ms, depo {store_time * 1000:.2f} ms")
@@ -0,0 +1,105 @@
+import numpy as np
+
+from backtester.backtest import extract_trade_indices
+from backtester.performance import metrics_from_prices
+from tospa.strategies.indicators import ema_matrix, rsi_matrix, crossover_matrix
+
+# Tek seferde işlenen en fazla (kısa, uzun) çifti; bellek kullanımını sınırlar
+MAX_PAIRS_PER_PASS = 256
+
+def sweep_ema_grid(df, short_periods, long_periods, static_params=None, initial_balance=1000):
+    """
+    Tüm (kısa EMA, uzun EMA) çiftlerini run_backtest'i çift başına çağırmadan
+    birkaç dizi geçişiyle test eder.
+
+    EMA'lar ema_matrix ile tek geçişte, kesişimler ve sinyaller crossover_matrix
+    ile tüm çiftler için birlikte hesaplanır. Sinyaller seyrek olduğundan durum
+    makinesi her çiftin (bellekte bitişik) sinyal satırında extract_trade_indices
+    ile çalıştırılır. Kurallar ve ölçütler run_backtest + compute_metrics ile aynıdır.
+
+    Args:
+        static_params (dict): Sabit parametreler ('ema_trend_period',
+            'rsi_period', 'rsi_sell_level'); eksikler run_backtest varsayılanlarını alır.
+
+    Returns:
+        list: Geçerli (kısa < uzun) her çift için evaluate_combo biçiminde
+        {'params', 'metrics'} sözlükleri; hiç işlem üretmeyen çiftler atlanır.
+    """
+    static_params = static_params or {}
+    trend_period = static_params.get('ema_trend_period', 200)
+    rsi_period = static_params.get('rsi_period', 14)
+    rsi_sell_level = static_params.get('rsi_sell_level', 75)
+
+    close = df['Close'].to_numpy(dtype=np.float64)
+    short_periods, long_periods = list(short_periods), list(long_periods)
+    periods = sorted(set(short_periods) | set(long_periods) | {trend_period})
+    column = {period: i for i, period in enumerate(periods)}
+    emas = ema_matrix(close, periods)
+
+    uptrend = close > emas[:, column[trend_period]]
+    overbought = rsi_matrix(close, [rsi_period])[:, 0] > rsi_sell_level
+    slow = emas[:, [column[p] for p in long_periods]]
+
+    results = []
+    rows_per_pass = max(1, MAX_PAIRS_PER_PASS // len(long_periods))
+    for first in range(0, len(short_periods), rows_per_pass):
+        shorts = short_periods[first:first + rows_per_pass]
+        up, down = crossover_matrix(emas[:, [column[p] for p in shorts]], slow)
+        signals = np.zeros(up.shape, dtype=np.int8)
+        signals[up & uptrend] = 1
+        signals[down | overbought] = -1
+        signals = signals.reshape(-1, len(close))
+
+        pairs = [(s, l) for s in shorts for l in long_periods]
+        for row, (short, long) in enumerate(pairs):
+            if short >= long:
+                continue
+            buy_bars, sell_bars = extract_trade_indices(signals[row])
+            if buy_bars.size == 0:
+                continue
+            params = {'ema_short_period': short, 'ema_long_period': long}
+            if sell_bars.size == 0:
+                results.append({'params': params, 'metrics': None})
+                continue
+            metrics = metrics_from_prices(close[buy_bars[:sell_bars.size]], close[sell_bars], initial_balance)
+            results.append({'params': params, 'metrics': metrics.without_series()})
+    return results
+
+# Bu dosya doğrudan çalıştırıldığında tarama sonuçlarını çift çift
+# run_backtest + compute_metrics sonuçlarıyla karşılaştırır.
+if __name__ == "__main__":
+    import glob
+    import time
+    import pandas as pd
+    from backtester.backtest import run_backtest
+    from backtester.performance import compute_metrics
+    from tospa.strategies.indicators import IndicatorCache
+
+    shorts, longs = range(5, 16, 2), range(20, 41, 5)
+    static_params = {'ema_trend_period': 100, 'rsi_period': 14, 'rsi_sell_level': 75}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        start = time.perf_counter()
+        swept = {(r['params']['ema_short_period'], r['params']['ema_long_period']): r['metrics']
+                 for r in sweep_ema_grid(data, shorts, longs, static_params)}
+        sweep_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = {}
+        cache = IndicatorCache()
+        for s in shorts:
+            for l in longs:
+                if s < l:
+                    trades, _ = run_backtest(data, {'ema_short_period': s, 'ema_long_period': l, **static_params},
+                                             cache=cache)
+                    if not trades.empty:
+                        expected[(s, l)] = compute_metrics(trades, 1000)
+        loop_time = time.perf_counter() - start
+
+        assert swept.keys() == expected.keys(), csv_file
+        for pair, metrics in expected.items():
+            assert metrics.total_trades == swept[pair].total_trades, (csv_file, pair)
+            assert np.isclose(metrics.final_balance, swept[pair].final_balance, rtol=1e-9), (csv_file, pair)
+            assert np.isclose(metrics.max_drawdown_pct, swept[pair].max_drawdown_pct, rtol=1e-9), (csv_file, pair)
+        print(f"{csv_file}: {len(expected)} çift aynı sonuç | run_backtest döngüsü {loop_time:.3f}s, "
+              f"matris tarama {sweep_time:.3f}s")
@@ -0,0 +1,277 @@
+import os
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtester.performance import PerformanceMetrics
+from backtester.portfolio import SIMULATION_KEYS, run_simulation, portfolio_metrics
+from backtester.search import Budget, SearchSpace, make_strategy, run_search
+from backtester.shared import SharedFrame, attach_frame
+from tospa.strategies import indicators
+from tospa.strategies.registry import DEFAULT_STRATEGY, get_strategy
+
+# run_backtest ile aynı varsayılanlar
+DEFAULT_TREND_PERIOD = 200
+DEFAULT_RSI_PERIOD = 14
+DEFAULT_RSI_SELL_LEVEL = 75
+
+TRADE_COLUMNS = ['entry_bar', 'exit_bar', 'entry_price', 'exit_price', 'reason', 'quantity', 'return']
+
+# İşçi süreçlerin paylaşımlı indikatör tablosuna bağlandıktan sonra kullandığı durum
+_worker_state = {}
+
+@dataclass
+class Fold:
+    """Bir walk-forward katmanı: [train_start, train_end) eğitim, [test_start, test_end) test barları."""
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+def make_folds(n_bars: int, n_folds: int = 5, train_bars: Optional[int] = None, test_bars: Optional[int] = None,
+               anchored: bool = False) -> List[Fold]:
+    """
+    Seriyi kayan eğitim/test pencerelerine böler; her test penceresi kendi
+    eğitim penceresinin hemen ardından gelir ve test pencereleri üst üste binmez.
+
+    Args:
+        n_folds (int): `train_bars`/`test_bars` verilmezse pencereler, eğitim
+            penceresi testin üç katı olacak şekilde bu sayıya göre seçilir.
+        anchored (bool): True ise eğitim penceresi hep serinin başından başlar
+            (genişleyen pencere); False ise sabit uzunlukta kayar.
+    """
+    if test_bars is None:
+        test_bars = n_bars // (n_folds + 3)
+    if train_bars is None:
+        train_bars = 3 * test_bars
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("Eğitim ve test pencereleri en az bir bar içermelidir.")
+    if train_bars + test_bars > n_bars:
+        raise ValueError(f"{n_bars} bar, {train_bars} eğitim + {test_bars} test barı için yetersiz.")
+
+    folds = []
+    test_start = train_bars
+    while test_start + test_bars <= n_bars:
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append(Fold(len(folds), train_start, test_start, test_start, test_start + test_bars))
+        test_start += test_bars
+    return folds
+
+class IndicatorBank:
+    """
+    Parametre ızgarasında geçen tüm EMA/RSI periyotlarının tüm seri üzerinde
+    bir kez hesaplanmış dizileri.
+
+    Katmanlar bu dizilerin dilimleriyle test edilir; böylece indikatörler her
+    katman ve kombinasyon için yeniden hesaplanmaz ve her pencerenin ilk
+    barları da önceki verinin ısınmasından yararlanır (sinyaller, tüm seride
+    run_backtest'in ürettiği sinyallerle aynıdır).
+
+    Tablo varsayılan strateji (ema_trend_rsi) için kurulur. Parametrelerde
+    başka bir 'strategy' seçilmişse sinyaller o stratejinin compute yoluyla
+    tüm seri üzerinde hesaplanıp dilimlenir; indikatörler önbellekten paylaşılır.
+    """
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.cache = indicators.IndicatorCache()
+        self.arrays = {name: frame[name].to_numpy() for name in frame.columns}
+        self.close, self.high = self.arrays['Close'], self.arrays['High']
+        self.low, self.open = self.arrays['Low'], self.arrays['Open']
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, ema_periods: Sequence[int], rsi_periods: Sequence[int]) -> 'IndicatorBank':
+        close = df['Close']
+        columns = {name: df[name].to_numpy(dtype=float) for name in ('Open', 'High', 'Low', 'Close')}
+        for period in sorted(set(ema_periods)):
+            columns[f'ema_{period}'] = indicators.calculate_ema(close, period).to_numpy()
+        for period in sorted(set(rsi_periods)):
+            columns[f'rsi_{period}'] = indicators.calculate_rsi(close, period).to_numpy()
+        return cls(pd.DataFrame(columns, index=df.index))
+
+    @classmethod
+    def for_grid(cls, df: pd.DataFrame, grid: Dict[str, Sequence], static_params: dict) -> 'IndicatorBank':
+        """Izgara ve sabit parametrelerde geçen periyotlar için tabloyu kurar."""
+        def values(key, default):
+            if key in grid:
+                return list(grid[key])
+            return [static_params.get(key, default)]
+        ema = values('ema_short_period', None) + values('ema_long_period', None) + \
+            values('ema_trend_period', DEFAULT_TREND_PERIOD)
+        return cls.build(df, [p for p in ema if p is not None], values('rsi_period', DEFAULT_RSI_PERIOD))
+
+    def signal(self, params: dict, start: int, stop: int) -> np.ndarray:
+        """run_backtest ile aynı kurallarla [start, stop) barlarının sinyal dizisini üretir."""
+        name = params.get('strategy', DEFAULT_STRATEGY)
+        if name != DEFAULT_STRATEGY:
+            signal = get_strategy(name, **params).compute(self.frame, cache=self.cache)['signal']
+            return signal.to_numpy(dtype=np.int8)[start:stop]
+
+        arrays = self.arrays
+        lo = max(start - 1, 0) # Kesişim için pencereden önceki bar da gerekir
+        short = arrays[f"ema_{params['ema_short_period']}"][lo:stop]
+        long = arrays[f"ema_{params['ema_long_period']}"][lo:stop]
+        trend = arrays[f"ema_{params.get('ema_trend_period', DEFAULT_TREND_PERIOD)}"][lo:stop]
+        rsi = arrays[f"rsi_{params.get('rsi_period', DEFAULT_RSI_PERIOD)}"][lo:stop]
+        close = self.close[lo:stop]
+
+        buy_cross = np.zeros(short.size, dtype=bool)
+        sell_cross = np.zeros(short.size, dtype=bool)
+        buy_cross[1:] = (short[1:] > long[1:]) & (short[:-1] <= long[:-1])
+        sell_cross[1:] = (short[1:] < long[1:]) & (short[:-1] >= long[:-1])
+
+        signal = np.zeros(short.size, dtype=np.int8)
+        signal[buy_cross & (close > trend)] = 1
+        signal[sell_cross | (rsi > params.get('rsi_sell_level', DEFAULT_RSI_SELL_LEVEL))] = -1
+        return signal[start - lo:]
+
+    def simulate(self, params: dict, start: int, stop: int, initial_balance: float = 1.0,
+                 simulation: Optional[dict] = None):
+        """
+        [start, stop) barlarını portföy simülatörüyle test eder.
+
+        Returns:
+            tuple: (bakiye dizisi, işlem tablosu, PerformanceMetrics veya None)
+        """
+        options = dict(simulation or {})
+        options.setdefault('fee_pct', 0.0)
+        options.update({key: params[key] for key in SIMULATION_KEYS if key in params})
+        equity, records, _ = run_simulation(
+            self.close[start:stop], self.high[start:stop], self.low[start:stop], self.open[start:stop],
+            self.signal(params, start, stop), initial_balance=initial_balance, **options)
+        trades = pd.DataFrame(records, columns=TRADE_COLUMNS)
+        return equity, trades, portfolio_metrics(equity, trades, initial_balance)
+
+    def evaluate(self, params: dict, start: int, stop: int, initial_balance: float,
+                 simulation: Optional[dict] = None) -> Optional[dict]:
+        """evaluate_combo ile aynı biçimde sonuç döndürür; işlem yoksa None."""
+        _, trades, metrics = self.simulate(params, start, stop, initial_balance, simulation)
+        if trades.empty:
+            return None
+        return {'params': params, 'metrics': metrics.without_series()}
+
+@dataclass
+class WalkForwardResult:
+    """
+    folds: Katman başına eğitim/test aralıkları, seçilen parametreler ve skorlar.
+    equity: Test pencerelerinin uç uca eklenmiş örneklem dışı bakiye eğrisi.
+    metrics: Bu eğriden hesaplanan ölçütler.
+    """
+    folds: pd.DataFrame
+    equity: pd.Series
+    metrics: Optional[PerformanceMetrics]
+
+def optimize_fold(bank: IndicatorBank, fold: Fold, grid: Dict[str, Sequence], static_params: dict,
+                  initial_balance: float, score: Callable[[dict], float], simulation: Optional[dict] = None,
+                  search: str = 'grid', max_evals: Optional[float] = None, seed: Optional[int] = None) -> dict:
+    """
+    Bir katmanın eğitim penceresinde en iyi kombinasyonu arar ve onu test
+    penceresinde dener. Test bakiyesi 1'den başlatılır; katmanlar daha sonra
+    uç uca eklenirken ölçeklenir.
+    """
+    def evaluate(trials):
+        results = []
+        for trial in trials:
+            start = fold.train_end - max(1, int((fold.train_end - fold.train_start) * trial.fraction))
+            result = bank.evaluate({**trial.params, **static_params}, start, fold.train_end, initial_balance, simulation)
+            if result is not None:
+                result['params'] = trial.params
+            results.append(result)
+        return results
+
+    trials = run_search(SearchSpace(grid), make_strategy(search), evaluate, score,
+                        budget=Budget(max_evals=max_evals), seed=seed)
+    scored = [t for t in trials if t.result is not None]
+    row = {'fold': fold.index, 'train_start': fold.train_start, 'train_end': fold.train_end,
+           'test_start': fold.test_start, 'test_end': fold.test_end, 'evaluated': len(trials)}
+    if not scored:
+        return {'row': {**row, 'params': None}, 'equity': np.ones(fold.test_end - fold.test_start)}
+
+    best = max(scored, key=lambda t: t.score)
+    equity, trades, metrics = bank.simulate({**best.params, **static_params}, fold.test_start, fold.test_end,
+                                            1.0, simulation)
+    row.update(params=best.params, train_score=best.score,
+               train_profit_pct=best.result['metrics'].profit_pct if best.result['metrics'] else float('nan'),
+               test_profit_pct=(equity[-1] - 1.0) * 100, test_trades=len(trades),
+               test_max_drawdown_pct=metrics.max_drawdown_pct if metrics else 0.0)
+    return {'row': row, 'equity': equity, 'trades': trades}
+
+def _init_worker(spec, settings):
+    frame, shm = attach_frame(spec)
+    _worker_state.update(bank=IndicatorBank(frame), shm=shm, settings=settings)
+
+def _optimize_fold_in_worker(fold):
+    return optimize_fold(_worker_state['bank'], fold, **_worker_state['settings'])
+
+def run_walk_forward(df: pd.DataFrame, grid: Dict[str, Sequence], static_params: dict, initial_balance: float,
+                     score: Callable[[dict], float], folds: Optional[List[Fold]] = None, workers: Optional[int] = None,
+                     simulation: Optional[dict] = None, search: str = 'grid', max_evals: Optional[float] = None,
+                     seed: Optional[int] = None) -> WalkForwardResult:
+    """
+    Walk-forward optimizasyonu yapar.
+
+    İndikatörler tüm seri için bir kez hesaplanır (IndicatorBank) ve paylaşımlı
+    belleğe yazılır; katmanlar bir süreç havuzunda paralel optimize edilir.
+    Her katmanın test sonucu bir önceki katmanın bitiş bakiyesiyle
+    ölçeklenerek örneklem dışı bakiye eğrisi oluşturulur.
+
+    Args:
+        score: Bir sonucun skorunu hesaplayan, süreçler arası taşınabilir
+            (modül düzeyinde tanımlı) fonksiyon.
+        folds: Katmanlar; verilmezse make_folds(len(df)) kullanılır.
+        workers: İşçi süreç sayısı (varsayılan: tüm çekirdekler, katman sayısıyla sınırlı).
+    """
+    folds = folds if folds is not None else make_folds(len(df))
+    bank = IndicatorBank.for_grid(df, grid, static_params)
+    settings = dict(grid=grid, static_params=static_params, initial_balance=initial_balance, score=score,
+                    simulation=simulation, search=search, max_evals=max_evals, seed=seed)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(folds)))
+    if workers == 1:
+        outcomes = [optimize_fold(bank, fold, **settings) for fold in folds]
+    else:
+        with SharedFrame(bank.frame) as shared:
+            with Pool(workers, initializer=_init_worker, initargs=(shared.spec, settings)) as pool:
+                outcomes = pool.map(_optimize_fold_in_worker, folds, chunksize=1)
+
+    # Test pencereleri sırayla, her biri öncekinin bitiş bakiyesinden başlayarak eklenir
+    start, stop = folds[0].test_start, folds[-1].test_end
+    balance = float(initial_balance)
+    curves, trade_tables = [], []
+    for fold, outcome in zip(folds, outcomes):
+        curves.append(outcome['equity'] * balance)
+        balance = float(curves[-1][-1])
+        trades = outcome.get('trades')
+        if trades is not None and not trades.empty:
+            trades = trades.copy()
+            # Bar numaraları birleşik eğrinin başına göre yeniden sayılır
+            trades[['entry_bar', 'exit_bar']] += fold.test_start - start
+            trade_tables.append(trades)
+
+    equity = np.concatenate(curves)
+    trades = pd.concat(trade_tables, ignore_index=True) if trade_tables else pd.DataFrame(columns=TRADE_COLUMNS)
+    return WalkForwardResult(
+        folds=pd.DataFrame([outcome['row'] for outcome in outcomes]),
+        equity=pd.Series(equity, index=df.index[start:stop], name='equity'),
+        metrics=portfolio_metrics(equity, trades, initial_balance),
+    )
+
+# Bu dosya doğrudan çalıştırıldığında indikatör tablosundan üretilen sinyallerin
+# run_backtest sinyalleriyle aynı olduğunu paketteki CSV'ler üzerinde kontrol eder.
+if __name__ == "__main__":
+    import glob
+    from backtester.backtest import run_backtest
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        _, expected = run_backtest(data.copy(), params)
+        bank = IndicatorBank.build(data, [9, 21, 100], [14])
+        for fold in make_folds(len(data)):
+            for start, stop in ((fold.train_start, fold.train_end), (fold.test_start, fold.test_end)):
+                assert np.array_equal(bank.signal(params, start, stop),
+                                      expected['signal'].to_numpy()[start:stop]), (csv_file, start, stop)
+        print(f"{csv_file}: {len(data)} bar, katman sinyalleri run_backtest ile aynı")
@@ -0,0 +1,229 @@
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import matplotlib
+matplotlib.use("Agg") # Toplu çalıştırmada grafikler pencere açılmadan dosyaya çizilir
+
+import pandas as pd
+from binance.client import Client
+from backtester.data import fetch_historical_data, historical_csv_filename
+from backtester.store import load_csv_cached
+from backtester.backtest import run_backtest
+from backtester.performance import compute_metrics
+from optimizer import ProgressReporter
+from tospa.strategies.indicators import IndicatorCache
+
+# Komut satırında verilmeyen strateji parametreleri için varsayılanlar
+DEFAULT_PARAMS = {
+    'ema_short_period': 9,
+    'ema_long_period': 21,
+    'ema_trend_period': 100,
+    'rsi_period': 14,
+    'rsi_buy_level': 50,
+    'rsi_sell_level': 75,
+}
+
+# İşçi süreç başına yüklenmiş veri setleri ve indikatör önbellekleri
+_datasets = {}
+
+def parse_value(text):
+    """Komut satırı değerini int, float veya metin olarak yorumlar."""
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_param_grid(param_args, params_file=None):
+    """
+    Parametre matrisini kurar.
+
+    Args:
+        param_args (list): "anahtar=d1,d2,..." biçiminde değerler; her anahtarın
+            değerleri kartezyen çarpımla birleştirilir.
+        params_file (str): JSON dosyası. Ya {anahtar: [değerler]} ızgarası ya da
+            parametre sözlüklerinden oluşan bir liste olabilir.
+
+    Returns:
+        list: Varsayılanlarla tamamlanmış parametre sözlükleri.
+    """
+    if params_file:
+        with open(params_file, 'r') as f:
+            loaded = json.load(f)
+        if isinstance(loaded, list):
+            return [{**DEFAULT_PARAMS, **p} for p in loaded]
+        grid = {key: values if isinstance(values, list) else [values] for key, values in loaded.items()}
+    else:
+        grid = {}
+
+    for arg in param_args or []:
+        key, _, values = arg.partition('=')
+        if not values:
+            raise ValueError(f"Geçersiz parametre: '{arg}'. Beklenen biçim: anahtar=değer1,değer2")
+        grid[key.strip()] = [parse_value(v.strip()) for v in values.split(',')]
+
+    if not grid:
+        return [dict(DEFAULT_PARAMS)]
+    keys, values = zip(*grid.items())
+    return [{**DEFAULT_PARAMS, **dict(zip(keys, combo))} for combo in itertools.product(*values)]
+
+def build_jobs(symbols, intervals, start_date, param_sets, initial_balance, plot_dir=None):
+    """Sembol × aralık × parametre matrisinden iş listesini üretir; geçersiz EMA çiftleri atlanır."""
+    jobs = []
+    for symbol, interval in itertools.product(symbols, intervals):
+        for params in param_sets:
+            if params['ema_short_period'] >= params['ema_long_period']:
+                continue
+            jobs.append({
+                'job_id': len(jobs), 'symbol': symbol, 'interval': interval, 'start_date': start_date,
+                'params': params, 'initial_balance': initial_balance, 'plot_dir': plot_dir,
+            })
+    return jobs
+
+def prepare_datasets(jobs):
+    """
+    İşlerin ihtiyaç duyduğu verileri ana süreçte sırayla hazırlar.
+
+    Eksik veriler Binance'ten yalnızca bir kez indirilir; işçi süreçler daha
+    sonra aynı veriyi bellek eşlemeli depodan okur. Verisi alınamayan
+    sembol/aralık çiftlerinin işleri listeden çıkarılır.
+
+    Returns:
+        list: Verisi hazır olan işler.
+    """
+    unavailable = set()
+    for key in sorted({(j['symbol'], j['interval'], j['start_date']) for j in jobs}):
+        symbol, interval, start_date = key
+        try:
+            df = fetch_historical_data(symbol, start_date, interval=interval)
+        except Exception as e:
+            print(f"UYARI: {symbol} {interval} verisi alınamadı, bu işler atlanıyor: {e}")
+            unavailable.add(key)
+            continue
+        if df.empty:
+            print(f"UYARI: {symbol} {interval} için veri yok, bu işler atlanıyor.")
+            unavailable.add(key)
+    return [j for j in jobs if (j['symbol'], j['interval'], j['start_date']) not in unavailable]
+
+def _load_dataset(symbol, interval, start_date):
+    key = (symbol, interval, start_date)
+    if key not in _datasets:
+        df = load_csv_cached(historical_csv_filename(symbol, start_date, interval))
+        _datasets[key] = (df, IndicatorCache())
+    return _datasets[key]
+
+def run_job(job):
+    """
+    Tek bir backtest işini çalıştırır ve sonuç tablosunun bir satırını döndürür.
+    Hatalar satıra yazılır; bir işin hatası tüm toplu çalıştırmayı durdurmaz.
+    """
+    row = {'job_id': job['job_id'], 'symbol': job['symbol'], 'interval': job['interval'], **job['params']}
+    start = time.perf_counter()
+    try:
+        df, cache = _load_dataset(job['symbol'], job['interval'], job['start_date'])
+        trades, backtest_df = run_backtest(df, job['params'], cache=cache)
+        row['bars'] = len(df)
+        row['trades'] = len(trades)
+        metrics = compute_metrics(trades, job['initial_balance'], index=df.index) if not trades.empty else None
+        if metrics is not None:
+            row.update(metrics.scalars())
+
+        if job['plot_dir'] and not trades.empty:
+            from backtester.plotter import plot_results
+            title = f"{job['symbol']} {job['interval']} #{job['job_id']}"
+            path = os.path.join(job['plot_dir'], f"{job['symbol']}_{job['interval']}_{job['job_id']}.png")
+            plot_results(backtest_df, trades, title, save_path=path)
+            row['plot'] = path
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['seconds'] = round(time.perf_counter() - start, 4)
+    return row
+
+def run_batch(jobs, workers=None):
+    """
+    İşleri bir süreç havuzunda paralel çalıştırır.
+
+    Returns:
+        pd.DataFrame: İş sırasına göre sıralanmış birleşik sonuç tablosu.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    print(f"{len(jobs)} backtest işi {workers} işçi süreç ile çalıştırılıyor...")
+    progress = ProgressReporter(len(jobs))
+    rows = []
+    if workers == 1:
+        for job in jobs:
+            rows.append(run_job(job))
+            progress.update()
+    else:
+        with Pool(workers) as pool:
+            for row in pool.imap_unordered(run_job, jobs):
+                rows.append(row)
+                progress.update()
+    return pd.DataFrame(rows).sort_values('job_id').reset_index(drop=True)
+
+def parquet_available():
+    """pandas'ın Parquet yazabilmesi için gereken motorlardan biri kurulu mu?"""
+    return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+
+def write_results(results, output):
+    """
+    Sonuç tablosunu dosya uzantısına göre CSV veya Parquet olarak yazar.
+    Parquet motoru yoksa hesaplanan sonuçlar kaybolmasın diye aynı isimle CSV yazılır.
+    """
+    if output.endswith('.parquet'):
+        try:
+            results.to_parquet(output, index=False)
+        except ImportError:
+            output = os.path.splitext(output)[0] + ".csv"
+            print("UYARI: Parquet motoru ('pyarrow' veya 'fastparquet') bulunamadı, CSV yazılıyor.")
+            results.to_csv(output, index=False)
+    else:
+        results.to_csv(output, index=False)
+    print(f"Sonuçlar '{output}' dosyasına yazıldı ({len(results)} satır).")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çoklu sembol / zaman aralığı / parametre toplu backtest")
+    parser.add_argument('--symbols', nargs='+', default=["BTCUSDT", "ETHUSDT", "SOLUSDT"])
+    parser.add_argument('--intervals', nargs='+', default=[Client.KLINE_INTERVAL_15MINUTE, Client.KLINE_INTERVAL_1HOUR])
+    parser.add_argument('--start', default="1 Jan, 2024", help="Veri başlangıç tarihi (örn. \"1 Jan, 2024\")")
+    parser.add_argument('--param', action='append', default=[], metavar="ANAHTAR=D1,D2",
+                        help="Parametre değerleri, örn. --param ema_short_period=9,12 (tekrarlanabilir)")
+    parser.add_argument('--params-file', default=None, help="Parametre ızgarası veya listesi içeren JSON dosyası")
+    parser.add_argument('--initial-balance', type=float, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help="İşçi süreç sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument('--output', default="batch_results.csv", help="Sonuç dosyası (.csv veya .parquet)")
+    parser.add_argument('--plots', default=None, metavar="KLASÖR", help="Verilirse her işin grafiği bu klasöre PNG olarak kaydedilir")
+    args = parser.parse_args(argv)
+    # Eksik Parquet motoru tüm işler bittikten sonra değil, başlamadan önce bildirilsin
+    if args.output.endswith('.parquet') and not parquet_available():
+        parser.error("Parquet çıktısı için 'pyarrow' veya 'fastparquet' paketi gerekli (ya da .csv çıktı verin).")
+
+    param_sets = parse_param_grid(args.param, args.params_file)
+    jobs = build_jobs(args.symbols, args.intervals, args.start, param_sets, args.initial_balance, args.plots)
+    if not jobs:
+        print("Çalıştırılacak geçerli bir iş yok (kısa EMA periyodu uzun EMA periyodundan küçük olmalı).")
+        return
+    if args.plots:
+        os.makedirs(args.plots, exist_ok=True)
+
+    jobs = prepare_datasets(jobs)
+    if not jobs:
+        print("Hiçbir iş için veri bulunamadı.")
+        return
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.workers)
+    print(f"Toplam süre: {time.perf_counter() - start:.2f}s")
+
+    failed = results['error'].notna().sum() if 'error' in results else 0
+    if failed:
+        print(f"UYARI: {failed} iş hata ile sonuçlandı (ayrıntılar 'error' sütununda).")
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError: # Windows'ta yok; en yüksek RSS raporlanmaz
+    resource = None
+
+# Kaydedilen ölçümlerin varsayılan yeri
+BENCHMARK_DIR = "benchmarks"
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Paketteki CSV'ler: (sembol, aralık, fetch_historical_data başlangıç metni)
+BUNDLED_DATASETS = [
+    ("BTCUSDT", "15m", "1 Jan, 2024"),
+    ("ETHUSDT", "15m", "1 Jan, 2024"),
+    ("SOLUSDT", "15m", "1 Jan, 2024"),
+    ("ETHUSDT", "1h", "1"),
+    ("SOLUSDT", "1h", "1"),
+]
+
+BACKTEST_PARAMS = {
+    'ema_short_period': 9,
+    'ema_long_period': 21,
+    'ema_trend_period': 100,
+    'rsi_period': 14,
+    'rsi_buy_level': 50,
+    'rsi_sell_level': 75,
+}
+
+# Sabit boyutlu optimizasyon ızgarası (9 kombinasyon, tek süreç)
+OPTIMIZER_GRID = {'ema_short_period': [5, 9, 13], 'ema_long_period': [20, 30, 40]}
+
+BOT_CYCLE_SYMBOLS = 10
+# bot_cycle her çağrıda yeni bir oturumla aynı bar penceresini oynatır; iş yükü sabittir
+BOT_CYCLE_BARS = 300
+
+# Süre farkı eşiğe ek olarak referans ve güncel ölçümlerin sapmasının bu katını
+# da aşmadıkça gerileme sayılmaz (tek tekrarın gürültüsü eşiği kolayca aşar)
+NOISE_STDEVS = 3
+
+# Bellek ayırımı, yüzde eşiğine ek olarak en az bu kadar artmadıkça gerileme sayılmaz
+# (tek çağrının ayırımı küçük senaryolarda, örn. emir verilen bot turlarında, oynaktır)
+ALLOC_TOLERANCE_MB = 0.5
+
+def _load(symbol, interval, start="1 Jan, 2024"):
+    from backtester.data import fetch_historical_data
+    return fetch_historical_data(symbol, start, interval=interval)
+
+# --- Ölçülen senaryolar ---
+# Her fonksiyon hazırlığı yapar ve ölçülecek argümansız fonksiyonu döndürür.
+
+def bench_load_csv():
+    """fetch_historical_data ile paketteki tüm CSV'leri yükler (ilk çağrıdan sonra depo yolu)."""
+    return lambda: [_load(symbol, interval, start) for symbol, interval, start in BUNDLED_DATASETS]
+
+def bench_backtest_15m():
+    """run_backtest, BTCUSDT 15m (61 bin bar)."""
+    from backtester.backtest import run_backtest
+    df = _load("BTCUSDT", "15m")
+    return lambda: run_backtest(df, BACKTEST_PARAMS)
+
+def bench_backtest_1h():
+    """run_backtest, ETHUSDT 1h (24 bin bar)."""
+    from backtester.backtest import run_backtest
+    df = _load("ETHUSDT", "1h", "1")
+    return lambda: run_backtest(df, BACKTEST_PARAMS)
+
+def bench_performance():
+    """calculate_performance, BTCUSDT 15m backtestinin işlemleri."""
+    from backtester.backtest import run_backtest
+    from backtester.performance import calculate_performance
+    trades, _ = run_backtest(_load("BTCUSDT", "15m"), BACKTEST_PARAMS)
+    return lambda: calculate_performance(trades, 1000)
+
+def bench_optimizer_grid():
+    """optimizer.search_combinations, SOLUSDT 15m üzerinde 3x3 EMA ızgarası (tek süreç)."""
+    from optimizer import search_combinations
+    df = _load("SOLUSDT", "15m")
+    static_params = {key: value for key, value in BACKTEST_PARAMS.items() if key not in OPTIMIZER_GRID}
+    return lambda: search_combinations(df, OPTIMIZER_GRID, static_params, 1000, workers=1)
+
+def bench_calculate_ema():
+    """calculate_ema(21), önbelleksiz, BTCUSDT 15m kapanışları."""
+    from tospa.strategies.indicators import calculate_ema
+    close = _load("BTCUSDT", "15m")['Close']
+    return lambda: calculate_ema(close, 21)
+
+def bench_calculate_sma():
+    """calculate_sma(50), önbelleksiz, BTCUSDT 15m kapanışları."""
+    from tospa.strategies.indicators import calculate_sma
+    close = _load("BTCUSDT", "15m")['Close']
+    return lambda: calculate_sma(close, 50)
+
+def bench_bot_cycle():
+    """Simüle borsaya bağlı TospaBot, yeni oturumla aynı 300 barı oynatır (TP/SL kontrolü ve tüm sembollerin analizi)."""
+    from backtester.replay import ReplaySession, load_replay_frames
+    from tospa.core.config import Settings
+    frames, offsets = load_replay_frames(sorted(glob.glob("*USDT_*.csv")), BOT_CYCLE_SYMBOLS)
+    settings = Settings(_env_file=None, LOG_LEVELS={'tospa': 'WARNING'}, LOG_ASYNC=False)
+
+    def replay_window():
+        # Her çağrı aynı başlangıç durumundan aynı barları oynatır; böylece sinyaller,
+        # emirler ve ayırımlar timeit'in seçtiği çağrı sayısından bağımsızdır
+        with ReplaySession(frames, settings, offsets) as session:
+            for bar in range(session.start_bar, min(session.start_bar + BOT_CYCLE_BARS, session.end_bar)):
+                session.cycle(bar)
+    return replay_window
+
+BENCHMARKS = {
+    'load_csv': bench_load_csv,
+    'backtest_15m': bench_backtest_15m,
+    'backtest_1h': bench_backtest_1h,
+    'performance': bench_performance,
+    'optimizer_grid': bench_optimizer_grid,
+    'calculate_ema': bench_calculate_ema,
+    'calculate_sma': bench_calculate_sma,
+    'bot_cycle': bench_bot_cycle,
+}
+
+def _peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (MB); ölçülemiyorsa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kilobayt, macOS bayt döndürür
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def measure(name, repeat=5):
+    """
+    Bir senaryoyu ölçer. Süre timeit ile ölçülür: çağrı sayısı her tekrar en
+    az 0.2 saniye sürecek şekilde seçilir ve tekrarların çağrı başına süreleri
+    raporlanır. Ayrıca tek bir çağrının tracemalloc ile en yüksek bellek
+    ayırımı ve sürecin en yüksek RSS'i ölçülür.
+    """
+    # Ölçülen kod ilerleme mesajları basıyor; ölçüme ve çıktıya karışmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        func = BENCHMARKS[name]()
+        func() # Isınma: önbellekler, depo dönüştürme, ilk import'lar
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        func()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'number': number,
+        'repeat': repeat,
+        'alloc_peak_mb': alloc_peak / (1024 * 1024),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def _measure_quietly(name, repeat):
+    # Bot gibi log sistemini kuran senaryoların logları ölçüm çıktısına karışmasın
+    logging.disable(logging.WARNING)
+    return measure(name, repeat)
+
+def run_benchmarks(names, repeat=5):
+    """
+    Senaryoları sırayla ölçer. Her senaryo yeni bir süreçte çalışır; böylece
+    en yüksek RSS yalnızca o senaryoyu yansıtır ve önceki senaryoların
+    önbellekleri sonucu etkilemez.
+    """
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(_measure_quietly, name, repeat).result()
+        print(f"  {name:<16} {format_seconds(results[name]['median']):>10}")
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    """Sonuçların karşılaştırılabilirliği için ortam bilgisi."""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def save_results(path, results):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=4)
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+def _format_mb(value):
+    return "-" if value is None else f"{value:.1f}MB"
+
+def print_results(results):
+    print(f"\n{'Senaryo':<16} {'Medyan':>10} {'En iyi':>10} {'Sapma':>8} {'Ayırım':>10} {'En yüksek RSS':>14}")
+    for name, r in results.items():
+        deviation = r['stdev'] / r['mean'] * 100 if r['mean'] else 0.0
+        print(f"{name:<16} {format_seconds(r['median']):>10} {format_seconds(r['min']):>10} {deviation:>7.1f}% "
+              f"{_format_mb(r['alloc_peak_mb']):>10} {_format_mb(r['peak_rss_mb']):>14}")
+
+def _noise_percent(before, now):
+    """İki ölçümün tekrarlar arası sapmasından türetilen gürültü payı (referans en iyi süresine göre yüzde)."""
+    spread = max(before.get('stdev', 0.0), now.get('stdev', 0.0))
+    return NOISE_STDEVS * spread / before['min'] * 100 if before['min'] else 0.0
+
+def compare_results(baseline, current, threshold=10.0):
+    """
+    İki ölçüm kümesini karşılaştırır. Süreler, tekrarların en iyisi (min)
+    üzerinden karşılaştırılır; medyan gibi arka plan yükünden etkilenmez.
+    En iyi süresi hem `threshold` yüzdesinden hem de gürültü payından
+    (referans ve güncel sapmanın NOISE_STDEVS katı) fazla artan ya da en
+    yüksek bellek ayırımı hem bu yüzdeden hem ALLOC_TOLERANCE_MB'den fazla
+    artan senaryolar gerileme sayılır.
+
+    Returns:
+        list: Gerileyen senaryo adları.
+    """
+    regressions = []
+    print(f"\n{'Senaryo':<16} {'Referans':>10} {'Şimdi':>10} {'Süre':>9} {'Gürültü':>9} {'Ayırım':>9}  Durum")
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<16} {'-':>10} {format_seconds(now['min']):>10} {'':>9} {'':>9} {'':>9}  yeni")
+            continue
+        time_change = (now['min'] / before['min'] - 1) * 100
+        margin = max(threshold, _noise_percent(before, now))
+        alloc_change = (now['alloc_peak_mb'] / before['alloc_peak_mb'] - 1) * 100 if before['alloc_peak_mb'] else 0.0
+        alloc_regressed = alloc_change > threshold and \
+            now['alloc_peak_mb'] - before['alloc_peak_mb'] > ALLOC_TOLERANCE_MB
+        if time_change > margin or alloc_regressed:
+            status = "GERİLEME"
+            regressions.append(name)
+        elif time_change < -margin:
+            status = "iyileşme"
+        else:
+            status = "aynı"
+        print(f"{name:<16} {format_seconds(before['min']):>10} {format_seconds(now['min']):>10} "
+              f"{time_change:>+8.1f}% {margin:>8.1f}% {alloc_change:>+8.1f}%  {status}")
+    return regressions
+
+def _select(names):
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Bilinmeyen senaryo: {', '.join(unknown)}. Seçenekler: {', '.join(BENCHMARKS)}")
+    return names or list(BENCHMARKS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtester, optimizasyon ve bot döngüsü performans ölçümleri")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Senaryoları ölçer")
+    run_parser.add_argument('names', nargs='*', help="Ölçülecek senaryolar (varsayılan: hepsi)")
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, default=None, metavar="DOSYA",
+                            help=f"Sonuçları referans olarak kaydet (varsayılan: {DEFAULT_BASELINE})")
+
+    compare_parser = commands.add_parser('compare', help="Referansla karşılaştırır; gerileme varsa 1 ile çıkar")
+    compare_parser.add_argument('names', nargs='*', help="Karşılaştırılacak senaryolar (varsayılan: referanstakiler)")
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--current', default=None, metavar="DOSYA",
+                                help="Yeniden ölçmek yerine kaydedilmiş sonuçlarla karşılaştır")
+    compare_parser.add_argument('--repeat', type=int, default=5)
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help="Gerileme eşiği (yüzde)")
+
+    commands.add_parser('list', help="Senaryoları listeler")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, bench in BENCHMARKS.items():
+            print(f"{name:<16} {(bench.__doc__ or '').strip()}")
+        return
+
+    if args.command == 'run':
+        names = _select(args.names)
+        print(f"{len(names)} senaryo ölçülüyor (Python {platform.python_version()}, {os.cpu_count()} çekirdek)...")
+        results = run_benchmarks(names, repeat=args.repeat)
+        print_results(results)
+        if args.save:
+            save_results(args.save, results)
+            print(f"\nSonuçlar '{args.save}' dosyasına kaydedildi.")
+        return
+
+    if not os.path.exists(args.baseline):
+        raise SystemExit(f"Referans dosyası bulunamadı: '{args.baseline}'. Önce 'benchmark.py run --save' çalıştırın.")
+    baseline = load_results(args.baseline)
+    print(f"Referans: {args.baseline} (commit {baseline['environment'].get('commit')}, "
+          f"{baseline['environment'].get('timestamp')})")
+    if args.current:
+        current = load_results(args.current)['results']
+        if args.names:
+            current = {name: current[name] for name in _select(args.names) if name in current}
+    else:
+        names = _select(args.names or [name for name in baseline['results'] if name in BENCHMARKS])
+        current = run_benchmarks(names, repeat=args.repeat)
+    regressions = compare_results(baseline['results'], current, threshold=args.threshold)
+    if regressions:
+        print(f"\n%{args.threshold:.0f} eşiğini ve gürültü payını aşan gerileme: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nGerileme yok.")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,273 @@
 import json
-import itertools
+import argparse
+import os
+import time
+from multiprocessing import Pool
 from operator import itemgetter
 from backtester.data import fetch_historical_data
 from backtester.backtest import run_backtest
-from backtester.performance import calculate_performance
+import numpy as np
+from backtester.performance import compute_metrics, format_performance
+from backtester.portfolio import simulate_portfolio, SIMULATION_KEYS
+from backtester.sweep import sweep_ema_grid
+from tospa.strategies.registry import DEFAULT_STRATEGY, STRATEGIES as STRATEGY_REGISTRY
+from backtester.walkforward import make_folds, run_walk_forward
+from backtester.search import SearchSpace, SearchCheckpoint, Budget, make_strategy, run_search, combo_key, STRATEGIES
+from backtester.shared import SharedFrame, attach_frame
+from tospa.strategies.indicators import IndicatorCache
 from binance.client import Client
 
-def run_optimization():
+# İşçi süreçlerin paylaşımlı veriye bağlandıktan sonra kullandığı durum
+_worker_state = {}
+
+def evaluate_combo(df, combo, static_params, initial_balance, cache=None, simulation=None):
+    """
+    Tek bir parametre kombinasyonunu test eder.
+
+    run_backtest türetilen tüm sütunları her çağrıda yeniden yazdığı için
+    aynı DataFrame kombinasyonlar arasında kopyalanmadan kullanılabilir.
+    Geçersiz kombinasyonlar ve işlem üretmeyen testler için None döner.
+
+    Args:
+        simulation (dict): Verilirse ölçütler komisyon, kayma ve TP/SL çıkışlarını
+            içeren bar bazlı portföy simülasyonundan hesaplanır
+            (simulate_portfolio argümanları, örn. {'fee_pct': 0.1, 'tp_pct': 2.0}).
+            Kombinasyondaki SIMULATION_KEYS değerleri bu ayarların üzerine yazılır.
+    """
+    if combo['ema_short_period'] >= combo['ema_long_period']:
+        return None
+
+    current_params = {**combo, **static_params}
+    overrides = {key: current_params.pop(key) for key in SIMULATION_KEYS if key in current_params}
+    if overrides:
+        simulation = {**(simulation or {}), **overrides}
+    trades, backtest_df = run_backtest(df, current_params, cache=cache)
+
+    if trades.empty:
+        return None
+    if simulation is not None:
+        metrics = simulate_portfolio(backtest_df, initial_balance=initial_balance, **simulation).metrics
+    else:
+        metrics = compute_metrics(trades, initial_balance)
+    # Seriler işçiden ana sürece taşınmasın diye yalnızca sayısal özet döndürülür
+    return {'params': combo, 'metrics': metrics.without_series() if metrics else None}
+
+def _init_worker(spec, static_params, initial_balance, simulation=None):
+    """Havuzdaki her işçi süreçte bir kez çalışır ve paylaşımlı veriye bağlanır."""
+    df, shm = attach_frame(spec)
+    _worker_state.update(df=df, shm=shm, static_params=static_params, initial_balance=initial_balance,
+                         cache=IndicatorCache(), simulation=simulation, tails={})
+
+def _data_tail(df, fraction, tails):
+    """Verinin son `fraction` kısmını döndürür; dilimler `tails` sözlüğünde saklanır."""
+    if fraction >= 1.0:
+        return df
+    if fraction not in tails:
+        tails[fraction] = df.iloc[len(df) - max(1, int(len(df) * fraction)):].copy()
+    return tails[fraction]
+
+def _evaluate_trial_in_worker(task):
+    """(kombinasyon, veri oranı) görevini işçideki paylaşımlı veriyle test eder."""
+    combo, fraction = task
+    state = _worker_state
+    df = _data_tail(state['df'], fraction, state['tails'])
+    result = evaluate_combo(df, combo, state['static_params'], state['initial_balance'], cache=state['cache'],
+                            simulation=state['simulation'])
+    return result, os.getpid(), state['cache'].stats()
+
+def merge_cache_stats(stats_list):
+    """Birden fazla önbelleğin isabet/ıskalama sayaçlarını toplar."""
+    hits = sum(s['hits'] for s in stats_list)
+    misses = sum(s['misses'] for s in stats_list)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': (hits / total * 100) if total else 0.0}
+
+class ProgressReporter:
+    """Tamamlanan kombinasyon sayısını, geçen süreyi ve tahmini kalan süreyi basar."""
+    def __init__(self, total, interval=1.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_report = 0.0
+
+    def update(self, count=1):
+        self.done += count
+        now = time.perf_counter()
+        if self.done < self.total and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        print(f"[{self.done}/{self.total}] %{self.done / self.total * 100:.1f} | "
+              f"Geçen: {elapsed:.1f}s | Kalan (tahmini): {eta:.1f}s | {rate:.1f} test/s")
+
+class ComboEvaluator:
+    """
+    Arama stratejilerinin ürettiği denemeleri test eder.
+
+    `workers` 1'den büyükse veri paylaşımlı belleğe bir kez yazılır ve süreç
+    havuzu arama boyunca açık tutulur; her parti aynı işçilere gönderilir.
+    Bağlam yöneticisi (with) olarak kullanılmalıdır.
+    """
+    def __init__(self, df, static_params, initial_balance, workers=1, chunksize=None, simulation=None):
+        self.df = df
+        self.static_params = static_params
+        self.initial_balance = initial_balance
+        self.workers = max(1, workers)
+        self.chunksize = chunksize
+        self.simulation = simulation
+        self.cache = IndicatorCache()
+        self._tails = {}
+        self._worker_stats = {}
+        self._shared = None
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._shared = SharedFrame(self.df)
+            self._pool = Pool(self.workers, initializer=_init_worker,
+                              initargs=(self._shared.spec, self.static_params, self.initial_balance, self.simulation))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def evaluate(self, trials):
+        """Denemeleri test eder; evaluate_combo sonuçlarını aynı sırayla döndürür."""
+        if self._pool is None:
+            return [evaluate_combo(_data_tail(self.df, t.fraction, self._tails), t.params, self.static_params,
+                                   self.initial_balance, cache=self.cache, simulation=self.simulation)
+                    for t in trials]
+
+        tasks = [(t.params, t.fraction) for t in trials]
+        chunksize = self.chunksize or max(1, len(tasks) // (self.workers * 4))
+        results = []
+        for result, pid, stats in self._pool.imap(_evaluate_trial_in_worker, tasks, chunksize=chunksize):
+            previous = self._worker_stats.get(pid)
+            if previous is None or stats['hits'] + stats['misses'] > previous['hits'] + previous['misses']:
+                self._worker_stats[pid] = stats
+            results.append(result)
+        return results
+
+    def cache_stats(self):
+        if self._worker_stats:
+            return merge_cache_stats(self._worker_stats.values())
+        return self.cache.stats()
+
+def score_results(results):
+    """
+    Sonuçlara skor (kâr yüzdesi / maksimum düşüş yüzdesi) atar.
+
+    Düşüş %1'in altındaysa %1 kabul edilir; tamamlanmış işlem çifti olmayan
+    sonuçların skoru 0'dır. Hesap tüm sonuçlar için tek seferde vektörel yapılır.
+    """
+    profit = np.array([r['metrics'].profit_pct if r['metrics'] else 0.0 for r in results])
+    drawdown = np.array([r['metrics'].max_drawdown_pct if r['metrics'] else 100.0 for r in results])
+    scores = profit / np.maximum(drawdown, 1.0)
+    for res, score in zip(results, scores.tolist()):
+        res['score'] = score
+    return scores
+
+def result_score(result):
+    """Tek bir sonucun skoru (bkz. score_results); arama stratejilerine verilir."""
+    return float(score_results([result])[0])
+
+def search_combinations(df, param_grid, static_params, initial_balance, workers=1, chunksize=None, simulation=None,
+                        search='grid', max_evals=None, max_seconds=None, checkpoint=None, run_id=None, seed=None):
+    """
+    Parametre uzayını seçilen arama stratejisiyle tarar.
+
+    Returns:
+        list: evaluate_combo biçiminde sonuçlar (işlem üretmeyenler hariç).
+    """
+    # Kısıtları sağlamayan kombinasyonlar (örn. kısa EMA >= uzun EMA) hiç planlanmaz
+    space = SearchSpace(param_grid)
+    strategy = make_strategy(search)
+    budget = Budget(max_evals=max_evals, max_seconds=max_seconds)
+    planned = strategy.planned(space)
+    if max_evals is not None and search != 'halving':
+        planned = min(planned, int(max_evals))
+    print(f"Arama stratejisi: {search} | uzay: {space.size} kombinasyon, "
+          f"planlanan test: {planned}")
+
+    store = None
+    if checkpoint:
+        store = SearchCheckpoint(checkpoint, run_id)
+        print(f"Kontrol noktası: '{checkpoint}' ({len(store.records)} kayıtlı sonuç)")
+
+    # TPE her partide önceki sonuçlardan öğrenir; partiler işçi sayısı kadar tutulur
+    batch_size = workers if search == 'tpe' else workers * 4
+    if workers > 1:
+        print(f"{workers} işçi süreç ile paralel test başlıyor...")
+
+    progress = ProgressReporter(max(1, planned))
+    with ComboEvaluator(df, static_params, initial_balance, workers=workers, chunksize=chunksize,
+                        simulation=simulation) as evaluator:
+        trials = run_search(space, strategy, evaluator.evaluate, score=result_score,
+                            budget=budget, checkpoint=store, batch_size=batch_size, seed=seed, progress=progress)
+        cache_stats = evaluator.cache_stats()
+
+    print(f"İndikatör önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama "
+          f"(isabet oranı: %{cache_stats['hit_rate']:.1f})")
+
+    return [t.result for t in trials if t.result is not None]
+
+def report_walk_forward(df, param_grid, static_params, initial_balance, fold_options, workers=None,
+                        simulation=None, search='grid', max_evals=None, seed=None):
+    """Walk-forward optimizasyonunu çalıştırır ve katman özetleriyle örneklem dışı sonucu basar."""
+    folds = make_folds(len(df), **fold_options)
+    print(f"Walk-forward: {len(folds)} katman | eğitim {folds[0].train_end - folds[0].train_start} bar, "
+          f"test {folds[0].test_end - folds[0].test_start} bar"
+          f"{' (genişleyen pencere)' if fold_options.get('anchored') else ''}")
+    start = time.perf_counter()
+    result = run_walk_forward(df, param_grid, static_params, initial_balance, result_score, folds=folds,
+                              workers=workers, simulation=simulation, search=search, max_evals=max_evals, seed=seed)
+    print(f"Süre: {time.perf_counter() - start:.2f}s\n")
+
+    for row in result.folds.itertuples():
+        if row.params is None:
+            print(f"Katman {row.fold}: eğitim penceresinde işlem üreten kombinasyon yok")
+            continue
+        print(f"Katman {row.fold}: {df.index[row.test_start]:%Y-%m-%d} - {df.index[row.test_end - 1]:%Y-%m-%d} | "
+              f"{row.params} | eğitim skoru {row.train_score:.2f} (%{row.train_profit_pct:.2f}) | "
+              f"test %{row.test_profit_pct:.2f}, {row.test_trades} işlem")
+
+    print("\n--- ÖRNEKLEM DIŞI (BİRLEŞİK TEST) SONUCU ---")
+    for key, value in format_performance(result.metrics).items():
+        print(f"  {key}: {value}")
+    return result
+
+def run_optimization(workers=None, chunksize=None, parallel=True, simulate=False, search='grid',
+                     max_evals=None, max_seconds=None, checkpoint=None, seed=None, walk_forward=None,
+                     vectorized=False, strategy=DEFAULT_STRATEGY):
     """
     Strateji parametrelerinin farklı kombinasyonlarını test ederek en iyisini bulur.
+
+    Args:
+        workers (int): Paralel modda kullanılacak işçi süreç sayısı (varsayılan: tüm çekirdekler).
+        chunksize (int): Paralel modda işçilere gönderilen parça boyutu.
+        parallel (bool): False ise kombinasyonlar tek çekirdekte sırayla test edilir.
+        simulate (bool): True ise kombinasyonlar ayarlardaki komisyon ve varsayılan
+            TP/SL yüzdeleriyle bar bazlı portföy simülasyonu üzerinden puanlanır.
+        search (str): Arama stratejisi: 'grid', 'random', 'halving' veya 'tpe'.
+        max_evals (float): En fazla tam veri eşdeğeri değerlendirme sayısı.
+        max_seconds (float): En fazla arama süresi (saniye).
+        checkpoint (str): Sonuçların eklendiği JSONL dosyası; aynı dosyayla
+            yeniden başlatılan arama kayıtlı kombinasyonları tekrar test etmez.
+        seed (int): Rastgele stratejiler için tohum değeri.
+        walk_forward (dict): Verilirse tüm seri yerine walk-forward optimizasyonu
+            yapılır; make_folds argümanlarını içerir (örn. {'n_folds': 5, 'anchored': False}).
+        vectorized (bool): True ise ızgaradaki tüm EMA çiftleri matris çekirdekleriyle
+            birlikte test edilir (yalnızca simülasyonsuz EMA çifti ızgarasında).
+        strategy (str): Test edilecek stratejinin kayıtlı adı (bkz. tospa.strategies.registry).
     """
     print("Optimizasyon Motoru Başlatılıyor...")
 
@@ -22,70 +281,70 @@ def run_optimization():
         'ema_short_period': range(5, 16, 2),
         'ema_long_period': range(20, 41, 5),
     }
-    
+
     static_params = {
         'ema_trend_period': 100,
         'rsi_period': 14,
         'rsi_buy_level': 50,
-        'rsi_sell_level': 75
+        'rsi_sell_level': 75,
+        'strategy': strategy,
     }
 
+    simulation = None
+    if simulate:
+        from tospa.core.config import settings
+        simulation = {
+            'fee_pct': settings.BINANCE_FEE_PERCENT,
+            'tp_pct': settings.DEFAULT_TP_PERCENT,
+            'sl_pct': settings.DEFAULT_SL_PERCENT,
+        }
+        print(f"Portföy simülasyonu açık: {simulation}")
+
     print(f"'{symbol_to_optimize}' için veri çekiliyor...")
     df = fetch_historical_data(symbol_to_optimize, start_date, interval=timeframe)
     if df.empty:
         print("Veri çekilemedi, optimizasyon durduruldu.")
         return
 
-    keys, values = zip(*param_grid.items())
-    combinations = [dict(zip(keys, v)) for v in itertools.product(*values)]
-    
-    total_combinations = len(combinations)
-    print(f"Toplam {total_combinations} farklı parametre kombinasyonu test edilecek...")
-    
-    results = []
-
-    for i, combo in enumerate(combinations):
-        if combo['ema_short_period'] >= combo['ema_long_period']:
-            continue
-
-        current_params = {**combo, **static_params}
-        
-        print(f"[{i+1}/{total_combinations}] Test ediliyor: {combo}")
-
-        trades, _ = run_backtest(df.copy(), current_params)
-        
-        if not trades.empty:
-            performance = calculate_performance(trades, initial_balance)
-            results.append({'params': combo, 'performance': performance})
+    if walk_forward is not None:
+        report_walk_forward(df, param_grid, static_params, initial_balance, walk_forward,
+                            workers=workers if parallel else 1, simulation=simulation, search=search,
+                            max_evals=max_evals, seed=seed)
+        return
 
+    if vectorized and simulation is None and strategy == DEFAULT_STRATEGY \
+            and set(param_grid) == {'ema_short_period', 'ema_long_period'}:
+        # Tüm EMA çiftleri birkaç dizi geçişiyle tek seferde test edilir
+        start = time.perf_counter()
+        results = sweep_ema_grid(df, param_grid['ema_short_period'], param_grid['ema_long_period'],
+                                 static_params, initial_balance)
+        print(f"Matris tarama: {len(results)} sonuç, {time.perf_counter() - start:.3f}s")
+    else:
+        if vectorized:
+            print(f"Matris tarama yalnızca '{DEFAULT_STRATEGY}' stratejisinin simülasyonsuz EMA çifti ızgarasında kullanılabilir; "
+                  "arama stratejisine geçiliyor.")
+        # Veri ya da sabit ayarlar değişirse eski kayıtlar kullanılmaz
+        run_id = combo_key({
+            'symbol': symbol_to_optimize, 'interval': timeframe, 'bars': len(df), 'last_bar': str(df.index[-1]),
+            'static_params': static_params, 'initial_balance': initial_balance, 'simulation': simulation,
+        })
+        results = search_combinations(df, param_grid, static_params, initial_balance,
+                                      workers=(workers or os.cpu_count() or 1) if parallel else 1,
+                                      chunksize=chunksize, simulation=simulation, search=search, max_evals=max_evals,
+                                      max_seconds=max_seconds, checkpoint=checkpoint, run_id=run_id, seed=seed)
     if not results:
         print("Hiçbir test başarılı bir sonuç üretmedi.")
         return
 
-    # --- HATA DÜZELTME BÖLÜMÜ BAŞLANGIÇ ---
-    # Sonuçları sıralamak için bir "skor" belirle
-    for res in results:
-        # Kâr Yüzdesi'ni al ve metinden sayıya çevir
-        profit_str = res['performance'].get('Kâr Yüzdesi', '0%')
-        profit = float(profit_str.replace('%', '')) # <-- DÜZELTME BURADA
-
-        # Maksimum Düşüş'ü al ve metinden sayıya çevir
-        drawdown_str = res['performance'].get('Maksimum Düşüş (Max Drawdown)', '100%')
-        drawdown = float(drawdown_str.replace('%', ''))
-        
-        if drawdown < 1:
-            drawdown = 1.0
-            
-        res['score'] = profit / drawdown
-    # --- HATA DÜZELTME BÖLÜMÜ BİTİŞ ---
+    score_results(results)
 
     sorted_results = sorted(results, key=itemgetter('score'), reverse=True)
 
     print("\n\n--- OPTİMİZASYON TAMAMLANDI ---")
     print("En İyi 5 Sonuç (Skora Göre):\n")
-    
+
     for i, res in enumerate(sorted_results[:5]):
-        p = res['performance']
+        p = format_performance(res['metrics'])
         print(f"#{i+1} SKOR: {res['score']:.2f}")
         print(f"  Parametreler: {res['params']}")
         print(f"  Kâr Yüzdesi: {p.get('Kâr Yüzdesi', 'N/A')}")
@@ -95,4 +354,33 @@ def run_optimization():
         print("-" * 30)
 
 if __name__ == "__main__":
-    run_optimization()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Strateji parametre optimizasyonu")
+    parser.add_argument('--workers', type=int, default=None, help="İşçi süreç sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument('--chunksize', type=int, default=None, help="İşçilere tek seferde gönderilen kombinasyon sayısı")
+    parser.add_argument('--sequential', action='store_true', help="Kombinasyonları tek çekirdekte sırayla test et")
+    parser.add_argument('--simulate', action='store_true',
+                        help="Komisyon ve TP/SL dahil bar bazlı portföy simülasyonuyla puanla")
+    parser.add_argument('--search', choices=list(STRATEGIES), default='grid', help="Arama stratejisi")
+    parser.add_argument('--max-evals', type=float, default=None, help="En fazla değerlendirme sayısı (tam veri eşdeğeri)")
+    parser.add_argument('--max-seconds', type=float, default=None, help="En fazla arama süresi (saniye)")
+    parser.add_argument('--checkpoint', default=None, metavar="DOSYA",
+                        help="Sonuçların kaydedildiği JSONL dosyası; kesilen arama aynı dosyayla devam eder")
+    parser.add_argument('--seed', type=int, default=None, help="Rastgele stratejiler için tohum değeri")
+    parser.add_argument('--walk-forward', action='store_true', help="Kayan eğitim/test pencereleriyle optimize et")
+    parser.add_argument('--folds', type=int, default=5, help="Walk-forward katman sayısı")
+    parser.add_argument('--train-bars', type=int, default=None, help="Eğitim penceresi uzunluğu (bar)")
+    parser.add_argument('--test-bars', type=int, default=None, help="Test penceresi uzunluğu (bar)")
+    parser.add_argument('--anchored', action='store_true', help="Eğitim penceresi hep serinin başından başlasın")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="EMA çifti ızgarasını matris çekirdekleriyle tek seferde tara")
+    parser.add_argument('--strategy', choices=list(STRATEGY_REGISTRY), default=DEFAULT_STRATEGY,
+                        help="Test edilecek strateji")
+    args = parser.parse_args()
+    walk_forward = None
+    if args.walk_forward:
+        walk_forward = {'n_folds': args.folds, 'train_bars': args.train_bars, 'test_bars': args.test_bars,
+                        'anchored': args.anchored}
+    run_optimization(workers=args.workers, chunksize=args.chunksize, parallel=not args.sequential, simulate=args.simulate,
+                     search=args.search, max_evals=args.max_evals, max_seconds=args.max_seconds,
+                     checkpoint=args.checkpoint, seed=args.seed, walk_forward=walk_forward,
+                     vectorized=args.vectorized, strategy=args.strategy)
@@ -0,0 +1,52 @@
+import argparse
+import glob
+import time
+
+from backtester.replay import load_replay_frames, run_replay, format_replay
+from tospa.core.config import load_settings
+from tospa.strategies.registry import STRATEGIES
+
+def main():
+    parser = argparse.ArgumentParser(description="TospaBot'u geçmiş veriler üzerinde simüle borsa ve saatle oynatır")
+    parser.add_argument('--files', nargs='+', default=None, help="Oynatılacak CSV dosyaları (varsayılan: *USDT_*.csv)")
+    parser.add_argument('--symbols', type=int, default=None,
+                        help="Sembol sayısı; dosya sayısından fazlaysa dosyalar kaydırılarak tekrar kullanılır")
+    parser.add_argument('--bars', type=int, default=2000, help="Oynatılacak bar sayısı (0: tüm veri)")
+    parser.add_argument('--ticks-per-bar', type=int, default=1, help="Bar başına bot döngüsü (fiyat bar içinde ilerler)")
+    parser.add_argument('--initial-balance', type=float, default=10000)
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default=None, help="Varsayılan: ayarlardaki strateji")
+    parser.add_argument('--workers', type=int, default=None, help="Analiz thread sayısı (varsayılan: ayarlardaki)")
+    parser.add_argument('--verbose', action='store_true', help="Botun INFO loglarını da yaz")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("*USDT_*.csv"))
+    frames, offsets = load_replay_frames(files, args.symbols)
+
+    settings = load_settings()
+    overrides = {}
+    if args.strategy:
+        overrides['STRATEGY_NAME'] = args.strategy
+    if args.workers:
+        overrides['ANALYSIS_WORKERS'] = args.workers
+    if not args.verbose:
+        # Replay binlerce döngü çalıştırır; log yazımı ölçümü domine etmesin
+        overrides['LOG_LEVELS'] = {**settings.LOG_LEVELS, 'tospa': 'WARNING'}
+    settings = settings.model_copy(update=overrides)
+
+    print(f"Replay başlatılıyor: {len(frames)} sembol, strateji '{settings.STRATEGY_NAME}', "
+          f"{settings.ANALYSIS_WORKERS} analiz thread'i")
+    last_report = [time.monotonic()]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_report[0] >= 5 or done == total:
+            last_report[0] = now
+            print(f"  {done}/{total} bar")
+
+    result = run_replay(frames, settings, offsets=offsets, bars=args.bars or None, ticks_per_bar=args.ticks_per_bar,
+                        initial_balance=args.initial_balance, progress=progress)
+    print("\n--- REPLAY SONUCU ---")
+    print(format_replay(result, weight_limit=settings.REQUEST_WEIGHT_LIMIT))
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,76 @@
 import logging
 import math
+import threading
 import time
+from collections import deque
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from requests.adapters import HTTPAdapter
+from tospa.api.exchange_info import ExchangeInfoCache, SymbolFilters
+
+logger = logging.getLogger(__name__)
+
+# Binance spot REST uç noktalarının istek ağırlıkları
+REQUEST_WEIGHTS = {
+    'account': 20,
+    'ticker_price': 2,
+    'klines': 2,
+    'exchange_info': 20,
+    'order': 1,
+}
+
+class RequestWeightLimiter:
+    """
+    Kayan bir zaman penceresinde (varsayılan 1 dakika) gönderilen toplam
+    istek ağırlığını sınırlar. Birden fazla thread aynı limiti paylaşır;
+    bütçe dolduğunda istek, pencereden yeterli ağırlık düşene kadar bekletilir.
+    """
+    def __init__(self, max_weight: int = 1200, window_seconds: float = 60.0):
+        self.max_weight = max_weight
+        self.window_seconds = window_seconds
+        self._events = deque()
+        self._used = 0
+        self._condition = threading.Condition()
+
+    def _expire(self, now: float):
+        while self._events and self._events[0][0] + self.window_seconds <= now:
+            self._used -= self._events.popleft()[1]
+
+    def acquire(self, weight: int):
+        """Verilen ağırlık için bütçe ayırır; gerekirse bütçe açılana kadar bekler."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._used + weight <= self.max_weight or not self._events:
+                    self._events.append((now, weight))
+                    self._used += weight
+                    return
+                wait_time = self._events[0][0] + self.window_seconds - now
+                logger.debug("İstek ağırlığı limiti doldu (%s/%s), %.1fs bekleniyor.", self._used, self.max_weight, wait_time)
+                self._condition.wait(wait_time)
+
+    @property
+    def used_weight(self) -> int:
+        """Pencere içinde kullanılan toplam ağırlık."""
+        with self._condition:
+            self._expire(time.monotonic())
+            return self._used
 
 class TospaBinanceClient:
     """
     Binance API'si ile etkileşimi yöneten, hata kontrolü ve
     otomatik yeniden bağlanma özelliklerine sahip istemci sınıfı.
     """
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True, rate_limiter: RequestWeightLimiter = None,
+                 pool_size: int = 10):
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
+        self.rate_limiter = rate_limiter or RequestWeightLimiter()
+        self.pool_size = pool_size
+        self.exchange_info = ExchangeInfoCache(self._fetch_exchange_info)
+        self.market_data = None # Bağlanırsa fiyat ve mumlar önce canlı akıştan okunur
         self.client = None
         self.is_ready = False # Hata kontrolü için yeni özellik
         self._initialize_client()
@@ -20,98 +78,156 @@ class TospaBinanceClient:
     def _initialize_client(self):
         """Binance istemcisini başlatır ve bağlantıyı doğrular."""
         if not self.api_key or not self.api_secret:
-            logging.warning("API anahtarları eksik. İstemci başlatılamadı.")
+            logger.warning("API anahtarları eksik. İstemci başlatılamadı.")
             self.is_ready = False
             return
         
         try:
-            self.client = Client(self.api_key, self.api_secret, tld='com', testnet=self.testnet)
+            # Bağlantı get_account ile doğrulandığı için ayrıca ping atılmaz
+            self.client = Client(self.api_key, self.api_secret, tld='com', testnet=self.testnet, ping=False)
+            # Kalıcı (keep-alive) bağlantı havuzu; paralel analiz thread'lerinin her biri bir bağlantı kullanabilir
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+            self.client.session.mount('https://', adapter)
             # Bağlantıyı doğrulamak için basit bir çağrı yap
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['account'])
             self.client.get_account()
             self.is_ready = True
-            logging.info("Binance istemcisi başarıyla başlatıldı ve bağlantı doğrulandı.")
+            logger.info("Binance istemcisi başarıyla başlatıldı ve bağlantı doğrulandı.")
+            # İşlem kuralları emir yolunda istek atılmasın diye baştan yüklenir
+            self.exchange_info.refresh()
         except BinanceAPIException as e:
             self.is_ready = False
-            logging.error(f"Binance API Hatası: {e.message}")
+            logger.error("Binance API Hatası: %s", e.message)
         except Exception as e:
             self.is_ready = False
-            logging.error(f"İstemci başlatılırken beklenmedik bir hata oluştu: {e}")
+            logger.error("İstemci başlatılırken beklenmedik bir hata oluştu: %s", e)
 
     def get_account_balance(self, asset: str) -> str:
         """Belirtilen varlık için cüzdan bakiyesini alır."""
         if not self.is_ready: return "0"
         try:
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['account'])
             balance = self.client.get_asset_balance(asset=asset)
             return balance['free'] if balance else "0"
         except BinanceAPIException as e:
-            logging.error(f"{asset} bakiyesi alınırken hata: {e.message}")
+            logger.error("%s bakiyesi alınırken hata: %s", asset, e.message)
             return "0"
 
-    def get_symbol_ticker(self, symbol: str) -> dict:
-        """Belirtilen işlem çifti için anlık fiyat bilgisini alır."""
+    def get_account_balances(self, assets) -> dict:
+        """Birden fazla varlığın bakiyesini tek bir hesap isteğiyle alır."""
+        if not self.is_ready: return {asset: "0" for asset in assets}
+        try:
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['account'])
+            balances = {b['asset']: b['free'] for b in self.client.get_account().get('balances', [])}
+            return {asset: balances.get(asset, "0") for asset in assets}
+        except BinanceAPIException as e:
+            logger.error("Bakiyeler alınırken hata: %s", e.message)
+            return {asset: "0" for asset in assets}
+
+    def attach_market_data(self, feed):
+        """Fiyat ve mum sorgularının önce okunacağı canlı piyasa verisi akışını bağlar."""
+        self.market_data = feed
+
+    def get_symbol_ticker(self, symbol: str, use_stream: bool = True) -> dict:
+        """
+        Belirtilen işlem çifti için anlık fiyat bilgisini alır.
+        Canlı akış bağlıysa ve fiyat güncelse REST isteği yapılmaz.
+        """
         if not self.is_ready: return {}
+        if use_stream and self.market_data is not None:
+            price = self.market_data.get_price(symbol)
+            if price is not None:
+                return {'symbol': symbol, 'price': str(price)}
         try:
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['ticker_price'])
             return self.client.get_symbol_ticker(symbol=symbol)
         except BinanceAPIException as e:
-            logging.error(f"{symbol} fiyatı alınırken hata oluştu: {e.message}")
+            logger.error("%s fiyatı alınırken hata oluştu: %s", symbol, e.message)
             return {}
 
-    def get_historical_klines(self, symbol: str, interval: str, limit: int = 500) -> list:
-        """Belirtilen işlem çifti için geçmiş mum grafiği verilerini çeker."""
+    def get_historical_klines(self, symbol: str, interval: str, limit: int = 500, use_stream: bool = True) -> list:
+        """
+        Belirtilen işlem çifti için geçmiş mum grafiği verilerini çeker.
+        Canlı akışın mum defteri senkronsa REST isteği yapılmaz.
+        """
         if not self.is_ready: return []
+        if use_stream and self.market_data is not None:
+            klines = self.market_data.get_klines(symbol, interval, limit)
+            if klines is not None:
+                return klines
         try:
-            return self.client.get_historical_klines(symbol, interval, limit=limit)
+            # Tek istekte en son `limit` mumu döndürür (son mum henüz kapanmamıştır)
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['klines'])
+            return self.client.get_klines(symbol=symbol, interval=interval, limit=limit)
         except BinanceAPIException as e:
-            logging.error(f"{symbol} için geçmiş veriler alınırken hata: {e.message}")
+            logger.error("%s için geçmiş veriler alınırken hata: %s", symbol, e.message)
             return []
 
-    def get_symbol_info(self, symbol: str) -> dict:
-        """Bir sembolün işlem kurallarını (örn: lot size) alır."""
+    def _fetch_exchange_info(self) -> dict:
+        """Tüm sembollerin işlem kurallarını tek istekte çeker (ExchangeInfoCache için)."""
         if not self.is_ready: return None
         try:
-            return self.client.get_symbol_info(symbol)
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['exchange_info'])
+            return self.client.get_exchange_info()
         except BinanceAPIException as e:
-            logging.error(f"{symbol} için işlem kuralları alınamadı: {e.message}")
+            logger.error("Borsa işlem kuralları alınamadı: %s", e.message)
             return None
 
-    def adjust_quantity_to_lot_size(self, symbol: str, quantity: float) -> float:
-        """Verilen miktarı, sembolün lot size kurallarına göre ayarlar."""
-        info = self.get_symbol_info(symbol)
-        if not info: return 0
-        
-        try:
-            lot_size_filter = next(f for f in info['filters'] if f['filterType'] == 'LOT_SIZE')
-            step_size = float(lot_size_filter['stepSize'])
-            min_qty = float(lot_size_filter['minQty'])
-            
-            if quantity < min_qty:
-                logging.warning(f"Miktar ({quantity}) minimum alım miktarından ({min_qty}) az. İşlem iptal edilecek.")
-                return 0
-
-            precision = int(round(-math.log(step_size, 10), 0))
-            adjusted_quantity = math.floor(quantity * (10**precision)) / (10**precision)
-            
-            logging.info(f"Lot kurallarına göre ayarlanan miktar: {adjusted_quantity} {symbol.replace('USDT','')}")
-            return adjusted_quantity
-        except (StopIteration, KeyError, ValueError) as e:
-            logging.error(f"{symbol} için lot size ayarlanamadı: {e}")
+    def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        """Bir sembolün önbellekteki, önceden hesaplanmış işlem kurallarını döndürür."""
+        if not self.is_ready: return None
+        return self.exchange_info.get(symbol)
+
+    def get_symbol_info(self, symbol: str) -> dict:
+        """Bir sembolün işlem kurallarını (örn: lot size) alır."""
+        filters = self.get_symbol_filters(symbol)
+        if not filters:
+            logger.error("%s için işlem kuralları alınamadı.", symbol)
+            return None
+        return filters.info
+
+    def adjust_quantity_to_lot_size(self, symbol: str, quantity: float, price: float = None) -> float:
+        """
+        Verilen miktarı, sembolün lot size kurallarına göre ayarlar.
+        Fiyat verilirse emir tutarı MIN_NOTIONAL kuralına göre de kontrol edilir.
+        """
+        filters = self.get_symbol_filters(symbol)
+        if not filters: return 0
+
+        if filters.quantity_precision is None:
+            logger.error("%s için lot size ayarlanamadı: LOT_SIZE kuralı bulunamadı.", symbol)
+            return 0
+
+        if quantity < filters.min_qty:
+            logger.warning("Miktar (%s) minimum alım miktarından (%s) az. İşlem iptal edilecek.", quantity, filters.min_qty)
             return 0
 
+        scale = 10 ** filters.quantity_precision
+        adjusted_quantity = math.floor(quantity * scale) / scale
+
+        if price and filters.min_notional and adjusted_quantity * price < filters.min_notional:
+            logger.warning("Emir tutarı (%.2f) minimum tutarın (%s) altında. İşlem iptal edilecek.", adjusted_quantity * price, filters.min_notional)
+            return 0
+
+        logger.debug("Lot kurallarına göre ayarlanan miktar: %s %s", adjusted_quantity, symbol.replace('USDT',''))
+        return adjusted_quantity
+
     def create_order(self, symbol: str, side: str, order_type: str, quantity: float):
         """Binance üzerinde gerçek bir alım veya satım emri oluşturur."""
         if not self.is_ready: return None
         try:
-            logging.info(f"EMİR GÖNDERİLİYOR: {symbol} | Yön: {side} | Miktar: {quantity}")
+            logger.info("EMİR GÖNDERİLİYOR: %s | Yön: %s | Miktar: %s", symbol, side, quantity)
+            self.rate_limiter.acquire(REQUEST_WEIGHTS['order'])
             order = self.client.create_order(symbol=symbol, side=side, type=order_type, quantity=quantity)
-            logging.info(f"EMİR BAŞARILI: {order}")
+            logger.info("EMİR BAŞARILI: %s", order)
             return order
         except BinanceAPIException as e:
-            logging.error(f"EMİR HATASI ({symbol}): {e.message}")
+            logger.error("EMİR HATASI (%s): %s", symbol, e.message)
             return None
 
     def create_test_order(self, symbol: str, side: str, order_type: str, quantity: float):
         """Sanal (test) bir alım veya satım emri oluşturur."""
-        logging.info(f"TEST EMRİ: {symbol} | Yön: {side} | Miktar: {quantity}")
+        logger.info("TEST EMRİ: %s | Yön: %s | Miktar: %s", symbol, side, quantity)
         return {
             "symbol": symbol, "orderId": f"test_{int(time.time())}",
             "status": "FILLED", "side": side, "type": order_type,
@@ -0,0 +1,119 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class SymbolFilters:
+    """
+    Bir sembolün işlem kurallarının (LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL)
+    önceden ayrıştırılmış ve hesaplanmış hali.
+    """
+    def __init__(self, info: dict):
+        self.symbol = info['symbol']
+        self.info = info
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+
+        lot_size = filters.get('LOT_SIZE', {})
+        self.step_size = float(lot_size.get('stepSize', 0))
+        self.min_qty = float(lot_size.get('minQty', 0))
+        self.quantity_precision = self._precision(self.step_size)
+
+        price_filter = filters.get('PRICE_FILTER', {})
+        self.tick_size = float(price_filter.get('tickSize', 0))
+        self.price_precision = self._precision(self.tick_size)
+
+        # Binance eski MIN_NOTIONAL filtresini yerini NOTIONAL'a bırakıyor; ikisini de destekle
+        notional = filters.get('MIN_NOTIONAL') or filters.get('NOTIONAL') or {}
+        self.min_notional = float(notional.get('minNotional', 0))
+
+    @staticmethod
+    def _precision(step: float) -> Optional[int]:
+        if step <= 0:
+            return None
+        return int(round(-math.log(step, 10), 0))
+
+class ExchangeInfoCache:
+    """
+    Tüm sembollerin işlem kurallarını tek bir exchangeInfo isteğiyle yükleyip
+    bellekte tutar. İstemci kurulurken bir kez yüklenir (`refresh`); emir
+    verirken kurallar için istek atılmaz.
+
+    `ttl_seconds` süresi dolduğunda eski kurallar sunulmaya devam eder ve
+    yenileme arka plandaki bir thread'de yapılır. Yalnızca önbellekte
+    olmayan bir sembol istenirse (örn. yeni listelenmiş parite) en fazla
+    `miss_refresh_seconds` aralıkla bir kez eşzamanlı yenileme denenir.
+    Okumalar hiçbir zaman süren bir isteği beklemez.
+    """
+    def __init__(self, fetch: Callable[[], dict], ttl_seconds: float = 3600.0, miss_refresh_seconds: float = 60.0):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self._symbols: Dict[str, SymbolFilters] = {}
+        self._loaded_at = None
+        self._lock = threading.Lock() # Yalnızca durumu korur; istek sırasında tutulmaz
+        self._fetch_lock = threading.Lock() # Aynı anda en fazla bir exchangeInfo isteği
+        self._background = None
+
+    def refresh(self) -> bool:
+        """Kuralları borsadan yeniden yükler. Başarılıysa True döner."""
+        with self._fetch_lock:
+            return self._refresh_fetching()
+
+    def _refresh_fetching(self) -> bool:
+        data = self._fetch()
+        with self._lock:
+            # Başarısız denemeler de zamanı günceller ki her çağrıda tekrar istek atılmasın
+            self._loaded_at = time.monotonic()
+            if not data or 'symbols' not in data:
+                return False
+            self._symbols = {info['symbol']: SymbolFilters(info) for info in data['symbols']}
+        logger.info("Borsa kuralları yüklendi: %s sembol.", len(data['symbols']))
+        return True
+
+    def _refresh_if_unchanged(self, loaded_at) -> bool:
+        """Beklerken başka bir thread yenilemediyse yeniler (aynı anda gelen istekler tek istekte birleşir)."""
+        with self._fetch_lock:
+            if self._loaded_at != loaded_at:
+                return True
+            return self._refresh_fetching()
+
+    def _refresh_in_background(self, loaded_at):
+        try:
+            self._refresh_if_unchanged(loaded_at)
+        except Exception as e:
+            with self._lock:
+                self._loaded_at = time.monotonic()
+            logger.error("Borsa kuralları arka planda yenilenemedi: %s", e)
+
+    def _start_background_refresh(self, loaded_at):
+        with self._lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(target=self._refresh_in_background, args=(loaded_at,),
+                                                name="exchange-info", daemon=True)
+            self._background.start()
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        """Sembolün ayrıştırılmış kurallarını döndürür; bulunamazsa None."""
+        with self._lock:
+            now = time.monotonic()
+            loaded_at = self._loaded_at
+            filters = self._symbols.get(symbol)
+
+        if loaded_at is None:
+            # İstemci kurulurken yüklenemediyse ilk ihtiyaçta yüklenir
+            self._refresh_if_unchanged(None)
+        elif filters is not None:
+            if now - loaded_at >= self.ttl_seconds:
+                self._start_background_refresh(loaded_at)
+            return filters
+        elif now - loaded_at >= self.miss_refresh_seconds:
+            self._refresh_if_unchanged(loaded_at)
+        else:
+            return None
+
+        with self._lock:
+            return self._symbols.get(symbol)
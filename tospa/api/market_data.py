@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from websockets.sync.client import connect
+
+logger = logging.getLogger(__name__)
+
+STREAM_URLS = {
+    False: "wss://stream.binance.com:9443/stream",
+    True: "wss://stream.testnet.binance.vision/stream",
+}
+
+class MarketDataFeed:
+    """
+    Binance çoklu akış (combined stream) bağlantısıyla beslenen canlı fiyat
+    ve kapanmış mum defteri.
+
+    Her sembol için `<sembol>@miniTicker` ve `<sembol>@kline_<aralık>`
+    akışlarına tek bir websocket bağlantısıyla abone olunur. Bağlantı
+    koptuğunda artan bekleme süreleriyle yeniden bağlanılır ve her
+    bağlantıdan sonra REST üzerinden anlık görüntü (snapshot) alınarak
+    aradaki kayıp mumlar tamamlanır.
+
+    Mum verileri REST `klines` cevabıyla aynı liste formatında tutulur; bu
+    sayede strateji, TP/SL kontrolü ve arayüz aynı veriyi kullanabilir.
+    """
+    def __init__(self, rest_client, symbols: Iterable[str], interval: str = "1h", testnet: bool = True,
+                 url: str = None, max_klines: int = 500, stale_after: float = 15.0):
+        """
+        Args:
+            rest_client (TospaBinanceClient): Anlık görüntü için kullanılacak REST istemcisi.
+            symbols: Takip edilecek semboller.
+            interval (str): Mum defterinin aralığı (örn. "1h").
+            url (str): Akış adresi. Verilmezse testnet/canlı moda göre Binance adresi kullanılır;
+                testlerde yerel bir websocket sunucusu verilebilir.
+            max_klines (int): Sembol başına saklanacak kapanmış mum sayısı.
+            stale_after (float): Bu süreden (saniye) eski fiyatlar geçersiz sayılır.
+        """
+        self.rest_client = rest_client
+        self.interval = interval
+        self.url = url or STREAM_URLS[testnet]
+        self.max_klines = max_klines
+        self.stale_after = stale_after
+        self._symbols = sorted({s.upper() for s in symbols})
+        self._prices: Dict[str, tuple] = {}
+        self._closed: Dict[str, deque] = {}
+        self._current: Dict[str, list] = {}
+        self._synced = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._resubscribe = threading.Event()
+        self._thread = None
+        self._connection = None
+        self.is_connected = False
+
+    # --- Yaşam döngüsü ---
+    def start(self):
+        """Akış thread'ini başlatır."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="market-data", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Akışı durdurur ve bağlantıyı kapatır."""
+        self._stop_event.set()
+        self._close_connection()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def set_symbols(self, symbols: Iterable[str]):
+        """Takip edilen sembolleri günceller; liste değiştiyse yeniden abone olunur."""
+        new_symbols = sorted({s.upper() for s in symbols})
+        if new_symbols == self._symbols:
+            return
+        self._symbols = new_symbols
+        self._resubscribe.set()
+        self._close_connection()
+
+    def _close_connection(self):
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    # --- Okuma ---
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Sembolün son fiyatını döndürür; bağlantı yoksa veya fiyat bayatsa None."""
+        if not self.is_connected:
+            return None
+        with self._lock:
+            entry = self._prices.get(symbol)
+        if entry is None or time.monotonic() - entry[1] > self.stale_after:
+            return None
+        return entry[0]
+
+    def get_klines(self, symbol: str, interval: str, limit: int) -> Optional[List[list]]:
+        """
+        Son `limit` mumu REST formatında döndürür; son eleman henüz kapanmamış mumdur.
+        Defter bu sembol/aralık için senkron değilse veya yeterli mum yoksa None.
+        """
+        if not self.is_connected or interval != self.interval:
+            return None
+        with self._lock:
+            if symbol not in self._synced:
+                return None
+            closed = self._closed.get(symbol, ())
+            current = self._current.get(symbol)
+            if current is not None and closed and current[0] <= closed[-1][0]:
+                current = None
+            klines = list(closed)[-(limit - 1 if current is not None else limit):]
+            if current is not None:
+                klines.append(list(current))
+        if len(klines) < limit and len(closed) < self.max_klines:
+            return None
+        return klines
+
+    # --- Akış döngüsü ---
+    def _stream_url(self) -> str:
+        streams = []
+        for symbol in self._symbols:
+            lower = symbol.lower()
+            streams += [f"{lower}@miniTicker", f"{lower}@kline_{self.interval}"]
+        return f"{self.url}?streams={'/'.join(streams)}"
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            if not self._symbols:
+                self._stop_event.wait(1.0)
+                continue
+            self._resubscribe.clear()
+            try:
+                with connect(self._stream_url(), open_timeout=10, close_timeout=2) as connection:
+                    self._connection = connection
+                    self.is_connected = True
+                    logger.info("Piyasa verisi akışına bağlanıldı (%s sembol).", len(self._symbols))
+                    # Bağlandıktan sonra anlık görüntü al: aradaki mesajlar kuyrukta bekler, kayıp olmaz
+                    self._resync()
+                    backoff = 1.0
+                    while not self._stop_event.is_set() and not self._resubscribe.is_set():
+                        try:
+                            message = connection.recv(timeout=1.0)
+                        except TimeoutError:
+                            continue
+                        self._handle_message(message)
+            except Exception as e:
+                if not self._stop_event.is_set() and not self._resubscribe.is_set():
+                    logger.warning("Piyasa verisi akışı koptu: %s. %.0f saniye sonra yeniden bağlanılacak.", e, backoff)
+                    self._stop_event.wait(backoff)
+                    backoff = min(backoff * 2, 30.0)
+            finally:
+                self.is_connected = False
+                self._connection = None
+                with self._lock:
+                    self._synced.clear()
+
+    def _resync(self):
+        """REST üzerinden fiyat ve mum anlık görüntüsü alıp defteri tamamlar."""
+        for symbol in list(self._symbols):
+            if self._stop_event.is_set() or self._resubscribe.is_set():
+                return
+            ticker = self.rest_client.get_symbol_ticker(symbol, use_stream=False)
+            klines = self.rest_client.get_historical_klines(symbol, self.interval, limit=self.max_klines, use_stream=False)
+            with self._lock:
+                if ticker:
+                    self._prices[symbol] = (float(ticker['price']), time.monotonic())
+                if klines:
+                    book = self._closed.setdefault(symbol, deque(maxlen=self.max_klines))
+                    known = {k[0] for k in book}
+                    merged = list(book) + [k for k in klines[:-1] if k[0] not in known]
+                    merged.sort(key=lambda k: k[0])
+                    book.clear()
+                    book.extend(merged)
+                    current = self._current.get(symbol)
+                    if current is None or current[0] < klines[-1][0]:
+                        self._current[symbol] = klines[-1]
+                self._synced.add(symbol)
+
+    def _handle_message(self, message: str):
+        try:
+            data = json.loads(message).get('data', {})
+        except (ValueError, AttributeError):
+            return
+        event = data.get('e')
+        symbol = data.get('s')
+        if event == '24hrMiniTicker':
+            with self._lock:
+                self._prices[symbol] = (float(data['c']), time.monotonic())
+        elif event == 'kline':
+            k = data['k']
+            kline = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], k.get('B', '0')]
+            with self._lock:
+                self._prices[symbol] = (float(k['c']), time.monotonic())
+                if k['x']:
+                    book = self._closed.setdefault(symbol, deque(maxlen=self.max_klines))
+                    if book and book[-1][0] == kline[0]:
+                        book[-1] = kline
+                    elif not book or book[-1][0] < kline[0]:
+                        book.append(kline)
+                else:
+                    self._current[symbol] = kline
@@ -2,31 +2,68 @@ import logging
 import time
 import json
 import os
-from threading import Event
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
 from datetime import datetime
 
 # Proje içi modülleri import ediyoruz
 from tospa.core.config import load_settings, Settings
-from tospa.api.binance_client import TospaBinanceClient
+from tospa.api.binance_client import TospaBinanceClient, RequestWeightLimiter
+from tospa.api.market_data import MarketDataFeed
 from tospa.strategies.warrior_turtle import WarriorTurtleStrategy
 from tospa.core.logging_config import setup_logging
+from tospa.core.trade_journal import TradeJournal
+from tospa.core.performance_ledger import PerformanceLedger
+from tospa.core.state_stream import StateHub
+
+logger = logging.getLogger(__name__)
+
+# Kontrol paneli durum kanalı için yenileme aralıkları (saniye)
+DASHBOARD_BALANCE_ASSETS = ('USDT', 'BTC', 'ETH')
+DASHBOARD_BALANCE_SECONDS = 30
+DASHBOARD_REST_PRICE_SECONDS = 10
+DASHBOARD_TRADES_LIMIT = 100
 
 class TospaBot:
     """
     Stratejiyi, API istemcisini ve yapılandırmayı bir araya getirerek
     alım-satım döngüsünü yöneten ana bot sınıfı.
     Artık TP/SL takibi yapar ve pozisyonları bir JSON dosyasında saklar.
+
+    Args:
+        settings (Settings): Verilirse ayarlar dosyalardan okunmaz (örn. replay simülasyonu).
+        data_dir (str): Pozisyon ve işlem günlüğü dosyalarının klasörü.
+        log_dir (str): activity.log dosyasının klasörü.
     """
-    def __init__(self):
+    def __init__(self, settings: Settings = None, data_dir: str = "data", log_dir: str = "logs"):
         self._stop_event = Event()
         self.is_running = False
-        setup_logging()
-        logging.info("Tospa Bot nesnesi oluşturuldu...")
-        self.settings = load_settings()
+        self.settings = settings or load_settings()
+        setup_logging(async_mode=self.settings.LOG_ASYNC, levels=self.settings.LOG_LEVELS,
+                      json_file=self.settings.LOG_JSON_FILE or None, log_dir=log_dir)
+        logger.info("Tospa Bot nesnesi oluşturuldu...")
+        self._settings_signature_cache = self._settings_signature()
         self.client = None
+        self._client_credentials = None
         self.strategy = None
-        self.positions_file = "data/positions.json"
+        self.market_data = None
+        # Tüm istemciler aynı ağırlık bütçesini paylaşır
+        self.rate_limiter = RequestWeightLimiter(self.settings.REQUEST_WEIGHT_LIMIT)
+        self._executor = None
+        self._executor_workers = 0
+        self.now = datetime.now # İşlem zaman damgalarının kaynağı; replay simüle saati bağlar
+        self.positions_file = os.path.join(data_dir, "positions.json")
         self.open_positions = self._load_positions() # Pozisyonları dosyadan yükle
+        self.trade_journal = TradeJournal(os.path.join(data_dir, "trades.jsonl"), os.path.join(data_dir, "trades.json"))
+        self.trade_journal.migrate() # Eski trades.json varsa günlüğe bir kez aktar
+        self.performance = PerformanceLedger(self.trade_journal, fee_percent=self.settings.BINANCE_FEE_PERCENT,
+                                             checkpoint_path=os.path.join(data_dir, "performance_ledger.json"))
+        # Kontrol paneli izleyicileri tek bir paylaşılan durum kanalından beslenir
+        self.state_hub = StateHub(refresh=self.refresh_dashboard_state)
+        self._dashboard_lock = Lock()
+        self._dashboard_refreshed_at = None
+        self._dashboard_fetched_at = {}
+        self._dashboard_trade_count = None
 
     def _load_positions(self):
         """Mevcut pozisyonları positions.json dosyasından yükler."""
@@ -40,70 +77,140 @@ class TospaBot:
 
     def _save_positions(self):
         """Mevcut pozisyonları positions.json dosyasına kaydeder."""
-        log_dir = "data"
-        if not os.path.exists(log_dir): os.makedirs(log_dir)
+        log_dir = os.path.dirname(self.positions_file)
+        if log_dir and not os.path.exists(log_dir): os.makedirs(log_dir)
         with open(self.positions_file, 'w') as f:
             json.dump(self.open_positions, f, indent=4)
+        self.state_hub.publish(positions=self._positions_state())
+
+    def _settings_signature(self):
+        """Ayar dosyalarının değişiklik zamanı ve boyutundan bir imza üretir."""
+        signature = []
+        for path in ("settings.json", ".env"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
 
     def _initialize(self, force_live: bool = False):
-        # ... (kod aynı kalıyor) ...
-        self.settings = load_settings()
+        """
+        Ayarları ve Binance istemcisini hazırlar.
+
+        Ayarlar yalnızca settings.json veya .env dosyası değiştiğinde yeniden
+        okunur. İstemci uzun ömürlüdür (bağlantı havuzu ve keep-alive korunur);
+        yalnızca API anahtarları veya test/canlı modu değiştiğinde ya da önceki
+        bağlantı başarısız olduysa yeniden kurulur.
+        """
+        signature = self._settings_signature()
+        settings_changed = signature != self._settings_signature_cache
+        if settings_changed:
+            self.settings = load_settings()
+            self._settings_signature_cache = signature
+
         use_testnet = self.settings.IS_TEST_MODE and not force_live
         api_key = self.settings.TEST_BINANCE_API_KEY if use_testnet else self.settings.LIVE_BINANCE_API_KEY
         api_secret = self.settings.TEST_BINANCE_API_SECRET if use_testnet else self.settings.LIVE_BINANCE_API_SECRET
-        self.client = TospaBinanceClient(api_key=api_key, api_secret=api_secret, testnet=use_testnet)
-        if self.client and self.client.is_ready:
-            self.strategy = WarriorTurtleStrategy(self.client, self.settings)
+        self.rate_limiter.max_weight = self.settings.REQUEST_WEIGHT_LIMIT
+
+        credentials = (api_key, api_secret, use_testnet)
+        client_changed = self.client is None or not self.client.is_ready or credentials != self._client_credentials
+        if client_changed:
+            if self.client is not None and self.client.is_ready:
+                logger.info("API anahtarları veya işlem modu değişti, Binance istemcisi yeniden kuruluyor.")
+            self.client = TospaBinanceClient(api_key=api_key, api_secret=api_secret, testnet=use_testnet,
+                                             rate_limiter=self.rate_limiter,
+                                             pool_size=max(10, self.settings.ANALYSIS_WORKERS))
+            self._client_credentials = credentials
+
+        self._ensure_market_data(use_testnet, restart=client_changed)
+
+        if self.client and self.client.is_ready and (client_changed or settings_changed or self.strategy is None):
+            # Stratejiyi koru ki akan indikatör durumu döngüler arasında kaybolmasın
+            if self.strategy is None:
+                self.strategy = WarriorTurtleStrategy(self.client, self.settings)
+            else:
+                self.strategy.reconfigure(self.client, self.settings)
         return self.client
 
+    def _market_data_symbols(self):
+        """Akışta takip edilecek semboller: hedef pariteler ve açık pozisyonlar."""
+        return list(self.settings.TARGET_PAIRS) + list(self.open_positions.keys())
+
+    def _ensure_market_data(self, use_testnet: bool, restart: bool = False):
+        """Ayar açıksa canlı piyasa verisi akışını kurar/çalıştırır, kapalıysa durdurur."""
+        wanted = self.settings.USE_MARKET_DATA_STREAM and self.client and self.client.is_ready
+        if self.market_data is not None and (restart or not wanted):
+            self.market_data.stop()
+            self.market_data = None
+            if self.client: self.client.attach_market_data(None)
+        if not wanted:
+            return
+        if self.market_data is None:
+            self.market_data = MarketDataFeed(self.client, self._market_data_symbols(), testnet=use_testnet)
+            self.client.attach_market_data(self.market_data)
+        self.market_data.set_symbols(self._market_data_symbols())
+        self.market_data.start()
+
     def start(self):
         self.is_running = True
         self._stop_event.clear()
-        logging.info("Bot ana döngüsü başlatıldı.")
+        self.state_hub.publish(bot_status=self._status_text())
+        logger.info("Bot ana döngüsü başlatıldı.")
         self.run()
         
     def stop(self):
         self.is_running = False
         self._stop_event.set()
-        logging.info("Bot için durdurma sinyali gönderildi.")
+        self.state_hub.publish(bot_status=self._status_text())
+        logger.info("Bot için durdurma sinyali gönderildi.")
 
     def run(self):
         self._initialize()
         
         while not self._stop_event.is_set():
             try:
-                self._initialize() # Ayarları ve istemciyi her döngüde yenile
+                self._initialize() # Ayar dosyaları veya anahtarlar değiştiyse istemciyi yenile
                 
                 # 1. TP/SL Kontrolü
                 self._check_positions_for_tp_sl()
 
                 # 2. Strateji Analizi
-                logging.info(f"Yeni strateji analiz döngüsü başlıyor. Pariteler: {self.settings.TARGET_PAIRS}")
-                for pair in self.settings.TARGET_PAIRS:
-                    if self._stop_event.is_set(): break
-                    self._process_symbol(pair)
+                logger.info("Yeni strateji analiz döngüsü başlıyor. Pariteler: %s", self.settings.TARGET_PAIRS)
+                self._process_symbols(self.settings.TARGET_PAIRS)
                 
                 if not self._stop_event.is_set():
-                    logging.info(f"Analiz tamamlandı. 30 saniye bekleniyor...")
+                    logger.info("Analiz tamamlandı. 30 saniye bekleniyor...")
                     for _ in range(30):
                         if self._stop_event.is_set(): break
                         time.sleep(1)
+                        # Canlı akış varken TP/SL her saniye, REST isteği yapmadan kontrol edilir
+                        if self.market_data and self.market_data.is_connected:
+                            self._check_positions_for_tp_sl(quiet=True)
             
             except Exception as e:
-                logging.error(f"Ana döngüde beklenmedik bir hata oluştu: {e}", exc_info=True)
+                logger.error("Ana döngüde beklenmedik bir hata oluştu: %s", e, exc_info=True)
                 time.sleep(30)
-        
-        logging.info("Bot döngüsü başarıyla durduruldu.")
 
-    def _check_positions_for_tp_sl(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self.market_data:
+            self.market_data.stop()
+        logger.info("Bot döngüsü başarıyla durduruldu.")
+
+    def _check_positions_for_tp_sl(self, quiet: bool = False):
         """Açık pozisyonları kontrol eder ve TP/SL tetiklenmişse satar."""
         if not self.open_positions:
             return
         
-        logging.info("TP/SL için açık pozisyonlar kontrol ediliyor...")
+        if not quiet:
+            logger.info("TP/SL için açık pozisyonlar kontrol ediliyor...")
         positions_to_close = []
 
-        for symbol, pos_data in self.open_positions.items():
+        # Satış pozisyonu sözlükten sildiği için kopya üzerinde dönülür
+        for symbol, pos_data in list(self.open_positions.items()):
             price_info = self.client.get_symbol_ticker(symbol)
             if not price_info: continue
             
@@ -112,12 +219,12 @@ class TospaBot:
             sl_price = pos_data.get('sl_price', 0)
 
             if tp_price > 0 and current_price >= tp_price:
-                logging.info(f"✅ TP TETİKLENDİ: {symbol} | Mevcut Fiyat: {current_price} >= TP Fiyatı: {tp_price}")
+                logger.info("✅ TP TETİKLENDİ: %s | Mevcut Fiyat: %s >= TP Fiyatı: %s", symbol, current_price, tp_price)
                 self._execute_trade(symbol, "SELL", "TP_TRIGGER")
                 positions_to_close.append(symbol)
 
             elif sl_price > 0 and current_price <= sl_price:
-                logging.info(f"❌ SL TETİKLENDİ: {symbol} | Mevcut Fiyat: {current_price} <= SL Fiyatı: {sl_price}")
+                logger.info("❌ SL TETİKLENDİ: %s | Mevcut Fiyat: %s <= SL Fiyatı: %s", symbol, current_price, sl_price)
                 self._execute_trade(symbol, "SELL", "SL_TRIGGER")
                 positions_to_close.append(symbol)
 
@@ -128,18 +235,60 @@ class TospaBot:
                     del self.open_positions[symbol]
             self._save_positions()
 
-    def _process_symbol(self, symbol: str):
-        """Stratejiye göre alım sinyali varsa işlem yapar."""
-        if not self.client or not self.client.is_ready: return
-        if symbol in self.open_positions: return # Zaten açık pozisyon varsa strateji alımı yapma
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Analiz için kullanılan sınırlı thread havuzunu döndürür (ayar değişirse yeniden kurar)."""
+        workers = max(1, self.settings.ANALYSIS_WORKERS)
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analiz")
+            self._executor_workers = workers
+        return self._executor
+
+    def _analyze_symbol(self, symbol: str):
+        """Sembolü analiz eder; işlem yapılmayacaksa None döner."""
+        if not self.client or not self.client.is_ready: return None
+        if symbol in self.open_positions: return None # Zaten açık pozisyon varsa strateji alımı yapma
+        return self.strategy.analyze(symbol)
 
-        signal = self.strategy.analyze(symbol)
+    def _act_on_signal(self, symbol: str, signal: str):
+        """Strateji sinyaline göre emir verir."""
         if signal == "BUY":
             self._execute_trade(symbol, "BUY", "STRATEGY")
 
+    def _process_symbol(self, symbol: str):
+        """Stratejiye göre alım sinyali varsa işlem yapar."""
+        self._act_on_signal(symbol, self._analyze_symbol(symbol))
+
+    def _process_symbols(self, symbols):
+        """
+        Tüm sembolleri thread havuzunda paralel olarak analiz eder, ardından
+        emirleri sembol listesindeki sırayla ve tek tek verir. REST çağrıları
+        istemcinin paylaşılan istek ağırlığı limitine tabidir.
+        """
+        symbols = list(symbols)
+        if len(symbols) <= 1 or self.settings.ANALYSIS_WORKERS <= 1:
+            for symbol in symbols:
+                if self._stop_event.is_set(): break
+                self._process_symbol(symbol)
+            return
+
+        executor = self._get_executor()
+        futures = {symbol: executor.submit(self._analyze_symbol, symbol) for symbol in symbols}
+
+        # Emir sırası analizlerin bitiş sırasına değil, parite listesinin sırasına bağlıdır
+        for symbol in symbols:
+            try:
+                signal = futures[symbol].result()
+            except Exception as e:
+                logger.error("%s analiz edilirken hata oluştu: %s", symbol, e, exc_info=True)
+                continue
+            if self._stop_event.is_set(): break
+            self._act_on_signal(symbol, signal)
+
     def _execute_trade(self, symbol: str, side: str, reason: str):
         """Bir alım/satım işlemini gerçekleştirir ve kaydeder."""
-        logging.info(f"{side} EMRİ ({reason}): {symbol}. İşlem yapılıyor...")
+        logger.info("%s EMRİ (%s): %s. İşlem yapılıyor...", side, reason, symbol)
         
         order_quantity = 0
         if side == "BUY":
@@ -147,7 +296,7 @@ class TospaBot:
             amount_to_invest = float(balance) * (self.settings.TRADE_AMOUNT_PERCENT / 100)
             price = float(self.client.get_symbol_ticker(symbol)['price'])
             raw_quantity = amount_to_invest / price
-            order_quantity = self.client.adjust_quantity_to_lot_size(symbol, raw_quantity)
+            order_quantity = self.client.adjust_quantity_to_lot_size(symbol, raw_quantity, price=price)
         
         elif side == "SELL":
             # Satışta, mevcut pozisyonun tamamını sat
@@ -155,7 +304,7 @@ class TospaBot:
             order_quantity = self.client.adjust_quantity_to_lot_size(symbol, quantity_to_sell)
 
         if not order_quantity or order_quantity <= 0:
-            logging.warning(f"Hesaplanan miktar geçersiz ({order_quantity}). İşlem iptal edildi.")
+            logger.warning("Hesaplanan miktar geçersiz (%s). İşlem iptal edildi.", order_quantity)
             return
 
         order_result = self.client.create_order(symbol, side, "MARKET", order_quantity) if not self.settings.IS_TEST_MODE else self.client.create_test_order(symbol, side, "MARKET", order_quantity)
@@ -179,20 +328,88 @@ class TospaBot:
             
             self._save_positions()
         else:
-            logging.error(f"{symbol} için {side} emri gerçekleştirilemedi: {order_result}")
+            logger.error("%s için %s emri gerçekleştirilemedi: %s", symbol, side, order_result)
 
     def _log_trade(self, symbol, side, quantity, price):
-        # ... (kod aynı kalıyor) ...
-        trade_data = {"timestamp": datetime.now().isoformat(), "symbol": symbol, "side": side, "quantity": quantity, "price": price}
-        log_dir, log_file = "data", "data/trades.json"
-        if not os.path.exists(log_dir): os.makedirs(log_dir)
-        trades = []
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                try: trades = json.load(f)
-                except json.JSONDecodeError: pass
-        trades.append(trade_data)
-        with open(log_file, 'w') as f:
-            json.dump(trades, f, indent=4)
-        logging.info(f"İşlem kaydedildi: {symbol} {side} {quantity}")
+        """İşlemi yalnızca sona ekleme yapılan işlem günlüğüne yazar."""
+        trade_data = {"timestamp": self.now().isoformat(), "symbol": symbol, "side": side, "quantity": quantity, "price": price}
+        self.trade_journal.append(trade_data)
+        self.performance.sync(self.settings.BINANCE_FEE_PERCENT)
+        if self.state_hub.subscriber_count:
+            # Emir yolunda REST isteği yapılmaz ve panel kilidi beklenmez: işlemler yerel
+            # günlükten yayınlanır, bakiyeler bir sonraki panel yenilemesinde alınır
+            self._dashboard_trade_count = self.trade_journal.count()
+            self.state_hub.publish(**self._trades_state())
+            self._dashboard_fetched_at.pop('balances', None)
+        logger.info("İşlem kaydedildi: %s %s %s", symbol, side, quantity)
+
+    # --- Kontrol paneli durumu ---
+    def _status_text(self) -> str:
+        return "Çalışıyor" if self.is_running else "Durduruldu"
+
+    def _positions_state(self) -> dict:
+        # Kopya yayınlanır ki sonradan yerinde yapılan değişiklikler delta olarak algılansın.
+        # Yayın thread'inde çalışır; işlem thread'i sözlüğü aynı anda değiştirebileceği için önce anlık kopyası alınır.
+        return {symbol: dict(position) for symbol, position in list(self.open_positions.items())}
+
+    def _trades_state(self) -> dict:
+        """İşlem günlüğünden türeyen panel bölümleri (yalnızca yerel veri; performans önceden eşitlenmiş olmalı)."""
+        return {
+            'trades': self.trade_journal.page(limit=DASHBOARD_TRADES_LIMIT),
+            'performance': {'summary': self.performance.summary(), 'chart_data': self.performance.chart_data()}
+            if self.performance.processed else {'summary': {}, 'chart_data': {}},
+        }
+
+    def _dashboard_due(self, key: str, now: float, seconds: float) -> bool:
+        last = self._dashboard_fetched_at.get(key)
+        if last is not None and now - last < seconds:
+            return False
+        self._dashboard_fetched_at[key] = now
+        return True
+
+    def refresh_dashboard_state(self, force: bool = False):
+        """
+        Kontrol panelinin durumunu toplayıp durum kanalına yayınlar.
+
+        Kaç izleyici olursa olsun en fazla `state_hub.interval` saniyede bir
+        çalışır. Bakiyeler tek bir hesap isteğiyle `DASHBOARD_BALANCE_SECONDS`
+        aralıkla alınır; fiyatlar canlı akıştan okunur, akışta olmayan
+        pariteler için REST isteği `DASHBOARD_REST_PRICE_SECONDS` aralıkla yapılır.
+        """
+        with self._dashboard_lock:
+            now = time.monotonic()
+            if not force and self._dashboard_refreshed_at is not None \
+                    and now - self._dashboard_refreshed_at < self.state_hub.interval:
+                return
+            self._dashboard_refreshed_at = now
+            current_settings = load_settings()
+            sections = {
+                'bot_status': self._status_text(),
+                'target_pairs': current_settings.TARGET_PAIRS,
+                'positions': self._positions_state(),
+            }
+
+            trade_count = self.trade_journal.count()
+            if force or trade_count != self._dashboard_trade_count:
+                self._dashboard_trade_count = trade_count
+                self.performance.sync(current_settings.BINANCE_FEE_PERCENT)
+                sections.update(self._trades_state())
+
+            if self.client and self.client.is_ready:
+                if force or self._dashboard_due('balances', now, DASHBOARD_BALANCE_SECONDS):
+                    sections['balances'] = self.client.get_account_balances(DASHBOARD_BALANCE_ASSETS)
+                prices = dict(self.state_hub.snapshot().get('prices', {}))
+                rest_due = self._dashboard_due('prices', now, DASHBOARD_REST_PRICE_SECONDS)
+                for pair in current_settings.TARGET_PAIRS:
+                    price = self.market_data.get_price(pair) if self.market_data else None
+                    if price is not None:
+                        prices[pair] = str(price)
+                    elif rest_due or pair not in prices:
+                        price_info = self.client.get_symbol_ticker(pair, use_stream=False)
+                        prices[pair] = price_info.get('price', 'N/A') if price_info else 'N/A'
+                sections['prices'] = {pair: prices[pair] for pair in current_settings.TARGET_PAIRS}
+            elif 'balances' not in self.state_hub.snapshot():
+                sections['balances'] = {asset: '0.00' for asset in DASHBOARD_BALANCE_ASSETS}
+                sections['prices'] = {}
 
+            self.state_hub.publish(**sections)
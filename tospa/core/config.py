@@ -1,7 +1,7 @@
 import os
 import json
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 def update_env_file(key: str, value: str):
     """
@@ -45,15 +45,26 @@ class Settings(BaseSettings):
     TEST_BINANCE_API_KEY: str = ""
     TEST_BINANCE_API_SECRET: str = ""
     IS_TEST_MODE: bool = True
+    LOG_ASYNC: bool = True # Log yazımını arka plan thread'ine taşı
+    LOG_LEVELS: Dict[str, str] = {} # Modül bazında log seviyeleri, örn. {"tospa.api": "INFO"}
+    LOG_JSON_FILE: str = "" # Doluysa loglar bu dosyaya JSON satırları olarak da yazılır
 
     # settings.json dosyasından okunacaklar
     TARGET_PAIRS: List[str] = ["BTCUSDT", "ETHUSDT"]
     TRADE_AMOUNT_PERCENT: float = 25.0
+    STRATEGY_NAME: str = "ema_cross" # Canlı botun kullanacağı kayıtlı strateji (bkz. tospa.strategies.registry)
     FAST_EMA_PERIOD: int = 12
     SLOW_EMA_PERIOD: int = 26
+    TREND_EMA_PERIOD: int = 100
+    RSI_PERIOD: int = 14
+    RSI_BUY_LEVEL: float = 50
+    RSI_SELL_LEVEL: float = 75
     DEFAULT_TP_PERCENT: float = 2.0
     DEFAULT_SL_PERCENT: float = 1.0
     BINANCE_FEE_PERCENT: float = 0.1 # Standart %0.1 komisyon oranı
+    ANALYSIS_WORKERS: int = 8 # Sembolleri paralel analiz eden thread sayısı
+    REQUEST_WEIGHT_LIMIT: int = 1200 # Dakika başına kullanılabilecek Binance istek ağırlığı
+    USE_MARKET_DATA_STREAM: bool = True # Fiyat ve mumları websocket akışından oku
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -65,9 +76,11 @@ class Settings(BaseSettings):
         """Dinamik ayarları settings.json dosyasına kaydeder."""
         dynamic_data = self.model_dump(include={
             'TARGET_PAIRS', 'TRADE_AMOUNT_PERCENT', 
-            'FAST_EMA_PERIOD', 'SLOW_EMA_PERIOD',
+            'STRATEGY_NAME', 'FAST_EMA_PERIOD', 'SLOW_EMA_PERIOD',
+            'TREND_EMA_PERIOD', 'RSI_PERIOD', 'RSI_BUY_LEVEL', 'RSI_SELL_LEVEL',
             'DEFAULT_TP_PERCENT', 'DEFAULT_SL_PERCENT',
-            'BINANCE_FEE_PERCENT' # Yeni ayarı ekle
+            'BINANCE_FEE_PERCENT', # Yeni ayarı ekle
+            'ANALYSIS_WORKERS', 'REQUEST_WEIGHT_LIMIT', 'USE_MARKET_DATA_STREAM'
         })
         with open("settings.json", "w") as f:
             json.dump(dynamic_data, f, indent=4)
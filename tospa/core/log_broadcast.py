@@ -0,0 +1,61 @@
+import logging
+import threading
+from collections import deque
+from typing import Iterator
+
+class LogBroadcastHandler(logging.Handler):
+    """
+    Log kayıtlarını sabit boyutlu bir halka tamponda (ring buffer) tutan ve
+    birden fazla okuyucuya dağıtan logging handler'ı.
+
+    Her okuyucu önce tampondaki son satırları (backfill), ardından canlı
+    satırları alır. Yazan taraf okuyucuları hiç beklemez: yavaş bir okuyucu
+    tampon kapasitesinden fazla geride kalırsa atlanan satır sayısı
+    bildirilip en eski mevcut satırdan devam edilir. Dosya okunmadığı için
+    log rotasyonundan etkilenmez.
+    """
+    def __init__(self, capacity: int = 1000, level=logging.NOTSET):
+        super().__init__(level)
+        self._buffer = deque(maxlen=capacity) # (sıra no, satır)
+        self._next_seq = 0
+        self._cond = threading.Condition()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._cond:
+            self._buffer.append((self._next_seq, line))
+            self._next_seq += 1
+            self._cond.notify_all()
+
+    def subscribe(self, backfill: int = 100, keepalive: float = 15.0) -> Iterator[str]:
+        """
+        Log satırlarını üreten bir okuyucu döndürür. Yeni satır yoksa
+        `keepalive` saniyede bir boş dize üretilir; böylece kopmuş
+        bağlantılar fark edilip okuyucu kapatılabilir.
+        """
+        with self._cond:
+            seq = max(self._next_seq - backfill, self._buffer[0][0] if self._buffer else 0)
+        while True:
+            with self._cond:
+                if seq == self._next_seq:
+                    self._cond.wait(timeout=keepalive)
+                if seq == self._next_seq:
+                    lines = None
+                else:
+                    oldest = self._buffer[0][0]
+                    skipped = max(oldest - seq, 0)
+                    lines = [line for s, line in self._buffer if s >= seq]
+                    seq = self._next_seq
+            if lines is None:
+                yield ""
+                continue
+            if skipped:
+                yield f"... {skipped} log satırı atlandı (okuyucu geride kaldı) ..."
+            yield from lines
+
+# Uygulama genelinde tek bir yayın tamponu kullanılır (bkz. logging_config.setup_logging)
+log_broadcast = LogBroadcastHandler()
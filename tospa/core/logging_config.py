@@ -1,47 +1,137 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
 
-def setup_logging():
+from tospa.core.log_broadcast import log_broadcast
+
+# Asenkron modda handler'ları çalıştıran arka plan dinleyicisi
+_listener: Optional[QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık bir JSON nesnesi olarak biçimlendirir (yapısal log)."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Kaydı kuyruğa yalnızca mesajı birleştirerek koyar; zaman damgası ve
+    hata izi (traceback) biçimlendirmesi dinleyici thread'inde yapılır.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        # Argümanlar sonradan değişebileceği için mesaj burada sabitlenir
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            if handler is not log_broadcast:
+                handler.close()
+        _listener = None
+
+def setup_logging(async_mode: bool = True, levels: Optional[Dict[str, str]] = None, json_file: Optional[str] = None,
+                  log_dir: str = "logs"):
     """
     Proje genelinde kullanılacak olan loglama sistemini kurar.
     - Konsola INFO seviyesinde log basar.
     - 'logs/activity.log' dosyasına DEBUG seviyesinde log yazar.
     - Dosya 5MB boyutuna ulaşınca rotasyon yapar (eski logları arşivler).
+    - Kontrol panelinin canlı log akışı için kayıtları bellekteki yayın tamponuna da yazar.
+
+    Args:
+        async_mode (bool): True ise log çağrıları kayıtları yalnızca bir kuyruğa koyar;
+            biçimlendirme ve disk/konsol yazımı arka plandaki bir dinleyici thread'inde
+            yapılır. Böylece emir yolu disk gecikmesinden etkilenmez.
+        levels (dict): Modül bazında seviyeler, örn. {"tospa.api": "INFO"}.
+        json_file (str): Verilirse kayıtlar bu dosyaya satır başına bir JSON nesnesi olarak da yazılır.
+        log_dir (str): activity.log dosyasının klasörü (örn. replay kendi geçici klasörünü verir).
     """
+    global _listener
+
     # logs klasörünün var olduğundan emin ol
-    log_directory = "logs"
+    log_directory = log_dir
     if not os.path.exists(log_directory):
         os.makedirs(log_directory)
 
     # Ana logger'ı al ve seviyesini en düşük olan DEBUG yap
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
-    
+
     # Mevcut handler'ları temizle (birden fazla handler eklenmesini önlemek için)
     if logger.hasHandlers():
         logger.handlers.clear()
+    _stop_listener()
+
+    # Modül bazında seviyeler: kapalı seviyedeki çağrılar mesaj hiç biçimlendirilmeden elenir
+    for name, level in (levels or {}).items():
+        logging.getLogger(name).setLevel(level.upper())
 
     # Log formatını belirle
     log_format = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
+    handlers = []
 
     # Konsol (Stream) Handler'ı oluştur
     # Sadece INFO ve üzeri seviyedeki logları konsola basar.
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     # Dosya (File) Handler'ı oluştur
     # Tüm logları (DEBUG ve üzeri) dosyaya yazar.
     # RotatingFileHandler ile dosya boyutu kontrol edilir.
-    file_handler = RotatingFileHandler('logs/activity.log', maxBytes=5*1024*1024, backupCount=2)
+    file_handler = RotatingFileHandler(os.path.join(log_directory, 'activity.log'), maxBytes=5*1024*1024, backupCount=2)
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(log_format)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
+
+    # Yayın (Broadcast) Handler'ı
+    # /api/logs okuyucuları log dosyasını değil bu tamponu izler.
+    log_broadcast.setLevel(logging.DEBUG)
+    log_broadcast.setFormatter(log_format)
+    handlers.append(log_broadcast)
+
+    # İsteğe bağlı yapısal (JSON) log dosyası
+    if json_file:
+        json_handler = RotatingFileHandler(json_file, maxBytes=5*1024*1024, backupCount=2, encoding='utf-8')
+        json_handler.setLevel(logging.DEBUG)
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    if async_mode:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
     logging.info("Loglama sistemi başarıyla kuruldu.")
 
+# Çıkışta kuyrukta bekleyen kayıtlar yazılsın
+atexit.register(_stop_listener)
+
 # Bu dosya doğrudan çalıştırıldığında log sistemini test et
 if __name__ == "__main__":
     setup_logging()
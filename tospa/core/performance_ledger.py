@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from tospa.core.trade_journal import TradeJournal
+
+PERFORMANCE_CHECKPOINT_FILE = "data/performance_ledger.json"
+CHECKPOINT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+class PerformanceLedger:
+    """
+    İşlem günlüğünden beslenen ve performans özetini (K/Z, kazanan/kaybeden,
+    ortalama maliyet) ile bakiye eğrisini sürekli güncel tutan defter.
+
+    Her işlem yalnızca bir kez işlenir; sorgular geçmişi baştan hesaplamaz.
+    Durum her güncellemeden sonra bir kontrol noktası (checkpoint) dosyasına
+    yazılır, yeniden başlatmada buradan devam edilip yalnızca sonradan
+    eklenen işlemler okunur.
+
+    Bakiye eğrisi en fazla `max_points` noktayla tutulur: sınır aşıldığında
+    noktaların yarısı atılır ve örnekleme aralığı iki katına çıkar. Son
+    işlemin noktası her zaman grafikte yer alır.
+    """
+    def __init__(self, journal: TradeJournal, fee_percent: float = 0.1, initial_balance: float = 10000.0,
+                 checkpoint_path: str = PERFORMANCE_CHECKPOINT_FILE, max_points: int = 500):
+        self.journal = journal
+        self.fee_percent = fee_percent
+        self.initial_balance = initial_balance
+        self.checkpoint_path = checkpoint_path
+        self.max_points = max_points
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_checkpoint()
+
+    def _reset(self):
+        self.pnl = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.positions = {}
+        self.processed = 0
+        self.last_timestamp = None
+        self.stride = 1
+        self.points = []
+        self.last_point = None
+
+    # --- Kontrol noktası ---
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Performans kontrol noktası okunamadı, defter baştan kurulacak: %s", e)
+            return
+        if state.get('version') != CHECKPOINT_VERSION or state.get('fee_percent') != self.fee_percent \
+                or state.get('initial_balance') != self.initial_balance or state.get('max_points') != self.max_points:
+            return
+        self.pnl, self.wins, self.losses = state['pnl'], state['wins'], state['losses']
+        self.positions = state['positions']
+        self.processed, self.last_timestamp = state['processed'], state['last_timestamp']
+        self.stride, self.points, self.last_point = state['stride'], state['points'], state['last_point']
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            'version': CHECKPOINT_VERSION, 'fee_percent': self.fee_percent,
+            'initial_balance': self.initial_balance, 'max_points': self.max_points,
+            'pnl': self.pnl, 'wins': self.wins, 'losses': self.losses, 'positions': self.positions,
+            'processed': self.processed, 'last_timestamp': self.last_timestamp,
+            'stride': self.stride, 'points': self.points, 'last_point': self.last_point,
+        }
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # --- Güncelleme ---
+    def sync(self, fee_percent: float = None) -> int:
+        """
+        Günlüğe defterin son işlediği kayıttan sonra eklenen işlemleri işler.
+        Komisyon oranı değiştiyse veya günlük defterle uyuşmuyorsa defter
+        baştan kurulur.
+
+        Returns:
+            int: Bu çağrıda işlenen işlem sayısı.
+        """
+        with self._lock:
+            if fee_percent is not None and fee_percent != self.fee_percent:
+                self.fee_percent = fee_percent
+                self._reset()
+            total = self.journal.count()
+            if self.processed and not self._journal_matches(total):
+                logger.info("İşlem günlüğü performans defteriyle uyuşmuyor, defter yeniden hesaplanıyor.")
+                self._reset()
+            if total == self.processed:
+                return 0
+
+            applied = 0
+            for trade in self.journal.page(limit=total - self.processed, offset=self.processed, newest_first=False):
+                self._apply(trade)
+                applied += 1
+            self._save_checkpoint()
+            return applied
+
+    def _journal_matches(self, total: int) -> bool:
+        """Defterin son işlediği kayıt günlükte hâlâ aynı sırada mı?"""
+        if total < self.processed:
+            return False
+        last = self.journal.page(limit=1, offset=self.processed - 1, newest_first=False)
+        return bool(last) and last[0].get('timestamp') == self.last_timestamp
+
+    def _apply(self, trade: dict):
+        # Hesaplama, app.py'deki eski tam tekrar (replay) hesabıyla birebir aynıdır
+        symbol, quantity, price = trade['symbol'], float(trade['quantity']), float(trade['price'])
+        fee = self.fee_percent / 100.0
+        trade_value = quantity * price
+        position = self.positions.get(symbol)
+        if trade['side'] == 'BUY':
+            if position is None:
+                position = self.positions[symbol] = {'quantity': 0, 'cost': 0}
+            position['quantity'] += quantity
+            position['cost'] += trade_value
+            self.pnl -= trade_value * fee
+        elif trade['side'] == 'SELL' and position is not None and position['quantity'] > 0:
+            avg_buy_price = position['cost'] / position['quantity']
+            trade_pnl = (price - avg_buy_price) * quantity
+            self.pnl += trade_pnl
+            self.pnl -= trade_value * fee
+            if trade_pnl > 0: self.wins += 1
+            else: self.losses += 1
+            position['quantity'] -= quantity
+            position['cost'] -= quantity * avg_buy_price
+
+        self.last_point = [datetime.fromisoformat(trade['timestamp']).strftime('%H:%M:%S'), self.initial_balance + self.pnl]
+        if self.processed % self.stride == 0:
+            self.points.append(self.last_point)
+            if len(self.points) > self.max_points:
+                self.points = self.points[::2]
+                self.stride *= 2
+        self.processed += 1
+        self.last_timestamp = trade['timestamp']
+
+    # --- Sorgu ---
+    def summary(self) -> dict:
+        """Performans özetini döndürür."""
+        with self._lock:
+            total_trades = self.wins + self.losses
+            win_rate = (self.wins / total_trades * 100) if total_trades > 0 else 0
+            return {'total_pnl': round(self.pnl, 2), 'win_rate': round(win_rate, 2), 'wins': self.wins,
+                    'losses': self.losses, 'total_trades': total_trades}
+
+    def chart_data(self) -> dict:
+        """Örneklenmiş bakiye eğrisini grafik formatında döndürür."""
+        with self._lock:
+            points = list(self.points)
+            if self.last_point is not None and (not points or points[-1] != self.last_point):
+                points.append(self.last_point)
+            return {'labels': [p[0] for p in points], 'data': [p[1] for p in points]}
@@ -0,0 +1,116 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class StateHub:
+    """
+    Kontrol paneline sunucudan itilen (server-sent events) durum kanalı.
+
+    Durum bölümlere ayrılmıştır (fiyatlar, bakiyeler, pozisyonlar, işlemler,
+    performans...). Bir bölüm değiştiğinde yalnızca o bölüm bir "delta"
+    olarak yayınlanır. Anlık görüntü (snapshot) ve deltalar bir kez JSON'a
+    çevrilip tüm izleyicilerle paylaşılır; N izleyicinin maliyeti tek
+    izleyiciyle aynıdır.
+
+    `refresh` verilirse en az bir izleyici bağlıyken her `interval` saniyede
+    bir arka plan thread'inde çağrılır; izleyici yokken hiçbir veri
+    toplanmaz.
+    """
+    def __init__(self, refresh: Optional[Callable[[], None]] = None, interval: float = 2.0, history: int = 256):
+        self.refresh = refresh
+        self.interval = interval
+        self._state = {}
+        self._version = 0
+        self._history = deque(maxlen=history) # (sürüm, SSE metni)
+        self._snapshot_cache = None # (sürüm, SSE metni)
+        self._subscribers = 0
+        self._refresher = None
+        self._cond = threading.Condition()
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscribers
+
+    # --- Yayınlama ---
+    def publish(self, **sections) -> bool:
+        """
+        Verilen bölümleri günceller; değişen bölümler tek bir delta olarak
+        izleyicilere gönderilir. Bir şey değiştiyse True döner.
+        """
+        with self._cond:
+            changed = {name: value for name, value in sections.items() if self._state.get(name) != value}
+            if not changed:
+                return False
+            self._state.update(changed)
+            self._version += 1
+            self._history.append((self._version, self._format("delta", self._version, changed)))
+            self._cond.notify_all()
+            return True
+
+    def snapshot(self) -> dict:
+        """Güncel durumun bir kopyasını döndürür."""
+        with self._cond:
+            return dict(self._state)
+
+    # --- Abonelik ---
+    def events(self, keepalive: float = 15.0) -> Iterator[str]:
+        """
+        Bir izleyici için SSE akışı üretir: önce tam anlık görüntü, sonra
+        deltalar. İzleyici geride kalıp deltalar geçmişten düştüyse yeniden
+        anlık görüntü gönderilir. Bağlantı koptuysa fark edilsin diye
+        `keepalive` saniyede bir yorum satırı gönderilir.
+        """
+        with self._cond:
+            self._subscribers += 1
+            self._start_refresher()
+            version, payload = self._snapshot_event()
+        try:
+            yield payload
+            while True:
+                with self._cond:
+                    if self._version == version:
+                        self._cond.wait(timeout=keepalive)
+                    if self._version == version:
+                        chunk = ": keepalive\n\n"
+                    elif self._history and self._history[0][0] <= version + 1:
+                        chunk = "".join(text for v, text in self._history if v > version)
+                        version = self._version
+                    else:
+                        version, chunk = self._snapshot_event()
+                yield chunk
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def _snapshot_event(self):
+        if self._snapshot_cache is None or self._snapshot_cache[0] != self._version:
+            self._snapshot_cache = (self._version, self._format("snapshot", self._version, self._state))
+        return self._snapshot_cache
+
+    @staticmethod
+    def _format(event: str, version: int, data: dict) -> str:
+        return f"event: {event}\nid: {version}\ndata: {json.dumps(data)}\n\n"
+
+    # --- Yenileme ---
+    def _start_refresher(self):
+        if self.refresh is None or (self._refresher and self._refresher.is_alive()):
+            return
+        self._refresher = threading.Thread(target=self._refresh_loop, name="state-hub", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            with self._cond:
+                if self._subscribers == 0:
+                    self._refresher = None
+                    return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Kontrol paneli durumu güncellenemedi: %s", e)
+            time.sleep(self.interval)
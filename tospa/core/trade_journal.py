@@ -0,0 +1,180 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from typing import Iterator, List, Optional
+
+TRADES_JOURNAL_FILE = "data/trades.jsonl"
+LEGACY_TRADES_FILE = "data/trades.json"
+
+logger = logging.getLogger(__name__)
+
+class TradeJournal:
+    """
+    İşlem geçmişini JSON Lines formatında (her satır bir işlem) tutan,
+    yalnızca sona ekleme yapılan işlem günlüğü.
+
+    Her yeni işlem tek bir `write` çağrısıyla dosyanın sonuna eklenir ve
+    diske yazılır (fsync); dosyanın tamamı yeniden yazılmaz. Yazma
+    sırasında çökme olursa yalnızca son satır yarım kalabilir; okuyucular
+    bu satırı atlar.
+
+    Bellekte zaman damgasına göre sıralı bir (zaman damgası, bayt konumu)
+    dizini tutulur. Dizin dosyanın yalnızca henüz okunmamış kısmı taranarak
+    güncellenir; sayfalama ve zaman aralığı sorguları tüm dosyayı
+    ayrıştırmadan, sadece gereken satırları okuyarak yapılır.
+    """
+    def __init__(self, path: str = TRADES_JOURNAL_FILE, legacy_path: Optional[str] = LEGACY_TRADES_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._timestamps: List[str] = []
+        self._offsets: List[int] = []
+        self._indexed_size = 0
+        self._lock = threading.Lock()
+
+    # --- Taşıma ---
+    def migrate(self) -> int:
+        """
+        Eski trades.json dosyasını günlüğe aktarır. Günlük zaten varsa hiçbir
+        şey yapılmaz. Eski dosya yedek olarak yerinde bırakılır.
+
+        Returns:
+            int: Aktarılan işlem sayısı.
+        """
+        with self._lock:
+            if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+                return 0
+            try:
+                with open(self.legacy_path, 'r') as f:
+                    trades = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error("Eski işlem dosyası okunamadı, taşıma yapılmadı: %s", e)
+                return 0
+
+            trades = sorted(trades, key=lambda x: x.get('timestamp', ''))
+            self._ensure_dir()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for trade in trades:
+                    f.write(self._encode(trade))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            logger.info("%d işlem %s dosyasından %s günlüğüne aktarıldı.", len(trades), self.legacy_path, self.path)
+            return len(trades)
+
+    # --- Yazma ---
+    def append(self, trade: dict) -> dict:
+        """İşlemi günlüğün sonuna atomik olarak ekler."""
+        line = self._encode(trade).encode('utf-8')
+        with self._lock:
+            self._ensure_dir()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Önceki bir yazma yarım kaldıysa yeni kayıt o satıra yapışmasın
+                size = os.fstat(fd).st_size
+                if size and not self._ends_with_newline(size):
+                    os.write(fd, b"\n")
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return trade
+
+    # --- Okuma ---
+    def count(self) -> int:
+        """Günlükteki işlem sayısı."""
+        with self._lock:
+            self._refresh_index()
+            return len(self._offsets)
+
+    def iter_trades(self, since: str = None, until: str = None, reverse: bool = False) -> Iterator[dict]:
+        """
+        İşlemleri zaman sırasıyla tek tek döndürür; tüm geçmiş belleğe yüklenmez.
+
+        Args:
+            since (str): Bu zaman damgasından (dahil) sonraki işlemler.
+            until (str): Bu zaman damgasından (hariç) önceki işlemler.
+            reverse (bool): True ise en yeni işlemden başlanır.
+        """
+        with self._lock:
+            self._refresh_index()
+            start = bisect.bisect_left(self._timestamps, since) if since else 0
+            stop = bisect.bisect_left(self._timestamps, until) if until else len(self._timestamps)
+            offsets = self._offsets[start:stop]
+        if reverse:
+            offsets = offsets[::-1]
+        yield from self._read_at(offsets)
+
+    def page(self, limit: int = 100, offset: int = 0, newest_first: bool = True) -> List[dict]:
+        """
+        İşlemlerin bir sayfasını döndürür.
+
+        Args:
+            limit (int): Sayfadaki en fazla işlem sayısı.
+            offset (int): Atlanacak işlem sayısı.
+            newest_first (bool): True ise en yeni işlemler önce gelir.
+        """
+        with self._lock:
+            self._refresh_index()
+            total = len(self._offsets)
+            if newest_first:
+                end = max(total - offset, 0)
+                offsets = self._offsets[max(end - limit, 0):end][::-1]
+            else:
+                offsets = self._offsets[offset:offset + limit]
+        return list(self._read_at(offsets))
+
+    # --- Yardımcılar ---
+    @staticmethod
+    def _encode(trade: dict) -> str:
+        return json.dumps(trade, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+    def _ensure_dir(self):
+        log_dir = os.path.dirname(self.path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+    def _ends_with_newline(self, size: int) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(size - 1)
+            return f.read(1) == b"\n"
+
+    def _refresh_index(self):
+        """Dizini, dosyanın son taranan konumdan sonraki tam satırlarıyla günceller."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            self._timestamps, self._offsets, self._indexed_size = [], [], 0
+            return
+        if size < self._indexed_size:
+            # Dosya dışarıdan değiştirilmiş; dizini baştan kur
+            self._timestamps, self._offsets, self._indexed_size = [], [], 0
+        if size == self._indexed_size:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._indexed_size)
+            position = self._indexed_size
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Yarım kalmış (henüz yazılmakta olan) satır
+                line_offset, position = position, position + len(raw)
+                try:
+                    timestamp = json.loads(raw).get('timestamp', '')
+                except (ValueError, AttributeError):
+                    logger.warning("İşlem günlüğünde bozuk satır atlandı (konum %d).", line_offset)
+                    continue
+                index = bisect.bisect_right(self._timestamps, timestamp)
+                self._timestamps.insert(index, timestamp)
+                self._offsets.insert(index, line_offset)
+            self._indexed_size = position
+
+    def _read_at(self, offsets: List[int]) -> Iterator[dict]:
+        if not offsets:
+            return
+        with open(self.path, 'rb') as f:
+            for line_offset in offsets:
+                f.seek(line_offset)
+                yield json.loads(f.readline())
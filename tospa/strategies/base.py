@@ -0,0 +1,69 @@
+import copy
+from typing import Optional
+
+import pandas as pd
+
+from tospa.strategies.indicators import IndicatorCache
+
+# Sinyal kodları ve botun kullandığı karşılıkları
+BUY, SELL, HOLD = 1, -1, 0
+SIGNAL_NAMES = {BUY: "BUY", SELL: "SELL", HOLD: "HOLD"}
+
+class StrategyStream:
+    """
+    Bir stratejinin tek sembol için akan (incremental) durumu.
+
+    `on_bar` kapanmış bir mumu işler ve o mumun sinyalini döndürür; `peek`
+    henüz kapanmamış mum için aynı sinyali durumu değiştirmeden hesaplar.
+    Alt sınıflar yalnızca `on_bar`'ı uygular.
+    """
+    def on_bar(self, close: float) -> int:
+        raise NotImplementedError
+
+    def peek(self, close: float) -> int:
+        """Verilen fiyat sonraki kapanış olsaydı üretilecek sinyal (durum değişmez)."""
+        return copy.deepcopy(self).on_bar(close)
+
+    def seed(self, closes) -> "StrategyStream":
+        """Geçmiş kapanış fiyatlarıyla durumu doldurur."""
+        for close in closes:
+            self.on_bar(float(close))
+        return self
+
+class Strategy:
+    """
+    Hem backtestte hem canlı botta kullanılan strateji arayüzü.
+
+    - `compute(df)`: Tüm veri için indikatör sütunlarını ve 'signal' sütununu
+      (1 alım, -1 satım, 0 bekle) toplu hesaplar.
+    - `stream()`: Canlı kullanım için mum mum ilerleyen bir StrategyStream.
+    İki yol da indicators modülündeki aynı indikatör tanımlarını kullanır ve
+    aynı kapanış dizisiyle beslendiğinde aynı sinyalleri üretmelidir.
+
+    Parametreler `default_params` anahtarlarıyla verilir; tanınmayan
+    anahtarlar yok sayılır (böylece tek bir ayar sözlüğü farklı
+    stratejilere verilebilir).
+    """
+    name = ''
+    default_params: dict = {}
+
+    def __init__(self, **params):
+        self.params = {key: params.get(key, default) for key, default in self.default_params.items()}
+        self.validate()
+
+    def validate(self):
+        """Parametre tutarlılığını kontrol eder; geçersizse ValueError fırlatır."""
+
+    @property
+    def warmup(self) -> int:
+        """Sinyallerin anlamlı olması için gereken en az mum sayısı."""
+        return max([v for k, v in self.params.items() if k.endswith('_period')] or [1])
+
+    def compute(self, df: pd.DataFrame, cache: Optional[IndicatorCache] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def stream(self) -> StrategyStream:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.params})"
@@ -0,0 +1,100 @@
+import pandas as pd
+
+from tospa.strategies import indicators
+from tospa.strategies.base import Strategy, StrategyStream, BUY, SELL, HOLD
+
+class EmaCrossStrategy(Strategy):
+    """
+    Hızlı/yavaş EMA kesişimi (canlı botun "Savaşçı Kaplumbağa" kuralı).
+    Hızlı EMA yavaşı yukarı keserse alım, aşağı keserse satım.
+    """
+    name = 'ema_cross'
+    default_params = {'ema_short_period': 12, 'ema_long_period': 26}
+
+    def validate(self):
+        if self.params['ema_long_period'] <= self.params['ema_short_period']:
+            raise ValueError("Yavaş EMA periyodu, Hızlı EMA periyodundan büyük olmalıdır.")
+
+    def compute(self, df, cache=None):
+        close = df['Close']
+        fast = indicators.calculate_ema(close, self.params['ema_short_period'], cache=cache)
+        slow = indicators.calculate_ema(close, self.params['ema_long_period'], cache=cache)
+        signal = pd.Series(HOLD, index=df.index)
+        signal[(fast > slow) & (fast.shift(1) <= slow.shift(1))] = BUY
+        signal[(fast < slow) & (fast.shift(1) >= slow.shift(1))] = SELL
+        return pd.DataFrame({'ema_short': fast, 'ema_long': slow, 'signal': signal})
+
+    def stream(self):
+        return _EmaCrossStream(self.params['ema_short_period'], self.params['ema_long_period'])
+
+class _EmaCrossStream(StrategyStream):
+    def __init__(self, fast_period, slow_period):
+        self.fast = indicators.StreamingEMA(fast_period)
+        self.slow = indicators.StreamingEMA(slow_period)
+
+    def _signal(self, fast, slow, previous_fast, previous_slow):
+        if previous_fast <= previous_slow and fast > slow:
+            return BUY
+        if previous_fast >= previous_slow and fast < slow:
+            return SELL
+        return HOLD
+
+    def on_bar(self, close):
+        previous_fast, previous_slow = self.fast.value, self.slow.value
+        return self._signal(self.fast.update(close), self.slow.update(close), previous_fast, previous_slow)
+
+    def peek(self, close):
+        # EMA'nın kendi peek'i kopyalamadan daha ucuz
+        return self._signal(self.fast.peek(close), self.slow.peek(close), self.fast.value, self.slow.value)
+
+class EmaTrendRsiStrategy(Strategy):
+    """
+    Trend ve RSI filtreli EMA kesişimi (backtester'ın varsayılan stratejisi).
+    Alım: kısa EMA uzunu yukarı keser ve fiyat trend EMA'sının üzerindedir.
+    Satım: kısa EMA uzunu aşağı keser veya RSI satım seviyesinin üzerindedir.
+    """
+    name = 'ema_trend_rsi'
+    default_params = {
+        'ema_short_period': 9,
+        'ema_long_period': 21,
+        'ema_trend_period': 200,
+        'rsi_period': 14,
+        'rsi_sell_level': 75,
+    }
+
+    def compute(self, df, cache=None):
+        p = self.params
+        close = df['Close']
+        ema_short = indicators.calculate_ema(close, p['ema_short_period'], cache=cache)
+        ema_long = indicators.calculate_ema(close, p['ema_long_period'], cache=cache)
+        ema_trend = indicators.calculate_ema(close, p['ema_trend_period'], cache=cache)
+        rsi = indicators.calculate_rsi(close, p['rsi_period'], cache=cache)
+
+        signal = pd.Series(HOLD, index=df.index)
+        buy_crossover = (ema_short > ema_long) & (ema_short.shift(1) <= ema_long.shift(1))
+        signal[buy_crossover & (close > ema_trend)] = BUY
+        sell_crossover = (ema_short < ema_long) & (ema_short.shift(1) >= ema_long.shift(1))
+        signal[sell_crossover | (rsi > p['rsi_sell_level'])] = SELL
+        return pd.DataFrame({'ema_short': ema_short, 'ema_long': ema_long, 'ema_trend': ema_trend, 'rsi': rsi,
+                             'signal': signal})
+
+    def stream(self):
+        return _EmaTrendRsiStream(self.params)
+
+class _EmaTrendRsiStream(StrategyStream):
+    def __init__(self, params):
+        self.short = indicators.StreamingEMA(params['ema_short_period'])
+        self.long = indicators.StreamingEMA(params['ema_long_period'])
+        self.trend = indicators.StreamingEMA(params['ema_trend_period'])
+        self.rsi = indicators.StreamingRSI(params['rsi_period'])
+        self.rsi_sell_level = params['rsi_sell_level']
+
+    def on_bar(self, close):
+        previous_short, previous_long = self.short.value, self.long.value
+        short, long = self.short.update(close), self.long.update(close)
+        trend, rsi = self.trend.update(close), self.rsi.update(close)
+        if (short < long and previous_short >= previous_long) or rsi > self.rsi_sell_level:
+            return SELL
+        if short > long and previous_short <= previous_long and close > trend:
+            return BUY
+        return HOLD
@@ -1,14 +1,99 @@
+import hashlib
+import math
+import threading
+import weakref
 import pandas as pd
 import numpy as np
-from typing import List
+from collections import OrderedDict, deque
+from typing import Callable, Optional
 
-def calculate_sma(data: pd.Series, window: int) -> pd.Series:
+class IndicatorCache:
+    """
+    Hesaplanan indikatör serilerini (seri kimliği, indikatör, periyot)
+    anahtarıyla saklayan, boyutu sınırlı (LRU) bir önbellek.
+
+    Seri kimliği, fiyat dizisinin içeriğinden üretilen bir özettir; böylece
+    aynı veriyle yapılan farklı çağrılar (örn. optimizasyon kombinasyonları)
+    aynı sonucu paylaşır. Özet, aynı Series nesnesi için bir kez hesaplanır;
+    bu yüzden önbelleğe verilen serilerin yerinde değiştirilmemesi gerekir.
+    """
+    def __init__(self, maxsize: int = 64):
+        if maxsize <= 0:
+            raise ValueError("Önbellek boyutu (maxsize) pozitif bir tamsayı olmalıdır.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._series_keys = {}
+        self._lock = threading.Lock()
+
+    def series_key(self, data: pd.Series) -> str:
+        """Serinin içeriğinden bir kimlik özeti üretir."""
+        memo = self._series_keys.get(id(data))
+        if memo is not None and memo[0]() is data:
+            return memo[1]
+
+        values = np.ascontiguousarray(data.to_numpy(dtype=np.float64))
+        key = hashlib.sha1(memoryview(values).cast('B')).hexdigest()
+        # Nesne silinince kimlik numarası başka bir seriye verilebilir; kaydı da sil
+        object_id = id(data)
+        ref = weakref.ref(data, lambda _: self._series_keys.pop(object_id, None))
+        self._series_keys[object_id] = (ref, key)
+        return key
+
+    def get_or_compute(self, data: pd.Series, indicator: str, period: int,
+                       compute: Callable[[pd.Series], pd.Series]) -> pd.Series:
+        """
+        İndikatörü önbellekten döndürür; yoksa `compute(data)` ile hesaplayıp saklar.
+        """
+        key = (self.series_key(data), indicator, period)
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if values is None:
+            values = compute(data).to_numpy(dtype=np.float64, copy=True)
+            values.setflags(write=False)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = values
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return pd.Series(values, index=data.index, name=data.name, copy=False)
+
+    def stats(self) -> dict:
+        """İsabet/ıskalama sayaçlarını ve mevcut boyutu döndürür."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'hit_rate': (self.hits / total * 100) if total else 0.0,
+            }
+
+    def clear(self):
+        """Önbelleği ve sayaçları sıfırlar."""
+        with self._lock:
+            self._entries.clear()
+            self._series_keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+def _cached(data, indicator, window, compute, cache):
+    if cache is None:
+        return compute(data)
+    return cache.get_or_compute(data, indicator, window, compute)
+
+def calculate_sma(data: pd.Series, window: int, cache: Optional[IndicatorCache] = None) -> pd.Series:
     """
     Basit Hareketli Ortalama (Simple Moving Average - SMA) hesaplar.
 
     Args:
         data (pd.Series): Genellikle kapanış fiyatlarını içeren pandas Serisi.
         window (int): Ortalama için kullanılacak periyot sayısı.
+        cache (IndicatorCache, optional): Verilirse sonuç önbellekten okunur/önbelleğe yazılır.
 
     Returns:
         pd.Series: Hesaplanan SMA değerlerini içeren Seri.
@@ -17,16 +102,17 @@ def calculate_sma(data: pd.Series, window: int) -> pd.Series:
         raise TypeError("Veri, bir pandas Serisi olmalıdır.")
     if window <= 0:
         raise ValueError("Periyot (window) pozitif bir tamsayı olmalıdır.")
-        
-    return data.rolling(window=window).mean()
 
-def calculate_ema(data: pd.Series, window: int) -> pd.Series:
+    return _cached(data, 'sma', window, lambda s: s.rolling(window=window).mean(), cache)
+
+def calculate_ema(data: pd.Series, window: int, cache: Optional[IndicatorCache] = None) -> pd.Series:
     """
     Üstel Hareketli Ortalama (Exponential Moving Average - EMA) hesaplar.
 
     Args:
         data (pd.Series): Genellikle kapanış fiyatlarını içeren pandas Serisi.
         window (int): Ortalama için kullanılacak periyot sayısı.
+        cache (IndicatorCache, optional): Verilirse sonuç önbellekten okunur/önbelleğe yazılır.
 
     Returns:
         pd.Series: Hesaplanan EMA değerlerini içeren Seri.
@@ -36,7 +122,300 @@ def calculate_ema(data: pd.Series, window: int) -> pd.Series:
     if window <= 0:
         raise ValueError("Periyot (window) pozitif bir tamsayı olmalıdır.")
 
-    return data.ewm(span=window, adjust=False).mean()
+    return _cached(data, 'ema', window, lambda s: s.ewm(span=window, adjust=False).mean(), cache)
+
+def calculate_rsi(data: pd.Series, window: int = 14, cache: Optional[IndicatorCache] = None) -> pd.Series:
+    """
+    Göreceli Güç Endeksi (Relative Strength Index - RSI) hesaplar.
+    Ortalama kazanç/kayıp için basit hareketli ortalama kullanılır.
+
+    Args:
+        data (pd.Series): Genellikle kapanış fiyatlarını içeren pandas Serisi.
+        window (int): RSI periyodu.
+        cache (IndicatorCache, optional): Verilirse sonuç önbellekten okunur/önbelleğe yazılır.
+
+    Returns:
+        pd.Series: 0-100 aralığındaki RSI değerlerini içeren Seri.
+    """
+    if not isinstance(data, pd.Series):
+        raise TypeError("Veri, bir pandas Serisi olmalıdır.")
+    if window <= 0:
+        raise ValueError("Periyot (window) pozitif bir tamsayı olmalıdır.")
+
+    def compute(s):
+        delta = s.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+    return _cached(data, 'rsi', window, compute, cache)
+
+# Matris çekirdeklerinde blok içi ağırlıkların ulaşabileceği en büyük üs (e^300);
+# float64 taşmadan önce bol pay bırakır
+_MAX_BLOCK_EXPONENT = 300.0
+
+def _spans_array(spans) -> np.ndarray:
+    spans = np.atleast_1d(np.asarray(spans, dtype=np.int64))
+    if spans.ndim != 1 or spans.size == 0 or (spans <= 0).any():
+        raise ValueError("Periyotlar (spans) pozitif tamsayılardan oluşan bir liste olmalıdır.")
+    return spans
+
+def ema_matrix(prices, spans) -> np.ndarray:
+    """
+    Tek bir fiyat dizisi için birden fazla periyodun EMA'sını tek geçişte
+    hesaplar (`calculate_ema` ile aynı: ewm(span, adjust=False)).
+
+    Özyineleme y[t] = a*x[t] + (1-a)*y[t-1], blok içinde
+    y[k] = (c + a * Σ x[j] / d^(j+1)) * d^(k+1) (d = 1-a, c = önceki değer)
+    biçiminde kümülatif toplama çevrilir. Ağırlıklar taşmasın diye seri,
+    en küçük periyoda göre seçilen bloklara ayrılır; her blokta tüm
+    periyotlar (sütunlar) birlikte işlenir.
+
+    Args:
+        prices: Fiyat dizisi (NaN içermemelidir).
+        spans: EMA periyotları.
+
+    Returns:
+        np.ndarray: (bar sayısı x periyot sayısı) boyutunda EMA matrisi.
+    """
+    x = np.asarray(prices, dtype=np.float64)
+    spans = _spans_array(spans)
+    alpha = 2.0 / (spans + 1.0)
+    decay = 1.0 - alpha
+    out = np.empty((x.size, spans.size))
+    if x.size == 0:
+        return out
+
+    # Periyot 1 için EMA fiyatın kendisidir (d = 0)
+    unit = decay == 0
+    out[:, unit] = x[:, None]
+    active = ~unit
+    if not active.any():
+        return out
+    alpha, log_decay = alpha[active], np.log(decay[active])
+    block = max(1, int(_MAX_BLOCK_EXPONENT / -log_decay.min()))
+
+    steps = np.arange(1, min(block, x.size) + 1, dtype=np.float64)[:, None]
+    weights = np.exp(-steps * log_decay) # d^-(k+1)
+    carry = np.full(alpha.size, x[0])
+    result = np.empty((x.size, alpha.size))
+    for start in range(0, x.size, block):
+        chunk = x[start:start + block]
+        w = weights[:chunk.size]
+        values = (carry + alpha * np.cumsum(chunk[:, None] * w, axis=0)) / w
+        result[start:start + chunk.size] = values
+        carry = values[-1]
+    out[:, active] = result
+    return out
+
+def _window_means(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Her pencere için kayan ortalamayı tek kümülatif toplamdan hesaplar; ilk window-1 bar NaN."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    n = values.size
+    end = np.arange(1, n + 1)[:, None]
+    begin = end - windows[None, :]
+    valid = begin >= 0
+    means = (csum[end] - csum[np.maximum(begin, 0)]) / windows
+    means[~valid] = np.nan
+    return means
+
+def sma_matrix(prices, windows) -> np.ndarray:
+    """
+    Birden fazla periyodun SMA'sını tek kümülatif toplamla hesaplar
+    (`calculate_sma` ile aynı; ilk window-1 bar NaN).
+
+    Returns:
+        np.ndarray: (bar sayısı x periyot sayısı) boyutunda SMA matrisi.
+    """
+    return _window_means(np.asarray(prices, dtype=np.float64), _spans_array(windows))
+
+def rsi_matrix(prices, windows) -> np.ndarray:
+    """
+    Birden fazla periyodun RSI'ını hesaplar (`calculate_rsi` ile aynı:
+    kazanç/kayıp ortalamaları için basit hareketli ortalama).
+
+    Fiyat farkları ve kazanç/kayıp dizileri bir kez çıkarılır. Ortalamalar,
+    calculate_rsi ile bit düzeyinde aynı sonuç için aynı kayan toplamla
+    hesaplanır: stratejiler RSI'ı eşik değerlerle (örn. rsi > 75) karşılaştırdığı
+    için tam eşitlik anlarında farklı bir toplama sırası sinyali değiştirebilir.
+
+    Returns:
+        np.ndarray: (bar sayısı x periyot sayısı) boyutunda RSI matrisi.
+    """
+    x = pd.Series(np.asarray(prices, dtype=np.float64))
+    windows = _spans_array(windows)
+    delta = x.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    out = np.empty((x.size, windows.size))
+    for column, window in enumerate(windows.tolist()):
+        rs = gain.rolling(window=window).mean() / loss.rolling(window=window).mean()
+        out[:, column] = (100 - (100 / (1 + rs))).to_numpy()
+    return out
+
+def crossover_matrix(fast: np.ndarray, slow: np.ndarray):
+    """
+    Hızlı ve yavaş indikatör matrislerinin tüm sütun çiftleri için kesişimleri
+    yayınlama (broadcasting) ile tek seferde bulur.
+
+    Args:
+        fast: (bar x F) matris, örn. kısa EMA'lar.
+        slow: (bar x S) matris, örn. uzun EMA'lar.
+
+    Returns:
+        tuple: (yukarı kesişim, aşağı kesişim) boolean dizileri, her biri
+        (F x S x bar); her çiftin serisi bellekte bitişiktir. Yukarı kesişim:
+        fast > slow ve önceki barda fast <= slow; aşağı kesişim: fast < slow ve
+        önceki barda fast >= slow. İlk bar hiçbir zaman kesişim değildir
+        (run_backtest'teki shift(1) ile aynı).
+    """
+    fast = np.ascontiguousarray(np.asarray(fast, dtype=np.float64).T)[:, None, :]
+    slow = np.ascontiguousarray(np.asarray(slow, dtype=np.float64).T)[None, :, :]
+    shape = (fast.shape[0], slow.shape[1], fast.shape[2])
+    up = np.zeros(shape, dtype=bool)
+    down = np.zeros(shape, dtype=bool)
+    # Önceki bar için "<=" / ">=" ayrıca karşılaştırılır: NaN'da ikisi de False olmalı
+    np.logical_and(fast[..., 1:] > slow[..., 1:], fast[..., :-1] <= slow[..., :-1], out=up[..., 1:])
+    np.logical_and(fast[..., 1:] < slow[..., 1:], fast[..., :-1] >= slow[..., :-1], out=down[..., 1:])
+    return up, down
+
+class StreamingEMA:
+    """
+    Her yeni kapanış fiyatıyla sabit zamanda güncellenen EMA.
+
+    Güncelleme kuralı pandas `ewm(span=window, adjust=False).mean()` ile
+    birebir aynıdır; geçmişle tohumlanıp sonra mum mum ilerletildiğinde
+    toplu hesaplamayla aynı değerleri üretir.
+    """
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("Periyot (window) pozitif bir tamsayı olmalıdır.")
+        self.window = window
+        self.alpha = 2.0 / (window + 1.0)
+        self.value = float('nan')
+
+    def _next(self, price: float) -> float:
+        if price != price:
+            return self.value
+        if self.value != self.value:
+            return float(price)
+        if self.value == price:
+            return self.value
+        old_wt = 1.0 - self.alpha
+        return (old_wt * self.value + self.alpha * price) / (old_wt + self.alpha)
+
+    def update(self, price: float) -> float:
+        """Yeni kapanmış bir mumun fiyatını işler ve güncel EMA'yı döndürür."""
+        self.value = self._next(price)
+        return self.value
+
+    def peek(self, price: float) -> float:
+        """Durumu değiştirmeden, verilen fiyat sonraki mum olsaydı EMA'nın alacağı değeri döndürür."""
+        return self._next(price)
+
+    def seed(self, prices) -> "StreamingEMA":
+        """Geçmiş kapanış fiyatlarıyla durumu doldurur."""
+        for price in prices:
+            self.update(float(price))
+        return self
+
+class StreamingSMA:
+    """
+    Her yeni değerle sabit zamanda güncellenen SMA.
+
+    Pencereden çıkan/giren değerler pandas `rolling(window).mean()` ile aynı
+    telafili (Kahan) toplama kurallarıyla işlenir; bellek kullanımı pencere
+    boyutuyla sınırlıdır.
+    """
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("Periyot (window) pozitif bir tamsayı olmalıdır.")
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg_count = 0
+        self._same_count = 0
+        self._prev = float('nan')
+        self.value = float('nan')
+
+    def update(self, value: float) -> float:
+        """Yeni bir değer ekler, pencere doluysa en eskisini çıkarır ve ortalamayı döndürür."""
+        value = float(value)
+        if len(self._values) == self.window:
+            old = self._values.popleft()
+            y = -old - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, old) < 0:
+                self._neg_count -= 1
+        self._values.append(value)
+        y = value - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_count += 1
+        self._same_count = self._same_count + 1 if value == self._prev else 1
+        self._prev = value
+
+        nobs = len(self._values)
+        if nobs < self.window:
+            self.value = float('nan')
+        elif self._same_count >= nobs:
+            self.value = value
+        else:
+            result = self._sum / nobs
+            if (self._neg_count == 0 and result < 0) or (self._neg_count == nobs and result > 0):
+                result = 0.0
+            self.value = result
+        return self.value
+
+    def seed(self, values) -> "StreamingSMA":
+        """Geçmiş değerlerle durumu doldurur."""
+        for value in values:
+            self.update(value)
+        return self
+
+class StreamingRSI:
+    """
+    Her yeni kapanış fiyatıyla sabit zamanda güncellenen RSI.
+    `calculate_rsi` ile aynı tanımı (kazanç/kayıp için SMA) kullanır.
+    """
+    def __init__(self, window: int = 14):
+        self.window = window
+        self._gain = StreamingSMA(window)
+        self._loss = StreamingSMA(window)
+        self._last_price = float('nan')
+        self.value = float('nan')
+
+    def update(self, price: float) -> float:
+        """Yeni kapanmış bir mumun fiyatını işler ve güncel RSI'ı döndürür."""
+        price = float(price)
+        delta = price - self._last_price
+        self._last_price = price
+        # pandas'taki where() davranışı: ilk mumun farkı (NaN) kazanç/kayıpta 0 sayılır
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = self._gain.update(gain)
+        avg_loss = self._loss.update(loss)
+
+        if avg_gain != avg_gain or avg_loss != avg_loss:
+            self.value = float('nan')
+        elif avg_loss == 0:
+            self.value = 100.0 if avg_gain != 0 else float('nan')
+        else:
+            self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self.value
+
+    def seed(self, prices) -> "StreamingRSI":
+        """Geçmiş kapanış fiyatlarıyla durumu doldurur."""
+        for price in prices:
+            self.update(price)
+        return self
 
 # Bu dosya doğrudan çalıştırıldığında fonksiyonların doğru çalışıp çalışmadığını
 # test etmek için bir kontrol bloğu.
@@ -44,9 +423,9 @@ if __name__ == "__main__":
     print("--- İndikatörler Modülü Testi ---")
     # Örnek bir fiyat serisi oluşturalım
     test_prices = pd.Series([10, 12, 15, 14, 16, 18, 20, 19, 22, 25])
-    
+
     print("Örnek Fiyatlar:\n", test_prices.values)
-    
+
     # 3 periyotluk SMA hesapla
     sma_3 = calculate_sma(test_prices, 3)
     print("\n3 Periyotluk SMA:\n", np.round(sma_3.values, 2))
@@ -54,5 +433,30 @@ if __name__ == "__main__":
     # 3 periyotluk EMA hesapla
     ema_3 = calculate_ema(test_prices, 3)
     print("\n3 Periyotluk EMA:\n", np.round(ema_3.values, 2))
-    
+
+    # Önbellekli hesap aynı sonucu vermeli ve ikinci çağrı isabet etmeli
+    cache = IndicatorCache(maxsize=2)
+    for _ in range(2):
+        cached_ema = calculate_ema(test_prices, 3, cache=cache)
+    assert np.allclose(cached_ema.values, ema_3.values)
+    print("\nÖnbellek:", cache.stats())
+
+    # Akan (streaming) indikatörler toplu hesaplamayla aynı değerleri üretmeli
+    streaming_ema = StreamingEMA(3)
+    streaming_sma = StreamingSMA(3)
+    streaming_rsi = StreamingRSI(3)
+    stream_values = [(streaming_ema.update(p), streaming_sma.update(p), streaming_rsi.update(p)) for p in test_prices]
+    for column, expected in enumerate([ema_3, sma_3, calculate_rsi(test_prices, 3)]):
+        assert np.allclose([v[column] for v in stream_values], expected.values, equal_nan=True)
+    print("\nAkan indikatörler toplu hesaplamayla uyumlu.")
+
+    # Matris çekirdekleri periyot periyot hesaplamayla aynı sonucu vermeli
+    walk = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 5000)))
+    spans = [1, 3, 5, 9, 21, 50, 200]
+    for kernel, single in ((ema_matrix, calculate_ema), (sma_matrix, calculate_sma), (rsi_matrix, calculate_rsi)):
+        matrix = kernel(walk.to_numpy(), spans)
+        for column, span in enumerate(spans):
+            assert np.allclose(matrix[:, column], single(walk, span).values, rtol=1e-9, equal_nan=True), (kernel, span)
+    print("\nMatris çekirdekleri tekil hesaplamalarla uyumlu.")
+
     print("\nTest Başarılı!")
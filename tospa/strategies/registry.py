@@ -0,0 +1,54 @@
+from tospa.strategies.base import Strategy
+from tospa.strategies.ema import EmaCrossStrategy, EmaTrendRsiStrategy
+
+# Backtester'ın ve optimizasyonun varsayılan stratejisi
+DEFAULT_STRATEGY = EmaTrendRsiStrategy.name
+
+# İsimle seçilebilen stratejiler; yeni stratejiler register_strategy ile eklenir
+STRATEGIES = {cls.name: cls for cls in (EmaCrossStrategy, EmaTrendRsiStrategy)}
+
+def register_strategy(cls):
+    """Strateji sınıfını kaydeder (sınıf dekoratörü olarak da kullanılabilir)."""
+    if not (isinstance(cls, type) and issubclass(cls, Strategy)) or not cls.name:
+        raise TypeError("Strateji, 'name' alanı dolu bir Strategy alt sınıfı olmalıdır.")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+def get_strategy(name: str, **params) -> Strategy:
+    """İsimden parametreleri verilmiş bir strateji nesnesi oluşturur."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Bilinmeyen strateji: '{name}'. Seçenekler: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name](**params)
+
+# Bu dosya doğrudan çalıştırıldığında her stratejinin toplu (compute) ve akan
+# (on_bar/peek) yollarının paketteki CSV'lerde aynı sinyalleri ürettiğini kontrol eder.
+if __name__ == "__main__":
+    import glob
+    import time
+    import numpy as np
+    import pandas as pd
+
+    params = {'ema_short_period': 9, 'ema_long_period': 21, 'ema_trend_period': 100}
+    for csv_file in sorted(glob.glob("*USDT_*.csv")):
+        data = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        closes = data['Close'].to_numpy(dtype=float).tolist()
+        for name in STRATEGIES:
+            strategy = get_strategy(name, **params)
+            start = time.perf_counter()
+            batch = strategy.compute(data)['signal'].to_numpy()
+            batch_time = time.perf_counter() - start
+
+            stream = strategy.stream()
+            start = time.perf_counter()
+            live = np.array([stream.on_bar(close) for close in closes])
+            stream_time = time.perf_counter() - start
+            mismatch = np.flatnonzero(batch != live)
+            assert mismatch.size == 0, (csv_file, name, mismatch[:5])
+
+            # Kapanmamış mum için peek, aynı fiyatla kapanmış mumun sinyaline eşit olmalı
+            stream = strategy.stream().seed(closes[:-200])
+            for i in range(len(closes) - 200, len(closes)):
+                assert stream.peek(closes[i]) == batch[i], (csv_file, name, i)
+                stream.on_bar(closes[i])
+            print(f"{csv_file} [{name}]: {len(closes)} bar, {np.count_nonzero(batch)} sinyal aynı | "
+                  f"toplu {batch_time * 1000:.1f}ms, akan {stream_time * 1e6 / len(closes):.1f}µs/bar")
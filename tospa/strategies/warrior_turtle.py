@@ -1,16 +1,27 @@
-import pandas as pd
 import logging
 from binance.client import Client
+from binance.helpers import interval_to_milliseconds
 
 # Proje içi modülleri import ediyoruz
 from tospa.api.binance_client import TospaBinanceClient
-from tospa.strategies.indicators import calculate_ema
+from tospa.strategies.base import SIGNAL_NAMES, Strategy
+from tospa.strategies.registry import get_strategy
 from tospa.core.config import Settings # Ayarları import et
 
+logger = logging.getLogger(__name__)
+
+# Akan durum kurulduktan sonra her döngüde çekilecek mum sayısı
+INCREMENTAL_KLINE_LIMIT = 5
+
 class WarriorTurtleStrategy:
     """
     "Savaşçı Kaplumbağa" alım-satım stratejisi.
     Artık ayarları dinamik olarak config nesnesinden okur.
+
+    Sinyal kuralı ayarlardaki STRATEGY_NAME ile kayıtlı stratejiden gelir
+    (backtester ile aynı tanım). Her sembol için stratejinin akan durumu
+    tutulur: ilk analizde geçmiş mumlarla bir kez tohumlanır, sonraki
+    döngülerde yalnızca yeni kapanan mumlar işlenir.
     """
     def __init__(self, client: TospaBinanceClient, settings: Settings):
         """
@@ -22,47 +33,82 @@ class WarriorTurtleStrategy:
         """
         self.client = client
         self.settings = settings # Ayarların tamamını bir nesne olarak sakla
-        
-        # Ayarlar nesnesinin içindeki değerlere erişerek kontrol yap
-        if self.settings.SLOW_EMA_PERIOD <= self.settings.FAST_EMA_PERIOD:
-            raise ValueError("Yavaş EMA periyodu, Hızlı EMA periyodundan büyük olmalıdır.")
+        self._streams = {} # (sembol, aralık) -> akan strateji durumu
+        # Geçersiz parametrelerde strateji ValueError fırlatır
+        self.model = self.build_strategy(settings)
 
-    def analyze(self, symbol: str, interval: str = Client.KLINE_INTERVAL_1HOUR) -> str:
+    @staticmethod
+    def build_strategy(settings: Settings) -> Strategy:
+        """Ayarlardaki strateji adı ve parametrelerinden strateji nesnesini oluşturur."""
+        return get_strategy(
+            settings.STRATEGY_NAME,
+            ema_short_period=settings.FAST_EMA_PERIOD,
+            ema_long_period=settings.SLOW_EMA_PERIOD,
+            ema_trend_period=settings.TREND_EMA_PERIOD,
+            rsi_period=settings.RSI_PERIOD,
+            rsi_buy_level=settings.RSI_BUY_LEVEL,
+            rsi_sell_level=settings.RSI_SELL_LEVEL,
+        )
+
+    def reconfigure(self, client: TospaBinanceClient, settings: Settings):
         """
-        Belirtilen sembolü analiz eder ve bir alım-satım sinyali üretir.
+        İstemciyi ve ayarları günceller. Strateji veya parametreleri değiştiyse
+        akan durumlar sıfırlanır ve bir sonraki analizde yeniden tohumlanır.
         """
-        # Ayarları self.settings üzerinden kullan
-        limit = self.settings.SLOW_EMA_PERIOD + 100
-        klines = self.client.get_historical_klines(symbol, interval, limit=limit)
-        
+        model = self.build_strategy(settings)
+        changed = (model.name, model.params) != (self.model.name, self.model.params)
+        self.client = client
+        self.settings = settings
+        if changed:
+            self.model = model
+            self._streams.clear()
+
+    def _seed_stream(self, symbol: str, interval: str):
+        """Geçmiş mumları çekip strateji durumunu sıfırdan kurar."""
+        warmup = self.model.warmup
+        klines = self.client.get_historical_klines(symbol, interval, limit=warmup + 100)
+
         # Veri kontrolünü daha sağlam hale getirelim
-        if not klines or len(klines) < self.settings.SLOW_EMA_PERIOD:
-            logging.warning(f"{symbol} için yeterli veri alınamadı ({len(klines)} mum). Analiz atlanıyor.")
-            return "HOLD"
+        if not klines or len(klines) < warmup:
+            logger.warning("%s için yeterli veri alınamadı (%s mum). Analiz atlanıyor.", symbol, len(klines))
+            return None, None
 
-        # Gelen veriyi pandas DataFrame'e çevirelim
-        df = pd.DataFrame(klines, columns=['Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close time', 'Quote asset volume', 'Number of trades', 'Taker buy base asset volume', 'Taker buy quote asset volume', 'Ignore'])
-        df['Close'] = pd.to_numeric(df['Close'])
+        # Son mum henüz kapanmadı; durum yalnızca kapanmış mumlarla kurulur
+        closed = klines[:-1]
+        stream = {
+            'model': self.model.stream().seed(float(k[4]) for k in closed),
+            'last_open_time': closed[-1][0],
+        }
+        self._streams[(symbol, interval)] = stream
+        return stream, klines[-1]
 
-        # İndikatörleri ayarlar nesnesinden gelen değerlerle hesapla
-        fast_ema = calculate_ema(df['Close'], self.settings.FAST_EMA_PERIOD)
-        slow_ema = calculate_ema(df['Close'], self.settings.SLOW_EMA_PERIOD)
+    def _advance_stream(self, stream: dict, symbol: str, interval: str):
+        """
+        Son analizden bu yana kapanan mumları duruma işler.
+        Arada kaçırılmış mum varsa None döner (yeniden tohumlama gerekir).
+        """
+        klines = self.client.get_historical_klines(symbol, interval, limit=INCREMENTAL_KLINE_LIMIT)
+        if not klines:
+            return None
+        if klines[0][0] > stream['last_open_time'] + interval_to_milliseconds(interval):
+            return None
 
-        # Sinyal üretmek için son iki mumu kontrol et
-        last_fast_ema = fast_ema.iloc[-1]
-        previous_fast_ema = fast_ema.iloc[-2]
-        last_slow_ema = slow_ema.iloc[-1]
-        previous_slow_ema = slow_ema.iloc[-2]
+        for kline in klines[:-1]:
+            if kline[0] > stream['last_open_time']:
+                stream['model'].on_bar(float(kline[4]))
+                stream['last_open_time'] = kline[0]
+        return klines[-1]
 
-        # ALIM Sinyali: Hızlı EMA, Yavaş EMA'yı yukarı keserse
-        if previous_fast_ema <= previous_slow_ema and last_fast_ema > last_slow_ema:
-            return "BUY"
-        
-        # SATIM Sinyali: Hızlı EMA, Yavaş EMA'yı aşağı keserse
-        elif previous_fast_ema >= previous_slow_ema and last_fast_ema < last_slow_ema:
-            return "SELL"
-        
-        # Diğer tüm durumlar
-        else:
-            return "HOLD"
+    def analyze(self, symbol: str, interval: str = Client.KLINE_INTERVAL_1HOUR) -> str:
+        """
+        Belirtilen sembolü analiz eder ve bir alım-satım sinyali üretir.
+        """
+        stream = self._streams.get((symbol, interval))
+        current_kline = self._advance_stream(stream, symbol, interval) if stream else None
+        if current_kline is None:
+            stream, current_kline = self._seed_stream(symbol, interval)
+            if stream is None:
+                return "HOLD"
 
+        # Henüz kapanmamış mumun fiyatı, kapanmış gibi durumu değiştirmeden değerlendirilir
+        return SIGNAL_NAMES[stream['model'].peek(float(current_kline[4]))]